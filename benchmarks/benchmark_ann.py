@@ -0,0 +1,66 @@
+"""
+Benchmark the IVF face index against exact blocked search.
+
+Builds a synthetic collection of clustered embeddings (many faces per
+identity, as in a real photo archive), then reports recall@k and mean
+query latency for several nprobe values next to exact search.
+
+Usage:
+    python benchmarks/benchmark_ann.py [--faces 200000] [--dim 512] [--queries 1000]
+        [--k 10] [--nprobe 1 4 8 16 32] [--metric cosine]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from unlabeled_media_tagger.pipeline.ann_index import IVFIndex
+from unlabeled_media_tagger.pipeline.similarity import SimilarityEngine
+
+
+def synthetic_faces(count, dim, identities, rng):
+    """Noisy embeddings around random identity centers."""
+    centers = rng.normal(size=(identities, dim)).astype(np.float32)
+    labels = rng.integers(0, identities, count)
+    return centers[labels] + 0.35 * rng.normal(size=(count, dim)).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--faces", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--metric", default="cosine", choices=["cosine", "l2"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    identities = max(1, args.faces // 50)
+    faces = synthetic_faces(args.faces + args.queries, args.dim, identities, rng)
+    database, queries = faces[:args.faces], faces[args.faces:]
+
+    start = time.perf_counter()
+    index = IVFIndex(args.dim, metric=args.metric)
+    index.add(database)
+    print(f"{args.faces} faces x {args.dim}d, {args.queries} queries, k={args.k}")
+    print(f"Index build: {time.perf_counter() - start:.1f}s, nlist={index.nlist}\n")
+
+    start = time.perf_counter()
+    exact = [ids for ids, _ in SimilarityEngine(args.metric).search(queries, database, k=args.k)]
+    exact_ms = (time.perf_counter() - start) / args.queries * 1000
+
+    print(f"{'mode':<12}{'recall@k':>10}{'ms/query':>12}{'speedup':>10}")
+    print(f"{'exact':<12}{1.0:>10.4f}{exact_ms:>12.3f}{1.0:>9.1f}x")
+    for nprobe in args.nprobe:
+        start = time.perf_counter()
+        found, _ = index.search(queries, args.k, nprobe=nprobe)
+        query_ms = (time.perf_counter() - start) / args.queries * 1000
+        recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(found, exact)])
+        print(f"{f'nprobe={nprobe}':<12}{recall:>10.4f}{query_ms:>12.3f}{exact_ms / query_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark fast (downscaled) face detection against full-resolution detection.
+
+For every image in a local fixture directory this runs the detector once at
+full resolution and once per fast-detect size, then reports mean latency,
+speedup, and recall of the fast boxes against the full-resolution boxes
+(IoU >= 0.5).
+
+Usage:
+    python benchmarks/benchmark_fast_detect.py <fixture_dir> [--backend retinaface]
+        [--sizes 640 1024 1600] [--refine]
+"""
+
+import argparse
+import time
+
+from unlabeled_media_tagger.pipeline.detect_faces import (
+    detect_faces_in_image,
+    get_detector,
+    load_image,
+)
+from unlabeled_media_tagger.utils.bbox import match_detections
+from unlabeled_media_tagger.utils.file_utils import get_media_files, is_image_file
+
+
+def timed_detect(image, backend, detect_size=None, refine=False):
+    """Run one detection and return (detections, seconds)."""
+    start = time.perf_counter()
+    detections = detect_faces_in_image(image, backend, detect_size=detect_size, refine=refine)
+    return detections, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("fixture_dir", help="Directory of test images")
+    parser.add_argument("--backend", default="retinaface")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[640, 1024, 1600])
+    parser.add_argument("--refine", action="store_true",
+                        help="Also benchmark fast detection with full-resolution refinement")
+    args = parser.parse_args()
+
+    paths = [p for p in get_media_files(args.fixture_dir) if is_image_file(p)]
+    if not paths:
+        raise SystemExit(f"No images found in {args.fixture_dir}")
+
+    detector = get_detector(args.backend)
+    print(f"Backend {args.backend}: load {detector.load_time_sec:.2f}s, "
+          f"warm-up {detector.warmup_time_sec:.2f}s, {len(paths)} image(s)\n")
+
+    # Decode once up front so only detection time is measured
+    images = [load_image(p) for p in paths]
+
+    modes = [("full", None, False)]
+    for size in args.sizes:
+        modes.append((f"fast-{size}", size, False))
+        if args.refine:
+            modes.append((f"fast-{size}+refine", size, True))
+
+    reference = []
+    results = {}
+    for name, size, refine in modes:
+        total_time = 0.0
+        matched = 0
+        for i, image in enumerate(images):
+            detections, seconds = timed_detect(image, args.backend, size, refine)
+            total_time += seconds
+            if size is None:
+                reference.append(detections)
+            else:
+                matched += match_detections(detections, reference[i])
+        results[name] = (total_time / len(images), matched)
+
+    total_faces = sum(len(r) for r in reference)
+    full_time = results["full"][0]
+    print(f"{'mode':<20}{'ms/image':>12}{'speedup':>10}{'recall':>10}")
+    for name, (mean_time, matched) in results.items():
+        recall = 1.0 if name == "full" or total_faces == 0 else matched / total_faces
+        speedup = full_time / mean_time if mean_time > 0 else float("inf")
+        print(f"{name:<20}{mean_time * 1000:>12.1f}{speedup:>9.2f}x{recall:>10.3f}")
+    print(f"\nReference faces (full resolution): {total_faces}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark quantized face database codes against float32 vectors.
+
+Builds a synthetic collection of clustered embeddings and an IVF index per
+storage mode (float32, sq8, pq, pq with float re-ranking), then reports
+bytes per face, recall@k against exact float32 search, how often the top
+match has the same identity as the exact top match, and query throughput.
+
+Usage:
+    python benchmarks/benchmark_quantization.py [--faces 200000] [--dim 512] [--queries 1000]
+        [--k 10] [--nprobe 8] [--subspaces 64] [--rerank 4] [--metric cosine]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from unlabeled_media_tagger.pipeline.ann_index import IVFIndex
+from unlabeled_media_tagger.pipeline.similarity import SimilarityEngine
+
+
+def synthetic_faces(count, dim, identities, rng):
+    """Noisy embeddings around random identity centers, with their identities."""
+    centers = rng.normal(size=(identities, dim)).astype(np.float32)
+    labels = rng.integers(0, identities, count)
+    return centers[labels] + 0.35 * rng.normal(size=(count, dim)).astype(np.float32), labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--faces", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--subspaces", type=int, default=None)
+    parser.add_argument("--rerank", type=int, default=4)
+    parser.add_argument("--metric", default="cosine", choices=["cosine", "l2"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    identities = max(1, args.faces // 50)
+    faces, labels = synthetic_faces(args.faces + args.queries, args.dim, identities, rng)
+    database, queries = faces[:args.faces], faces[args.faces:]
+    labels = labels[:args.faces]
+
+    exact = [ids for ids, _ in SimilarityEngine(args.metric).search(queries, database, k=args.k)]
+    exact_top = labels[[ids[0] for ids in exact]]
+    print(f"{args.faces} faces x {args.dim}d, {args.queries} queries, k={args.k}, nprobe={args.nprobe}\n")
+
+    modes = [("float32", None, 0), ("sq8", "sq8", 0), ("pq", "pq", 0),
+             (f"pq+rerank{args.rerank}", "pq", args.rerank)]
+    # A fixed nlist trains the same cells in every mode, so only the storage differs
+    nlist = max(1, int(np.sqrt(args.faces)))
+    print(f"{'mode':<14}{'bytes/face':>11}{'build s':>9}{'recall@k':>10}{'same id':>9}{'queries/s':>11}")
+    for name, quantizer, rerank in modes:
+        index = IVFIndex(args.dim, nlist=nlist, metric=args.metric, quantizer=quantizer,
+                         subspaces=args.subspaces, rerank=rerank)
+        start = time.perf_counter()
+        index.add(database)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found, _ = index.search(queries, args.k, nprobe=args.nprobe)
+        rate = args.queries / (time.perf_counter() - start)
+        recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(found, exact)])
+        same = np.mean(labels[found[:, 0]] == exact_top)
+        code_bytes = index.quantizer.code_size if index.is_quantized else args.dim * 4
+        stored = code_bytes + (args.dim * 4 if index.is_quantized and rerank else 0)
+        print(f"{name:<14}{stored:>11}{build:>9.1f}{recall:>10.4f}{same:>9.4f}{rate:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
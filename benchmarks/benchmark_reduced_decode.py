@@ -0,0 +1,67 @@
+"""
+Benchmark reduced-resolution JPEG decoding against full decoding.
+
+For every JPEG in a fixture directory this decodes the image at full
+resolution and at the reduced scale chosen for each detection size, then
+reports mean decode time and mean decoded bitmap size (a proxy for peak
+decode memory).
+
+Usage:
+    python benchmarks/benchmark_reduced_decode.py <fixture_dir> [--sizes 640 1024] [--repeat 3]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+
+from unlabeled_media_tagger.utils.file_utils import get_media_files
+from unlabeled_media_tagger.utils.image_decode import decode_reduced
+
+
+def timed(decode, repeat):
+    """Return (image, best seconds) over repeat decodes."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        image = decode()
+        best = min(best, time.perf_counter() - start)
+    return image, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("fixture_dir", help="Directory of JPEG images")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[640, 1024])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    paths = [p for p in get_media_files(args.fixture_dir)
+             if Path(p).suffix.lower() in (".jpg", ".jpeg")]
+    if not paths:
+        raise SystemExit(f"No JPEG images found in {args.fixture_dir}")
+
+    modes = [("full", None)] + [(f"reduced-{size}", size) for size in args.sizes]
+    print(f"{len(paths)} image(s), best of {args.repeat}\n")
+    print(f"{'mode':<16}{'decode ms':>12}{'bitmap MB':>12}{'speedup':>10}")
+
+    baseline = None
+    for name, size in modes:
+        total_sec = 0.0
+        total_bytes = 0
+        for path in paths:
+            if size is None:
+                image, seconds = timed(lambda: cv2.imread(path), args.repeat)
+            else:
+                (image, _), seconds = timed(lambda: decode_reduced(path, size), args.repeat)
+            total_sec += seconds
+            total_bytes += image.nbytes
+        mean_ms = total_sec / len(paths) * 1000
+        baseline = baseline or mean_ms
+        print(f"{name:<16}{mean_ms:>12.1f}{total_bytes / len(paths) / 1e6:>12.1f}"
+              f"{baseline / mean_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
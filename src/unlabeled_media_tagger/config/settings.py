@@ -5,6 +5,28 @@ This module defines configuration structure for all pipeline stages.
 """
 
 
+def get_option(config, name, default=None):
+    """
+    Read a setting from a stage configuration.
+    
+    Stages accept either a plain dictionary or one of the configuration
+    objects defined in this module, so both access styles are supported.
+    
+    Args:
+        config: Configuration dictionary or configuration object
+        name: Setting name
+        default: Value returned when the setting is missing or None
+        
+    Returns:
+        The configured value, or default
+    """
+    if isinstance(config, dict):
+        value = config.get(name)
+    else:
+        value = getattr(config, name, None)
+    return default if value is None else value
+
+
 class Config:
     """
     Main configuration class for the application.
@@ -59,6 +81,25 @@ class ModelConfig:
         self.face_recognition_model = None  # Path to face recognition model
         self.object_detection_model = None  # Path to object detection model
         self.detection_threshold = 0.7  # Confidence threshold for detections
+        self.detector_backend = "retinaface"  # DeepFace face detector backend
+        self.fast_detect_size = None  # Longest side for downscaled detection (None = full resolution)
+        self.fast_detect_refine = False  # Refine downscaled detections at full resolution
+        self.cascade_prefilter_backend = None  # Cheap backend screening images first (e.g. "opencv")
+        self.cascade_prefilter = False  # Screen with detector_backend on a downscaled copy when no prefilter backend is set
+        self.cascade_prefilter_size = 640  # Longest image side for the prefilter pass
+        self.cascade_regions = False  # Run detector_backend on prefilter regions only
+        self.similarity_metric = "cosine"  # Face embedding comparison: cosine or l2
+        self.similarity_threshold = 0.7  # Min cosine similarity (or max L2 distance) for two faces to match
+        self.similarity_dtype = "float32"  # Embedding precision for comparison: float32 or float16
+        self.similarity_block_size = 2048  # Embeddings compared per block (bounds memory)
+        self.clustering_method = "components"  # Face clustering: components, chinese_whispers or dbscan
+        self.clustering_workers = 1  # Processes building the similarity graph (None = all cores)
+        self.clustering_min_samples = 2  # DBSCAN: faces (itself included) needed around a core face
+        self.ann_nlist = None  # Face database index cells (None = about sqrt of the face count)
+        self.ann_nprobe = 8  # Index cells scanned per lookup (higher = better recall, slower)
+        self.ann_quantizer = None  # Compress face database embeddings: sq8, pq or None (float)
+        self.ann_pq_subspaces = None  # Bytes per face with pq (None = dimension / 8)
+        self.ann_rerank = 0  # Re-score rerank * k quantized matches with kept float vectors (0 = off)
         self.device = "cpu"  # Device to run models on (cpu, cuda, mps)
 
 
@@ -70,4 +111,15 @@ class PipelineConfig:
         self.batch_size = 10  # Number of files to process in a batch
         self.frame_interval = 1.0  # Seconds between frame extractions for videos
         self.max_frames = 100  # Maximum frames to extract per video
+        self.sampling_strategy = "auto"  # Frame sampling: auto, grab, seek or read
+        self.detect_workers = 1  # Detection threads in the video pipeline
+        self.queue_size = 4  # Batches buffered between video pipeline stages
+        self.dedup_threshold = None  # Reuse detections for near-identical frames (0-255, None = off)
+        self.dedup_max_reuse = None  # Detect anyway after this many consecutive reused frames (None = no limit)
+        self.track_faces = False  # Link faces across sampled video frames into tracks
+        self.output_mode = "frames"  # Video output: frames (JPEGs), video (one file) or timeline (NDJSON)
+        self.jpeg_quality = 95  # JPEG quality of annotated images (0-100)
+        self.png_compression = 3  # PNG compression level of annotated images (0-9)
+        self.writer_threads = 2  # Background threads encoding annotated images
+        self.frame_memory_budget_mb = 256  # Decoded frames buffered ahead during extraction (MB)
         self.output_dir = "./output"  # Directory for processed outputs
@@ -0,0 +1,507 @@
+"""
+Approximate Nearest-Neighbor Index Module
+
+This module provides an inverted-file (IVF) index over face embeddings,
+implemented with NumPy. k-means splits the embedding space into nlist
+cells; every vector is stored in the list of its nearest centroid, and a
+query only scans the nprobe lists whose centroids are closest to it. A
+search therefore costs about nlist + N * nprobe / nlist comparisons
+instead of N, and nprobe trades recall for latency (nprobe = nlist is an
+exact search).
+
+The index supports insert, delete by id, and saving to / loading from a
+single .npz file. With nlist left to the index, it retrains itself on its
+own contents as it grows, so lists stay short.
+
+Lists can hold quantized codes (see quantization) instead of float
+vectors. Codes are scored directly, and the best rerank * k candidates
+can be re-scored with kept float vectors.
+"""
+
+import json
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .similarity import SimilarityEngine
+
+
+def kmeans(
+    data: np.ndarray,
+    k: int,
+    metric: str = 'cosine',
+    iterations: int = 20,
+    seed: int = 0,
+    sample_size: Optional[int] = None
+) -> np.ndarray:
+    """
+    Cluster vectors with Lloyd's k-means.
+
+    Assignment uses the blocked SimilarityEngine, so memory stays bounded.
+    With the cosine metric centroids are renormalized (spherical k-means).
+
+    Args:
+        data: Array of shape (N, D)
+        k: Number of centroids (capped at N)
+        metric: 'cosine' or 'l2'
+        iterations: Maximum Lloyd iterations
+        seed: Random seed for initialization and sampling
+        sample_size: Train on at most this many random vectors (None = all)
+
+    Returns:
+        float32 centroids of shape (k, D)
+    """
+    rng = np.random.default_rng(seed)
+    engine = SimilarityEngine(metric)
+    data = engine.prepare(data)
+    if sample_size and len(data) > sample_size:
+        data = data[rng.choice(len(data), sample_size, replace=False)]
+    k = max(1, min(k, len(data)))
+    centroids = data[rng.choice(len(data), k, replace=False)].astype(np.float32)
+
+    previous = None
+    for _ in range(iterations):
+        labels = assign(data, centroids, metric)
+        if previous is not None and np.array_equal(labels, previous):
+            break
+        previous = labels
+        order = np.argsort(labels, kind='stable')
+        counts = np.bincount(labels, minlength=k)
+        present = np.flatnonzero(counts)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[present]
+        sums = np.add.reduceat(data[order].astype(np.float32), starts, axis=0)
+        centroids[present] = sums / counts[present, None]
+        # Re-seed empty cells with random vectors
+        empty = np.flatnonzero(counts == 0)
+        if empty.size:
+            centroids[empty] = data[rng.choice(len(data), empty.size, replace=False)]
+        if metric == 'cosine':
+            centroids = engine.prepare(centroids).astype(np.float32)
+    return centroids
+
+
+def assign(data: np.ndarray, centroids: np.ndarray, metric: str = 'cosine', block_size: int = 4096) -> np.ndarray:
+    """
+    Return the index of the closest centroid for each vector.
+
+    Args:
+        data: Array of shape (N, D)
+        centroids: Array of shape (K, D)
+        metric: 'cosine' or 'l2'
+        block_size: Vectors scored per block
+
+    Returns:
+        int64 array of N centroid indices
+    """
+    engine = SimilarityEngine(metric)
+    labels = np.empty(len(data), dtype=np.int64)
+    for start in range(0, len(data), block_size):
+        scores = engine.scores(data[start:start + block_size], centroids)
+        labels[start:start + block_size] = scores.argmax(axis=1) if metric == 'cosine' else scores.argmin(axis=1)
+    return labels
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest-neighbor index.
+
+    Vectors are identified by integer ids chosen by the caller (or assigned
+    sequentially). Search results are (ids, scores) arrays of shape (Q, k),
+    padded with id -1 where fewer than k vectors were found.
+    """
+
+    # Retrain once the index holds this many times nlist squared vectors
+    _GROWTH_FACTOR = 4
+
+    # Vectors needed before a quantizer is trained and codes replace vectors
+    QUANTIZE_AFTER = 1024
+
+    def __init__(
+        self,
+        dim: int,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        metric: str = 'cosine',
+        dtype: str = 'float32',
+        quantizer: Optional[str] = None,
+        subspaces: Optional[int] = None,
+        rerank: int = 0
+    ):
+        """
+        Initialize an empty, untrained index.
+
+        Args:
+            dim: Embedding dimension
+            nlist: Number of k-means cells, or None to use about sqrt(N) and
+                   retrain automatically as the index grows
+            nprobe: Cells scanned per query; higher is more accurate and slower
+            metric: 'cosine' or 'l2'
+            dtype: Storage dtype of vectors, 'float32' or 'float16'
+            quantizer: Store 'sq8' or 'pq' codes instead of float vectors
+                       (None = float vectors). Vectors stay in float until
+                       the index holds QUANTIZE_AFTER of them, which are
+                       then used to train the quantizer once.
+            subspaces: pq bytes per vector (default: dim / 8)
+            rerank: With a quantizer, keep float vectors too and re-score
+                    the best rerank * k code matches with them (0 = off)
+
+        Raises:
+            ValueError: If quantizer or subspaces is invalid
+        """
+        self.dim = dim
+        self.auto_nlist = nlist is None
+        # The configured cell count; nlist is what the centroids actually
+        # have, fewer while the index holds fewer vectors than requested
+        self.requested_nlist = nlist
+        self.nlist = nlist or 1
+        self.nprobe = nprobe
+        self.engine = SimilarityEngine(metric, dtype)
+        self.centroids: Optional[np.ndarray] = None
+        self.rerank = rerank
+        self.quantizer = None
+        if quantizer is not None:
+            # Imported here: quantization builds on kmeans() above
+            from .quantization import make_quantizer
+            self.quantizer = make_quantizer(quantizer, dim, subspaces)
+        self.quantizer_kind = quantizer
+
+        self._vectors: List[Optional[np.ndarray]] = []
+        self._codes: List[Optional[np.ndarray]] = []
+        self._ids: List[np.ndarray] = []
+        self._sizes: List[int] = []
+        self._where: Dict[int, Tuple[int, int]] = {}
+        self._next_id = 0
+
+    @property
+    def metric(self) -> str:
+        return self.engine.metric
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    @property
+    def is_quantized(self) -> bool:
+        """Whether lists currently hold codes."""
+        return self.quantizer is not None and self.quantizer.is_trained
+
+    @property
+    def _keeps_vectors(self) -> bool:
+        return not self.is_quantized or self.rerank > 0
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, vector_id: int) -> bool:
+        return int(vector_id) in self._where
+
+    def train(self, vectors, nlist: Optional[int] = None, seed: int = 0) -> None:
+        """
+        Learn the cell centroids and redistribute stored vectors.
+
+        Args:
+            vectors: Training vectors of shape (N, D)
+            nlist: Number of cells (default: the requested nlist, or about
+                   sqrt(N) when nlist is automatic); at most N cells are made
+            seed: Random seed
+        """
+        vectors = np.asarray(vectors)
+        if nlist is None:
+            nlist = max(1, int(math.sqrt(len(vectors)))) if self.auto_nlist else self.requested_nlist
+        self.centroids = kmeans(vectors, nlist, self.metric, seed=seed, sample_size=256 * nlist)
+        self.nlist = len(self.centroids)
+
+        stored_vectors, stored_ids, stored_codes = self._all()
+        self._reset_lists()
+        if len(stored_ids):
+            self._insert(stored_vectors, stored_ids, stored_codes)
+
+    def _reset_lists(self) -> None:
+        self._vectors = [np.empty((0, self.dim), dtype=self.engine.dtype) if self._keeps_vectors else None
+                         for _ in range(self.nlist)]
+        self._codes = [np.empty((0, self.quantizer.code_size), dtype=np.uint8) if self.is_quantized else None
+                       for _ in range(self.nlist)]
+        self._ids = [np.empty(0, dtype=np.int64) for _ in range(self.nlist)]
+        self._sizes = [0] * self.nlist
+        self._where = {}
+
+    def _all(self) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """
+        Return every stored vector, id and code.
+
+        Without kept float vectors, the vectors are decoded from the codes.
+        """
+        sizes = self._sizes
+        if not self._where:
+            vectors = np.empty((0, self.dim), dtype=self.engine.dtype)
+            codes = np.empty((0, self.quantizer.code_size), dtype=np.uint8) if self.is_quantized else None
+            return vectors, np.empty(0, dtype=np.int64), codes
+        ids = np.concatenate([i[:n] for i, n in zip(self._ids, sizes)])
+        codes = np.concatenate([c[:n] for c, n in zip(self._codes, sizes)]) if self.is_quantized else None
+        if self._keeps_vectors:
+            vectors = np.concatenate([v[:n] for v, n in zip(self._vectors, sizes)])
+        else:
+            vectors = self.quantizer.decode(codes)
+        return vectors, ids, codes
+
+    def _quantize(self) -> None:
+        """Train the quantizer on the stored vectors and replace them with codes."""
+        vectors, ids, _ = self._all()
+        self.quantizer.train(vectors)
+        self._reset_lists()
+        self._insert(vectors, ids)
+
+    def _insert(self, prepared: np.ndarray, ids: np.ndarray, codes: Optional[np.ndarray] = None) -> None:
+        if self.is_quantized and codes is None:
+            codes = self.quantizer.encode(prepared)
+        lists = assign(prepared, self.centroids, self.metric)
+        order = np.argsort(lists, kind='stable')
+        counts = np.bincount(lists, minlength=self.nlist)
+        position = 0
+        for cell in np.flatnonzero(counts):
+            chosen = order[position:position + counts[cell]]
+            position += counts[cell]
+            size = self._sizes[cell]
+            needed = size + len(chosen)
+            if needed > len(self._ids[cell]):
+                # Grow geometrically so repeated inserts stay amortized O(1)
+                capacity = max(needed, 2 * len(self._ids[cell]), 16)
+                self._vectors[cell] = _grown(self._vectors[cell], size, capacity)
+                self._codes[cell] = _grown(self._codes[cell], size, capacity)
+                self._ids[cell] = _grown(self._ids[cell], size, capacity)
+            if self._vectors[cell] is not None:
+                self._vectors[cell][size:needed] = prepared[chosen]
+            if self._codes[cell] is not None:
+                self._codes[cell][size:needed] = codes[chosen]
+            self._ids[cell][size:needed] = ids[chosen]
+            self._sizes[cell] = needed
+            for offset, vector_id in enumerate(ids[chosen].tolist(), start=size):
+                self._where[vector_id] = (int(cell), offset)
+
+    def add(self, vectors, ids: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        Insert vectors, training the index first if needed.
+
+        Args:
+            vectors: Array of shape (N, D)
+            ids: One id per vector (default: sequential ids)
+
+        Returns:
+            The ids of the inserted vectors
+
+        Raises:
+            ValueError: If an id is already in the index
+        """
+        prepared = self.engine.prepare(vectors)
+        if ids is None:
+            ids = np.arange(self._next_id, self._next_id + len(prepared), dtype=np.int64)
+        ids = np.asarray(ids, dtype=np.int64)
+        duplicates = [int(i) for i in ids if int(i) in self._where]
+        if duplicates or len(np.unique(ids)) != len(ids):
+            raise ValueError(f"Ids already in the index: {duplicates[:5]}")
+        if len(ids):
+            self._next_id = max(self._next_id, int(ids.max()) + 1)
+
+        if not self.is_trained:
+            self.train(prepared)
+        self._insert(prepared, ids)
+
+        if self.quantizer is not None and not self.is_quantized and len(self) >= self.QUANTIZE_AFTER:
+            self._quantize()
+        if self.auto_nlist and len(self) >= self._GROWTH_FACTOR * self.nlist ** 2:
+            self.train(self._all()[0])
+        elif not self.auto_nlist and self.nlist < self.requested_nlist <= len(self):
+            # A first batch smaller than nlist capped the cells; retrain on
+            # everything once there are enough vectors for all of them
+            self.train(self._all()[0])
+        return ids
+
+    def remove(self, ids: Sequence[int]) -> int:
+        """
+        Delete vectors by id; unknown ids are ignored.
+
+        Returns:
+            Number of vectors removed
+        """
+        removed = 0
+        for vector_id in ids:
+            location = self._where.pop(int(vector_id), None)
+            if location is None:
+                continue
+            cell, offset = location
+            last = self._sizes[cell] - 1
+            if offset != last:
+                # Move the cell's last vector into the hole
+                for stored in (self._vectors[cell], self._codes[cell]):
+                    if stored is not None:
+                        stored[offset] = stored[last]
+                moved_id = int(self._ids[cell][last])
+                self._ids[cell][offset] = moved_id
+                self._where[moved_id] = (cell, offset)
+            self._sizes[cell] = last
+            removed += 1
+        return removed
+
+    def get(self, vector_id: int) -> np.ndarray:
+        """Return the stored (prepared) vector for an id, decoded if only its code is kept."""
+        cell, offset = self._where[int(vector_id)]
+        if self._vectors[cell] is None:
+            return self.quantizer.decode(self._codes[cell][offset:offset + 1])[0]
+        return self._vectors[cell][offset]
+
+    def _cell_scores(self, queries: np.ndarray, cell: int) -> np.ndarray:
+        size = self._sizes[cell]
+        if self.is_quantized:
+            return self.quantizer.scores(queries, self._codes[cell][:size], self.metric)
+        return self.engine.scores(queries, self._vectors[cell][:size])
+
+    def _rerank(self, queries: np.ndarray, ids: np.ndarray, scores: np.ndarray) -> np.ndarray:
+        """Replace code scores of candidate ids with exact float scores."""
+        found = ids >= 0
+        locations = np.array([self._where[i] for i in ids[found].tolist()], dtype=np.int64).reshape(-1, 2)
+        vectors = np.empty((len(locations), self.dim), dtype=np.float32)
+        for cell in np.unique(locations[:, 0]):
+            rows = locations[:, 0] == cell
+            vectors[rows] = self._vectors[cell][locations[rows, 1]]
+        candidates = queries[np.nonzero(found)[0]].astype(np.float32)
+        products = np.einsum('ij,ij->i', candidates, vectors)
+        if self.metric == 'cosine':
+            exact = products
+        else:
+            squared = (candidates ** 2).sum(axis=1) + (vectors ** 2).sum(axis=1) - 2.0 * products
+            exact = np.sqrt(np.maximum(squared, 0.0))
+        scores = scores.copy()
+        scores[found] = exact
+        return scores
+
+    def search(self, queries, k: int = 10, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find approximately the k closest vectors to each query.
+
+        Queries are grouped by probed cell, so each cell is scored with one
+        matrix product for all the queries that probe it.
+
+        Args:
+            queries: Array of shape (Q, D)
+            k: Neighbors per query
+            nprobe: Cells scanned per query (default: self.nprobe)
+
+        Returns:
+            (ids, scores), each of shape (Q, k), closest first; missing
+            neighbors have id -1 and a NaN score
+        """
+        prepared = self.engine.prepare(queries)
+        count = len(prepared)
+        final_k = k
+        if self.is_quantized and self.rerank > 0:
+            k *= self.rerank
+        best_ids = np.full((count, k), -1, dtype=np.int64)
+        worst = -np.inf if self.metric == 'cosine' else np.inf
+        best_scores = np.full((count, k), worst, dtype=np.float32)
+        if not self.is_trained or not len(self):
+            return best_ids, np.full((count, k), np.nan, dtype=np.float32)
+
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        centroid_scores = self.engine.scores(prepared, self.centroids)
+        key = -centroid_scores if self.metric == 'cosine' else centroid_scores
+        probes = np.argpartition(key, nprobe - 1, axis=1)[:, :nprobe] if nprobe < self.nlist \
+            else np.broadcast_to(np.arange(self.nlist), (count, self.nlist))
+
+        probe_queries = np.repeat(np.arange(count), probes.shape[1])
+        probe_cells = probes.ravel()
+        order = np.argsort(probe_cells, kind='stable')
+        cells, starts = np.unique(probe_cells[order], return_index=True)
+        bounds = np.append(starts, len(order))
+        for cell, start, end in zip(cells, bounds[:-1], bounds[1:]):
+            size = self._sizes[cell]
+            if not size:
+                continue
+            rows = probe_queries[order[start:end]]
+            scores = self._cell_scores(prepared[rows], cell)
+            merged_scores = np.hstack([best_scores[rows], scores])
+            merged_ids = np.hstack([best_ids[rows], np.broadcast_to(self._ids[cell][:size], scores.shape)])
+            merged_key = -merged_scores if self.metric == 'cosine' else merged_scores
+            keep = np.argpartition(merged_key, k - 1, axis=1)[:, :k] if merged_key.shape[1] > k \
+                else np.argsort(merged_key, axis=1)
+            best_scores[rows] = np.take_along_axis(merged_scores, keep, axis=1)
+            best_ids[rows] = np.take_along_axis(merged_ids, keep, axis=1)
+
+        if k != final_k:
+            best_scores = self._rerank(prepared, best_ids, best_scores)
+        final_key = -best_scores if self.metric == 'cosine' else best_scores
+        order = np.argsort(final_key, axis=1, kind='stable')[:, :final_k]
+        best_ids = np.take_along_axis(best_ids, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_scores[best_ids < 0] = np.nan
+        return best_ids, best_scores
+
+    def save(self, path: str) -> None:
+        """
+        Save the index to a .npz file.
+
+        Args:
+            path: Output file path
+        """
+        vectors, ids, codes = self._all()
+        settings = {
+            'dim': self.dim,
+            'nlist': self.requested_nlist,
+            'nprobe': self.nprobe,
+            'metric': self.metric,
+            'dtype': self.engine.dtype.name,
+            'quantizer': self.quantizer_kind,
+            'subspaces': getattr(self.quantizer, 'subspaces', None),
+            'rerank': self.rerank,
+            'next_id': self._next_id,
+        }
+        arrays = {'ids': ids, 'settings': np.array(json.dumps(settings))}
+        if self._keeps_vectors:
+            arrays['vectors'] = vectors
+        if self.is_quantized:
+            arrays['codes'] = codes
+            arrays.update({f'quantizer_{name}': value for name, value in self.quantizer.state().items()})
+        if self.is_trained:
+            arrays['centroids'] = self.centroids
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        """
+        Load an index saved with save().
+
+        Args:
+            path: .npz file path
+
+        Returns:
+            IVFIndex with the same settings, centroids and contents
+        """
+        with np.load(path) as data:
+            settings = json.loads(str(data['settings']))
+            index = cls(settings['dim'], settings['nlist'], settings['nprobe'],
+                        settings['metric'], settings['dtype'], settings.get('quantizer'),
+                        settings.get('subspaces'), settings.get('rerank', 0))
+            index._next_id = settings['next_id']
+            if 'codes' in data:
+                index.quantizer.load_state({
+                    name[len('quantizer_'):]: data[name] for name in data.files if name.startswith('quantizer_')
+                })
+            if 'centroids' in data:
+                index.centroids = data['centroids']
+                index.nlist = len(index.centroids)
+                index._reset_lists()
+                if len(data['ids']):
+                    codes = data['codes'] if 'codes' in data else None
+                    vectors = data['vectors'] if 'vectors' in data else index.quantizer.decode(codes)
+                    index._insert(vectors, data['ids'], codes)
+        return index
+
+
+def _grown(array: Optional[np.ndarray], size: int, capacity: int) -> Optional[np.ndarray]:
+    """Copy the first size rows of array into a new array of capacity rows."""
+    if array is None:
+        return None
+    grown = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+    grown[:size] = array[:size]
+    return grown
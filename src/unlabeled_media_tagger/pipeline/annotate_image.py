@@ -2,45 +2,41 @@
 Image Annotation Module
 
 This module provides functionality to annotate images with face detection bounding boxes.
+
+Annotated images can be handed to an AsyncImageWriter, a small background
+thread pool, so that JPEG/PNG encoding and file I/O overlap with detection
+instead of blocking it.
 """
 
 import sys
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterable, Optional, Sequence
 import cv2
+import numpy as np
 
-from .detect_faces import detect_faces_in_image
+from .detect_faces import ImageInput, detect_faces_in_image, load_image
+from ..config.settings import PipelineConfig
+from ..utils.image_writer import AsyncImageWriter, encode_params
 
 
-def annotate_image(
-    image_path: str,
-    detections: List[Dict],
-    output_path: str
-) -> None:
+# Label style shared by every drawn detection
+_FONT = cv2.FONT_HERSHEY_SIMPLEX
+_FONT_SCALE = 0.5
+_BOX_COLOR = (0, 255, 0)
+_TEXT_COLOR = (0, 0, 0)
+
+
+def draw_detections(image: np.ndarray, detections: Iterable[Dict]) -> np.ndarray:
     """
-    Annotate an image with bounding boxes for detected faces.
+    Draw bounding boxes and confidence labels onto an image in place.
     
     Args:
-        image_path: Path to the input image file
-        detections: List of face detections from detect_faces_in_image()
-                   Each detection should have 'bbox' (x, y, w, h) and 'confidence'
-        output_path: Path where the annotated image will be saved
+        image: BGR image array; it is modified in place
+        detections: Detections with 'bbox' (x, y, w, h) and 'confidence'
     
-    Raises:
-        FileNotFoundError: If image_path does not exist
-        ValueError: If image cannot be loaded
+    Returns:
+        The same image array, for convenience
     """
-    # Verify image exists
-    img_path = Path(image_path)
-    if not img_path.exists():
-        raise FileNotFoundError(f"Image not found: {image_path}")
-    
-    # Load image
-    image = cv2.imread(str(image_path))
-    if image is None:
-        raise ValueError(f"Failed to load image: {image_path}")
-    
-    # Draw bounding boxes for each detection
     for detection in detections:
         bbox = detection['bbox']
         confidence = detection['confidence']
@@ -52,7 +48,7 @@ def annotate_image(
         h = int(bbox['h'])
         
         # Draw rectangle (green color, 2px thickness)
-        cv2.rectangle(image, (x, y), (x + w, y + h), (0, 255, 0), 2)
+        cv2.rectangle(image, (x, y), (x + w, y + h), _BOX_COLOR, 2)
         
         # Draw confidence score text
         confidence_text = f"{confidence:.2f}"
@@ -60,12 +56,12 @@ def annotate_image(
         text_y = y - 10 if y - 10 > 10 else y + h + 20
         
         # Add background rectangle for better text visibility
-        text_size = cv2.getTextSize(confidence_text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0]
+        text_size = cv2.getTextSize(confidence_text, _FONT, _FONT_SCALE, 1)[0]
         cv2.rectangle(
             image, 
             (x, text_y - text_size[1] - 4), 
             (x + text_size[0], text_y + 4), 
-            (0, 255, 0), 
+            _BOX_COLOR, 
             -1
         )
         
@@ -74,31 +70,101 @@ def annotate_image(
             image,
             confidence_text,
             (x, text_y),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.5,
-            (0, 0, 0),
+            _FONT,
+            _FONT_SCALE,
+            _TEXT_COLOR,
             1,
             cv2.LINE_AA
         )
+    return image
+
+
+def annotate_batch(
+    images: Sequence[np.ndarray],
+    detections: Sequence[Iterable[Dict]],
+    output_paths: Sequence[str],
+    writer: AsyncImageWriter
+) -> None:
+    """
+    Annotate a batch of decoded images in place and queue them for writing.
+    
+    Args:
+        images: Decoded BGR image arrays; drawn on in place, without copies
+        detections: One list of detections per image
+        output_paths: One output file per image
+        writer: AsyncImageWriter that encodes and writes the images
+    
+    Raises:
+        ValueError: If the three sequences differ in length
+    """
+    if not len(images) == len(detections) == len(output_paths):
+        raise ValueError("images, detections and output_paths must have the same length")
+    for image, image_detections, output_path in zip(images, detections, output_paths):
+        writer.submit(draw_detections(image, image_detections), output_path)
+
+
+def annotate_image(
+    image_path: ImageInput,
+    detections: Iterable[Dict],
+    output_path: str,
+    writer: Optional[AsyncImageWriter] = None,
+    jpeg_quality: int = 95,
+    png_compression: int = 3
+) -> None:
+    """
+    Annotate an image with bounding boxes for detected faces.
+    
+    Without a writer the image is saved synchronously; with one it is queued
+    for background encoding, with the writer's own encoding settings, and
+    this call returns immediately.
+    
+    Args:
+        image_path: Path to the input image file, or a decoded BGR image array.
+                   Arrays are drawn on in place (no copy), so pass a copy if
+                   the original pixels are still needed afterwards.
+        detections: List of face detections from detect_faces_in_image(), or a
+                   DetectionResults (which iterates as the same dicts)
+                   Each detection should have 'bbox' (x, y, w, h) and 'confidence'
+        output_path: Path where the annotated image will be saved
+        writer: Optional AsyncImageWriter to encode and save in the background
+        jpeg_quality: JPEG quality of a synchronous save, 0-100 (default: 95)
+        png_compression: PNG compression level of a synchronous save, 0-9
+                         (default: 3)
+    
+    Raises:
+        FileNotFoundError: If image_path does not exist
+        ValueError: If image cannot be loaded
+    """
+    # Load image (arrays are used directly)
+    image = load_image(image_path)
+    
+    # Draw bounding boxes for each detection
+    draw_detections(image, detections)
+    
+    if writer is not None:
+        writer.submit(image, output_path)
+        return
     
     # Create output directory if it doesn't exist
     output_dir = Path(output_path).parent
     output_dir.mkdir(parents=True, exist_ok=True)
     
     # Save annotated image
-    cv2.imwrite(str(output_path), image)
+    cv2.imwrite(str(output_path), image, encode_params(str(output_path), jpeg_quality, png_compression))
     print(f"Annotated image saved to: {output_path}")
 
 
 def main():
     """CLI entry point for image annotation."""
     if len(sys.argv) < 2:
-        print("Usage: python -m unlabeled_media_tagger.pipeline.annotate_image <image_path> [detector_backend]")
+        print("Usage: python -m unlabeled_media_tagger.pipeline.annotate_image <image_path> [detector_backend] [detect_size]")
         print("\nDetector backends: retinaface (default), mtcnn, opencv, ssd, dlib, mediapipe")
+        print("detect_size: longest side to detect at; JPEGs are decoded at a reduced scale")
         sys.exit(1)
     
     image_path = sys.argv[1]
     detector_backend = sys.argv[2] if len(sys.argv) > 2 else "retinaface"
+    detect_size = int(sys.argv[3]) if len(sys.argv) > 3 else None
     
     # Verify input image
     img_path = Path(image_path)
@@ -112,7 +178,7 @@ def main():
     try:
         # Detect faces
         print("Detecting faces...")
-        detections = detect_faces_in_image(image_path, detector_backend)
+        detections = detect_faces_in_image(image_path, detector_backend, detect_size=detect_size)
         print(f"Detected {len(detections)} face(s)\n")
         
         if len(detections) == 0:
@@ -135,7 +201,12 @@ def main():
         
         # Annotate image
         print("Annotating image...")
-        annotate_image(image_path, detections, str(output_path))
+        defaults = PipelineConfig()
+        annotate_image(
+            image_path, detections, str(output_path),
+            jpeg_quality=defaults.jpeg_quality,
+            png_compression=defaults.png_compression
+        )
         
         print(f"\n✓ Successfully annotated {len(detections)} face(s)")
         
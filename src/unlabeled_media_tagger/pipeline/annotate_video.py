@@ -4,136 +4,532 @@ Video Face Annotation Module
 This module provides functionality to annotate videos with face detection by sampling frames.
 """
 
+import argparse
 import sys
-import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 import cv2
+import numpy as np
 
-from .detect_faces import detect_faces_in_image
-from .annotate_image import annotate_image
+from .checkpoint import VideoCheckpoint
+from .detect_faces import CascadeStats, detect_faces_batch
+from .frame_gate import FrameGate
+from .frame_sampler import FrameSampler
+from .tracking import IoUTracker
+from .video_outputs import OUTPUT_MODES, create_output, default_output_path
+from .video_pipeline import VideoPipeline, format_stage_report
+from ..config.settings import PipelineConfig
+from ..utils.detection_cache import DetectionCache
+
+
+def open_video(video_path: str) -> cv2.VideoCapture:
+    """
+    Open a video file for decoding.
+    
+    Args:
+        video_path: Path to the video file
+    
+    Returns:
+        An opened cv2.VideoCapture; the caller must release it
+    
+    Raises:
+        FileNotFoundError: If video_path does not exist
+        ValueError: If the video cannot be opened
+    """
+    if not Path(video_path).exists():
+        raise FileNotFoundError(f"Video not found: {video_path}")
+    
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise ValueError(f"Failed to open video: {video_path}")
+    return cap
+
+
+def sample_frames(
+    cap: cv2.VideoCapture,
+    frame_interval_sec: float = 1.0,
+    max_frames: Optional[int] = None,
+    strategy: str = "auto",
+    container: str = ""
+) -> Iterator[Tuple[int, float, np.ndarray]]:
+    """
+    Yield frames from an open capture every frame_interval_sec seconds.
+    
+    Frames between samples are skipped without being fully decoded where
+    possible (see FrameSampler).
+    
+    Args:
+        cap: Opened video capture
+        frame_interval_sec: Time interval between sampled frames in seconds
+        max_frames: Maximum number of frames, spread across the duration
+        strategy: Sampling strategy: auto, grab, seek or read
+        container: File extension of the video, used by the auto strategy
+    
+    Yields:
+        (frame_number, time_sec, frame) for each sampled frame
+    """
+    return iter(FrameSampler(cap, frame_interval_sec, max_frames, strategy, container))
+
+
+def _video_cache_key(
+    cache: DetectionCache,
+    video_path: str,
+    detector_backend: str,
+    frame_interval_sec: float,
+    detect_size: Optional[int] = None,
+    prefilter_backend: Optional[str] = None,
+    max_frames: Optional[int] = None,
+    dedup_threshold: Optional[float] = None,
+    start_sec: float = 0.0,
+    end_sec: Optional[float] = None,
+    sampling_strategy: str = "auto",
+    dedup_max_reuse: Optional[int] = None
+) -> str:
+    """
+    Build the cache key for a video's sampled-frame detections.
+    
+    Cached detections are looked up by frame number, and seek and grab
+    sampling land on different frames, so the strategy is part of the key.
+    """
+    params = {'frame_interval_sec': frame_interval_sec, 'sampling_strategy': sampling_strategy}
+    if start_sec or end_sec is not None:
+        params['time_range'] = [start_sec, end_sec]
+    if max_frames:
+        params['max_frames'] = max_frames
+    if dedup_threshold is not None:
+        params['dedup_threshold'] = dedup_threshold
+        if dedup_max_reuse is not None:
+            params['dedup_max_reuse'] = dedup_max_reuse
+    if detect_size:
+        params['detect_size'] = detect_size
+    if prefilter_backend:
+        params['prefilter_backend'] = prefilter_backend
+    return cache.key_for_file(video_path, detector_backend, params)
+
+
+def detect_faces_in_video(
+    video_path: str,
+    detector_backend: str = "retinaface",
+    frame_interval_sec: float = 1.0,
+    batch_size: int = 10,
+    cache: Optional[DetectionCache] = None,
+    detect_size: Optional[int] = None,
+    prefilter_backend: Optional[str] = None,
+    cascade_stats: Optional[CascadeStats] = None,
+    max_frames: Optional[int] = None,
+    sampling_strategy: str = "auto",
+    dedup_threshold: Optional[float] = None,
+    start_sec: float = 0.0,
+    end_sec: Optional[float] = None,
+    dedup_max_reuse: Optional[int] = None
+) -> List[Dict]:
+    """
+    Detect faces on sampled frames of a video without writing any images.
+    
+    Args:
+        video_path: Path to the input video file
+        detector_backend: Detection backend to use (default: "retinaface")
+        frame_interval_sec: Time interval between sampled frames in seconds (default: 1.0)
+        batch_size: Number of sampled frames sent to the detector together (default: 10)
+        cache: Optional DetectionCache keyed by file content, backend and interval
+        detect_size: Longest frame side used for detection, or None for full
+                     resolution (boxes are reported in original coordinates)
+        prefilter_backend: Cheap backend screening each frame before the
+                           detector (e.g. "opencv"), or None to disable the cascade
+        cascade_stats: Optional CascadeStats updated with per-stage counters
+        max_frames: Maximum number of sampled frames, spread evenly across the
+                    duration (None for no limit)
+        sampling_strategy: Frame sampling strategy: auto (default), grab, seek or read
+        dedup_threshold: Reuse the previous detections for frames whose
+                         thumbnail differs from the last detected frame by at
+                         most this much (mean absolute difference, 0-255), or
+                         None to detect every sampled frame
+        start_sec: Start of the time range to process (default: 0.0)
+        end_sec: End of the time range, exclusive (default: end of video);
+                 used to process one shard of a long video
+        dedup_max_reuse: With dedup_threshold, detect anyway after this many
+                         consecutive reused frames (None for no limit)
+    
+    Returns:
+        One record per sampled frame, each containing:
+            - frame: frame number in the video
+            - timestamp: frame time in seconds
+            - detections: list of detections (see detect_faces_in_image)
+            - reused: True if the detections were copied from an earlier frame
+    
+    Raises:
+        FileNotFoundError: If video_path does not exist
+        ValueError: If video cannot be opened or processed
+    """
+    cache_key = None
+    if cache is not None:
+        if not Path(video_path).exists():
+            raise FileNotFoundError(f"Video not found: {video_path}")
+        cache_key = _video_cache_key(
+            cache, video_path, detector_backend, frame_interval_sec,
+            detect_size, prefilter_backend, max_frames, dedup_threshold,
+            start_sec, end_sec, sampling_strategy, dedup_max_reuse
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+    
+    cap = open_video(video_path)
+    records: List[Dict] = []
+    
+    def detect_batch(samples):
+        frames = [frame for _, _, frame in samples]
+        return detect_faces_batch(
+            frames, detector_backend, batch_size, detect_size,
+            prefilter_backend=prefilter_backend, cascade_stats=cascade_stats
+        )
+    
+    def collect(sample, detections, reused):
+        frame_number, time_sec, _ = sample
+        records.append({
+            'frame': frame_number,
+            'timestamp': time_sec,
+            'detections': detections,
+            'reused': reused
+        })
+    
+    gate = FrameGate(dedup_threshold, dedup_max_reuse) if dedup_threshold is not None else None
+    
+    try:
+        sampler = FrameSampler.from_path(
+            cap, video_path,
+            frame_interval_sec=frame_interval_sec,
+            max_frames=max_frames,
+            strategy=sampling_strategy,
+            start_sec=start_sec,
+            end_sec=end_sec
+        )
+        # Decode the next batch while the detector works on the current one
+        VideoPipeline(
+            detect_batch, collect,
+            batch_size=batch_size,
+            gate=(lambda sample: gate.is_duplicate(sample[2])) if gate else None
+        ).run(sampler)
+    finally:
+        cap.release()
+    
+    if cache_key is not None:
+        cache.put(cache_key, records)
+    return records
 
 
 def annotate_video(
     video_path: str,
     detector_backend: str = "retinaface",
-    frame_interval_sec: float = 1.0
-) -> None:
+    frame_interval_sec: float = 1.0,
+    batch_size: int = 10,
+    cache: Optional[DetectionCache] = None,
+    detect_size: Optional[int] = None,
+    prefilter_backend: Optional[str] = None,
+    max_frames: Optional[int] = 100,
+    sampling_strategy: str = "auto",
+    detect_workers: int = 1,
+    queue_size: int = 4,
+    dedup_threshold: Optional[float] = None,
+    dedup_max_reuse: Optional[int] = None,
+    output_mode: str = "frames",
+    output_path: Optional[str] = None,
+    checkpoint_path: Optional[str] = None,
+    jpeg_quality: int = 95,
+    writer_threads: int = 2,
+    track_faces: bool = False
+) -> str:
     """
     Process a video by sampling frames at specified intervals, detecting faces,
     and saving annotated frames.
     
+    The output_mode chooses what is written: "frames" saves one annotated
+    JPEG per sampled frame, "video" writes a single annotated video of the
+    sampled frames, and "timeline" writes a single NDJSON file of detections
+    with no image output (see video_outputs).
+    
+    With checkpoint_path set, every processed frame is journaled durably
+    (see checkpoint.VideoCheckpoint). If a matching checkpoint exists from
+    an interrupted run, processing resumes after its last frame: frames and
+    timeline outputs seek straight there, while video output re-decodes the
+    earlier frames to redraw them from the saved detections without
+    running the detector. The checkpoint is deleted once the run completes.
+    
     Args:
         video_path: Path to the input video file
         detector_backend: Detection backend to use (default: "retinaface")
                          Options: retinaface, mtcnn, opencv, ssd, dlib, mediapipe
         frame_interval_sec: Time interval between sampled frames in seconds (default: 1.0)
+        batch_size: Number of sampled frames sent to the detector together (default: 10)
+        cache: Optional DetectionCache; on a hit the frames are still decoded and
+               annotated, but the detector is not run
+        detect_size: Longest frame side used for detection, or None for full
+                     resolution; boxes are drawn in original coordinates
+        prefilter_backend: Cheap backend screening each frame before the
+                           detector (e.g. "opencv"); frames it rejects are
+                           annotated with no faces
+        max_frames: Maximum number of sampled frames, spread evenly across the
+                    duration (default: 100, PipelineConfig.max_frames; None
+                    for no limit)
+        sampling_strategy: Frame sampling strategy: auto (default), grab, seek or read
+        detect_workers: Number of detection threads (default: 1)
+        queue_size: Batches buffered between pipeline stages (default: 4); bounds
+                    how many decoded frames are held in memory
+        dedup_threshold: Reuse the previous detections for frames whose
+                         thumbnail differs from the last detected frame by at
+                         most this much (mean absolute difference, 0-255), or
+                         None to detect every sampled frame
+        dedup_max_reuse: With dedup_threshold, detect anyway after this many
+                         consecutive reused frames (None for no limit)
+        output_mode: One of frames (default), video or timeline
+        output_path: Directory (frames) or file (video, timeline) to write;
+                     defaults to a path under outputs/ named after the video
+        checkpoint_path: Optional journal file for resuming interrupted runs
+        jpeg_quality: JPEG quality of annotated frame images, 0-100 (default: 95)
+        writer_threads: Background threads encoding frame images (default: 2)
+        track_faces: Link detections across sampled frames into tracks by
+                     box overlap (see tracking.IoUTracker); output detections
+                     then carry a track_id
+    
+    Returns:
+        The output directory or file that was written
     
     Raises:
         FileNotFoundError: If video_path does not exist
-        ValueError: If video cannot be opened or processed
+        ValueError: If video cannot be opened or processed, or output_mode is unknown
     """
-    # Verify video exists
+    if output_mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode '{output_mode}', expected one of {OUTPUT_MODES}")
     vid_path = Path(video_path)
     if not vid_path.exists():
         raise FileNotFoundError(f"Video not found: {video_path}")
+    output_path = output_path or default_output_path(video_path, output_mode)
     
-    # Open video
-    cap = cv2.VideoCapture(str(video_path))
-    if not cap.isOpened():
-        raise ValueError(f"Failed to open video: {video_path}")
+    # Cached detections by frame number, if this video was processed before
+    cache_key = None
+    cached_detections: Optional[Dict[int, List[Dict]]] = None
+    if cache is not None:
+        cache_key = _video_cache_key(
+            cache, video_path, detector_backend, frame_interval_sec,
+            detect_size, prefilter_backend, max_frames, dedup_threshold,
+            sampling_strategy=sampling_strategy, dedup_max_reuse=dedup_max_reuse
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            cached_detections = {record['frame']: record['detections'] for record in cached}
+            print("Using cached detections\n")
+    
+    # Frames journaled by an interrupted run of the same video and settings
+    checkpoint = None
+    resumed: List[Dict] = []
+    if checkpoint_path is not None and cached_detections is None:
+        checkpoint = VideoCheckpoint(checkpoint_path, video_path, params={
+            'detector_backend': detector_backend,
+            'frame_interval_sec': frame_interval_sec,
+            'detect_size': detect_size,
+            'prefilter_backend': prefilter_backend,
+            'max_frames': max_frames,
+            'sampling_strategy': sampling_strategy,
+            'dedup_threshold': dedup_threshold,
+            'dedup_max_reuse': dedup_max_reuse,
+            'output_mode': output_mode
+        })
+        resumed = checkpoint.load()
+    
+    # Detections known without running the detector, by frame number
+    known_detections: Dict[int, List[Dict]] = dict(cached_detections or {})
+    sampler_options = {'frame_interval_sec': frame_interval_sec, 'max_frames': max_frames}
+    seek_to_resume = bool(resumed) and output_mode != 'video'
+    if resumed:
+        print(f"Resuming from checkpoint after t={checkpoint.last_timestamp:.1f}s "
+              f"({len(resumed)} frame(s) already processed)\n")
+        interval = checkpoint.sample_interval_sec or frame_interval_sec
+        if seek_to_resume:
+            # Stay on the original sample grid and spend only the remaining budget
+            sampler_options = {
+                'frame_interval_sec': interval,
+                'max_frames': max(0, max_frames - len(resumed)) if max_frames else None,
+                'start_sec': checkpoint.last_timestamp + interval / 2
+            }
+        else:
+            known_detections.update({record['frame']: record['detections'] for record in resumed})
+    
+    records: List[Dict] = list(resumed) if seek_to_resume else []
+    tracker = IoUTracker() if track_faces else None
+    
+    def label_tracks(frame_number: int, time_sec: float, detections: List[Dict]) -> List[Dict]:
+        """Add track ids to one frame's detections when tracking is on."""
+        if tracker is None:
+            return detections
+        return tracker.update(detections, frame_number, time_sec)
+    
+    cascade_stats = CascadeStats() if prefilter_backend else None
+    gate = FrameGate(dedup_threshold, dedup_max_reuse) if dedup_threshold is not None else None
+    
+    cap = open_video(video_path)
     
     try:
-        # Get video properties
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        duration_sec = total_frames / fps if fps > 0 else 0
+        sampler = FrameSampler.from_path(
+            cap, video_path,
+            strategy=sampling_strategy,
+            **sampler_options
+        )
         
         print(f"Video properties:")
-        print(f"  FPS: {fps:.2f}")
-        print(f"  Total frames: {total_frames}")
-        print(f"  Duration: {duration_sec:.2f}s")
-        print(f"  Sampling interval: {frame_interval_sec}s\n")
+        print(f"  FPS: {sampler.fps:.2f}")
+        print(f"  Total frames: {sampler.frame_count}")
+        print(f"  Duration: {sampler.duration_sec:.2f}s")
+        print(f"  Sampling interval: {sampler.frame_interval_sec}s ({sampler.strategy})\n")
+        
+        # One frame per sampling interval keeps the annotated video's timing
+        output = create_output(
+            output_mode, output_path,
+            fps=1.0 / sampler.frame_interval_sec,
+            jpeg_quality=jpeg_quality,
+            writer_threads=writer_threads
+        )
+        if seek_to_resume:
+            # Replay the checkpointed frames through the tracker, and into the
+            # timeline, which is rewritten
+            for record in resumed:
+                detections = label_tracks(record['frame'], record['timestamp'], record['detections'])
+                if output_mode == 'timeline':
+                    output.write((record['frame'], record['timestamp'], None),
+                                 detections, record.get('reused', False))
+        if checkpoint is not None:
+            # Frame files are queued on background writers; a frame is only
+            # journaled once its file is on disk, or a resume would skip it
+            checkpoint.start(sampler.frame_interval_sec, before_sync=output.flush)
+        
+        def detect_batch(samples):
+            """Detect faces on one batch of sampled frames (detection threads)."""
+            pending = [sample for sample in samples if sample[0] not in known_detections]
+            detected = iter(detect_faces_batch(
+                [frame for _, _, frame in pending], detector_backend, batch_size, detect_size,
+                prefilter_backend=prefilter_backend, cascade_stats=cascade_stats
+            ) if pending else [])
+            return [
+                known_detections[frame_number] if frame_number in known_detections else next(detected)
+                for frame_number, _, _ in samples
+            ]
         
-        # Create output directory
-        video_stem = vid_path.stem
-        output_dir = Path("outputs") / video_stem
-        output_dir.mkdir(parents=True, exist_ok=True)
+        def write_frame(sample, detections, reused):
+            """Record and output one frame (writer stage, in frame order)."""
+            frame_number, time_sec, _ = sample
+            record = {
+                'frame': frame_number,
+                'timestamp': time_sec,
+                'detections': detections,
+                'reused': reused
+            }
+            note = " (unchanged, reused)" if reused else ""
+            print(f"  Frame {frame_number} at t={time_sec:.1f}s: detected {len(detections)} face(s){note}")
+            output.write(sample, label_tracks(frame_number, time_sec, detections), reused)
+            records.append(record)
+            if checkpoint is not None:
+                checkpoint.append(record)
         
-        frame_count = 0
-        processed_count = 0
-        next_sample_time_ms = 0.0
+        # Decode, detection and encoding run concurrently with bounded queues
+        pipeline = VideoPipeline(
+            detect_batch, write_frame,
+            batch_size=batch_size,
+            detect_workers=detect_workers,
+            queue_size=queue_size,
+            gate=(lambda sample: gate.is_duplicate(sample[2])) if gate else None
+        )
+        with output:
+            stage_report = pipeline.run(sampler)
+        if checkpoint is not None:
+            checkpoint.remove()
         
-        # Process frames
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            # Get current timestamp
-            current_time_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
-            
-            # Check if we should sample this frame
-            if current_time_ms >= next_sample_time_ms:
-                processed_count += 1
-                current_time_sec = current_time_ms / 1000.0
-                
-                print(f"Processing frame {frame_count} at t={current_time_sec:.1f}s")
-                
-                # Save frame to temporary file for detection
-                with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as temp_file:
-                    temp_path = temp_file.name
-                    cv2.imwrite(temp_path, frame)
-                
-                try:
-                    # Detect faces in the frame
-                    detections = detect_faces_in_image(temp_path, detector_backend)
-                    print(f"  Detected {len(detections)} face(s)")
-                    
-                    # Generate output filename with frame number and timestamp
-                    output_filename = f"frame_{frame_count:04d}_t{current_time_sec:.1f}s.jpg"
-                    output_path = output_dir / output_filename
-                    
-                    # Annotate and save the frame
-                    annotate_image(temp_path, detections, str(output_path))
-                    
-                finally:
-                    # Clean up temporary file
-                    Path(temp_path).unlink(missing_ok=True)
-                
-                # Calculate next sample time
-                next_sample_time_ms += frame_interval_sec * 1000.0
-            
-            frame_count += 1
+        if cache_key is not None and cached_detections is None:
+            cache.put(cache_key, records)
         
-        print(f"\n✓ Processed {processed_count} frame(s)")
-        print(f"✓ Annotated frames saved to: {output_dir}")
+        print(f"\n✓ Processed {len(records)} frame(s) "
+              f"({sampler.decoded} decoded, {sampler.skipped} skipped) "
+              f"in {stage_report['wall_sec']:.2f}s")
+        print("Stage utilization:")
+        print(format_stage_report(stage_report))
+        if gate is not None:
+            print(f"✓ {gate.summary()}")
+        if cascade_stats is not None and cascade_stats.screened:
+            print(f"✓ {cascade_stats.summary()}")
+        if tracker is not None:
+            print(f"✓ Linked faces into {len(tracker.timelines())} track(s)")
+        print(f"✓ Output ({output_mode}) saved to: {output_path}")
         
     finally:
         cap.release()
+        if checkpoint is not None:
+            checkpoint.close()
+    
+    return output_path
 
 
 def main():
     """CLI entry point for video annotation."""
-    if len(sys.argv) < 2:
-        print("Usage: python -m unlabeled_media_tagger.pipeline.annotate_video <video_path> [detector_backend]")
-        print("\nDetector backends: retinaface (default), mtcnn, opencv, ssd, dlib, mediapipe")
-        sys.exit(1)
-    
-    video_path = sys.argv[1]
-    detector_backend = sys.argv[2] if len(sys.argv) > 2 else "retinaface"
+    defaults = PipelineConfig()
+    parser = argparse.ArgumentParser(
+        prog="python -m unlabeled_media_tagger.pipeline.annotate_video",
+        description="Detect faces on sampled video frames and write annotated output.",
+    )
+    parser.add_argument("video_path", help="Video file to process")
+    parser.add_argument("detector_backend", nargs="?", default="retinaface",
+                        help="Detector backend: retinaface (default), mtcnn, opencv, ssd, dlib, mediapipe")
+    parser.add_argument("-m", "--output-mode", choices=OUTPUT_MODES, default=defaults.output_mode,
+                        help=f"frames: one JPEG per sampled frame; video: one annotated video; "
+                             f"timeline: one NDJSON detection file (default: {defaults.output_mode})")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Output directory (frames) or file (video, timeline); defaults under outputs/")
+    parser.add_argument("--frame-interval", type=float, default=defaults.frame_interval,
+                        help=f"Seconds between sampled frames (default: {defaults.frame_interval})")
+    parser.add_argument("--max-frames", type=int, default=defaults.max_frames,
+                        help=f"Maximum sampled frames, spread across the duration, "
+                             f"0 for no limit (default: {defaults.max_frames})")
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size,
+                        help=f"Frames per detector call (default: {defaults.batch_size})")
+    parser.add_argument("--detect-workers", type=int, default=defaults.detect_workers,
+                        help=f"Detection threads (default: {defaults.detect_workers})")
+    parser.add_argument("--dedup-threshold", type=float, default=defaults.dedup_threshold,
+                        help="Reuse detections for frames differing by at most this much (0-255)")
+    parser.add_argument("--dedup-max-reuse", type=int, default=defaults.dedup_max_reuse,
+                        help="Detect anyway after this many consecutive reused frames")
+    parser.add_argument("--jpeg-quality", type=int, default=defaults.jpeg_quality,
+                        help=f"JPEG quality of frame images, 0-100 (default: {defaults.jpeg_quality})")
+    parser.add_argument("--checkpoint", default=None,
+                        help="Journal progress to this file and resume from it after a crash")
+    parser.add_argument("--track", action="store_true", default=defaults.track_faces,
+                        help="Link faces across frames into tracks (adds track_id to detections)")
+    args = parser.parse_args()
     
     # Verify input video
-    vid_path = Path(video_path)
+    vid_path = Path(args.video_path)
     if not vid_path.exists():
-        print(f"Error: Video not found: {video_path}")
+        print(f"Error: Video not found: {args.video_path}")
         sys.exit(1)
     
-    print(f"Processing video: {video_path}")
-    print(f"Using detector: {detector_backend}\n")
+    print(f"Processing video: {args.video_path}")
+    print(f"Using detector: {args.detector_backend}\n")
     
     try:
-        annotate_video(video_path, detector_backend)
+        annotate_video(
+            args.video_path,
+            args.detector_backend,
+            frame_interval_sec=args.frame_interval,
+            batch_size=args.batch_size,
+            max_frames=args.max_frames or None,
+            sampling_strategy=defaults.sampling_strategy,
+            detect_workers=args.detect_workers,
+            queue_size=defaults.queue_size,
+            dedup_threshold=args.dedup_threshold,
+            dedup_max_reuse=args.dedup_max_reuse,
+            output_mode=args.output_mode,
+            output_path=args.output,
+            checkpoint_path=args.checkpoint,
+            jpeg_quality=args.jpeg_quality,
+            writer_threads=defaults.writer_threads,
+            track_faces=args.track
+        )
         
     except FileNotFoundError as e:
         print(f"Error: {e}")
@@ -0,0 +1,414 @@
+"""
+Bulk Face Detection Module
+
+This module runs face detection over whole directories or file lists using a
+pool of worker processes. Each worker keeps one warm detector and a fixed
+number of intra-op threads, so workers do not oversubscribe the CPU cores.
+Long videos can be split into time-range shards processed by several
+workers at once (see scheduler).
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .results import DetectionResults, DetectionResultsWriter
+from ..config.settings import PipelineConfig
+from .scheduler import ShardMerger, plan_tasks
+from ..utils.detection_cache import DetectionCache
+from ..utils.file_utils import get_media_files, is_image_file, is_video_file
+from ..utils.workers import available_cpus, configure_worker_threads, plan_workers
+
+
+logger = logging.getLogger(__name__)
+
+# Per-process state set up by _init_worker
+_worker_state: Dict = {}
+
+
+def _init_worker(
+    detector_backend: str,
+    threads_per_worker: int,
+    frame_interval_sec: float,
+    batch_size: int,
+    worker_counter,
+    pin_cores: bool,
+    cache_path: Optional[str],
+    detect_size: Optional[int],
+    prefilter_backend: Optional[str],
+    max_frames: Optional[int],
+    track_faces: bool = False
+) -> None:
+    """Process pool initializer: pin threads/cores and warm up the detector."""
+    configure_worker_threads(threads_per_worker)
+
+    if pin_cores and hasattr(os, "sched_setaffinity"):
+        with worker_counter.get_lock():
+            index = worker_counter.value
+            worker_counter.value += 1
+        cpus = available_cpus()
+        start = (index * threads_per_worker) % len(cpus)
+        os.sched_setaffinity(0, cpus[start:start + threads_per_worker] or cpus)
+
+    # Imported here so TensorFlow picks up the thread settings above
+    from .detect_faces import get_detector
+
+    _worker_state.update({
+        "detector_backend": detector_backend,
+        "frame_interval_sec": frame_interval_sec,
+        "batch_size": batch_size,
+        "cache": DetectionCache(cache_path) if cache_path else None,
+        "detect_size": detect_size,
+        "prefilter_backend": prefilter_backend,
+        "max_frames": max_frames,
+        "track_faces": track_faces,
+    })
+    get_detector(detector_backend)
+    if prefilter_backend:
+        get_detector(prefilter_backend)
+
+
+def _process_task(task: Dict) -> Dict:
+    """
+    Detect faces in one image, video, or video shard inside a worker process.
+
+    Detections travel back to the parent as a compact DetectionResults
+    rather than nested dicts, which keeps pickling cheap.
+    """
+    path = task["path"]
+    from .detect_faces import detect_faces_in_image
+    from .annotate_video import detect_faces_in_video
+    from .tracking import track_faces_in_video
+
+    backend = _worker_state["detector_backend"]
+    cache = _worker_state["cache"]
+    detect_size = _worker_state["detect_size"]
+    prefilter_backend = _worker_state["prefilter_backend"]
+    frame_interval_sec = task.get("frame_interval_sec", _worker_state["frame_interval_sec"])
+    hits_before = cache.hits if cache is not None else 0
+    start = time.perf_counter()
+    record: Dict = {"path": path, "shard": task.get("shard", 0), "shards": task.get("shards", 1)}
+
+    try:
+        if is_video_file(path) and _worker_state.get("track_faces"):
+            record["media_type"] = "video"
+            tracked = track_faces_in_video(
+                path,
+                backend,
+                frame_interval_sec,
+                detect_size=detect_size,
+                max_frames=_worker_state["max_frames"]
+            )
+            record["frames_sampled"] = tracked["frames_sampled"]
+            record["detector_calls"] = tracked["detector_calls"]
+            record["tracks"] = tracked["tracks"]
+            record["results"] = DetectionResults.from_frames(tracked["frames"], path)
+        elif is_video_file(path):
+            record["media_type"] = "video"
+            frames = detect_faces_in_video(
+                path,
+                backend,
+                frame_interval_sec,
+                _worker_state["batch_size"],
+                cache=cache,
+                detect_size=detect_size,
+                prefilter_backend=prefilter_backend,
+                max_frames=task.get("max_frames", _worker_state["max_frames"]),
+                start_sec=task.get("start_sec", 0.0),
+                end_sec=task.get("end_sec")
+            )
+            record["frames_sampled"] = len(frames)
+            record["results"] = DetectionResults.from_frames(frames, path)
+        else:
+            record["media_type"] = "image"
+            detections = detect_faces_in_image(
+                path, backend, cache=cache, detect_size=detect_size,
+                prefilter_backend=prefilter_backend
+            )
+            record["results"] = DetectionResults.from_detections(detections, path)
+    except Exception as e:
+        record["error"] = str(e)
+
+    if cache is not None:
+        record["cached"] = cache.hits > hits_before
+
+    record["elapsed_sec"] = round(time.perf_counter() - start, 4)
+    return record
+
+
+def _jsonl_record(record: Dict) -> Dict:
+    """Expand a worker record's compact results into the JSONL dict layout."""
+    record = dict(record)
+    results = record.pop("results", None)
+    if results is not None:
+        if record["media_type"] == "video":
+            record["frames"] = results.to_frames()
+            for frame in record["frames"]:
+                del frame["source"]
+        else:
+            record["detections"] = [
+                {"bbox": d["bbox"], "confidence": d["confidence"]} for d in results
+            ]
+    return record
+
+
+def _compact_metadata(record: Dict) -> Dict:
+    """Per-file fields stored alongside the rows of a .npz output."""
+    return {key: value for key, value in record.items() if key not in ("path", "results")}
+
+
+def collect_inputs(inputs: Iterable[str]) -> List[str]:
+    """
+    Expand directories and file lists into media file paths.
+
+    Args:
+        inputs: Directories, media files, or .txt files listing one path per line
+
+    Returns:
+        List of media file paths in input order
+
+    Raises:
+        FileNotFoundError: If an input does not exist
+    """
+    paths: List[str] = []
+    for item in inputs:
+        item_path = Path(item)
+        if item_path.is_dir():
+            paths.extend(get_media_files(item))
+        elif item_path.suffix.lower() == ".txt" and item_path.is_file():
+            with open(item_path, "r", encoding="utf-8") as f:
+                paths.extend(line.strip() for line in f if line.strip())
+        elif item_path.exists():
+            paths.append(item)
+        else:
+            raise FileNotFoundError(f"Input not found: {item}")
+    return [p for p in paths if is_image_file(p) or is_video_file(p)]
+
+
+def bulk_detect(
+    paths: List[str],
+    output_path: str,
+    detector_backend: str = "retinaface",
+    workers: Optional[int] = None,
+    threads_per_worker: int = 1,
+    frame_interval_sec: float = 1.0,
+    batch_size: int = 10,
+    pin_cores: bool = False,
+    cache_path: Optional[str] = None,
+    detect_size: Optional[int] = None,
+    prefilter_backend: Optional[str] = None,
+    max_frames: Optional[int] = None,
+    shard_sec: Optional[float] = None,
+    progress_every: int = 100,
+    track_faces: bool = False
+) -> Dict:
+    """
+    Detect faces in many files with a process pool and write the results.
+
+    With a .jsonl output each line is one file: path, media_type,
+    detections (images) or frames with faces plus frames_sampled (videos),
+    elapsed_sec, and error if the file failed. With a .npz output all
+    detections are written as one columnar DetectionResults file, with
+    one source per file (failed ones included) whose metadata holds the
+    same per-file fields; rows are spooled to disk as files finish.
+    With a cache, files already processed by an earlier (or crashed) run
+    are served from the cache and marked "cached": true.
+
+    With shard_sec, videos longer than that are split into time ranges
+    processed by different workers, and tasks run longest first so long
+    videos and small images keep every worker busy. A sharded video is
+    written once all its shards finish, with detections in timestamp
+    order and a shards count.
+
+    With track_faces, videos are processed by tracking.track_faces_in_video
+    instead: faces are followed by optical flow between detector runs, and
+    each video line gains tracks (per-track timelines) and detector_calls.
+    Tracks need the whole video, so tracked videos are never sharded, and
+    they bypass the cache.
+
+    Args:
+        paths: Media file paths to process
+        output_path: .jsonl or .npz file to write results to
+        detector_backend: Detection backend to use (default: "retinaface")
+        workers: Number of worker processes (default: available cores / threads_per_worker)
+        threads_per_worker: Intra-op threads per worker (default: 1)
+        frame_interval_sec: Sampling interval for videos in seconds (default: 1.0)
+        batch_size: Frames per detector call for videos (default: 10)
+        pin_cores: Pin each worker to its own set of cores
+        cache_path: Optional DetectionCache database shared by all workers
+        detect_size: Longest side used for fast detection (None = full resolution)
+        prefilter_backend: Cheap backend screening files before the detector
+        max_frames: Maximum sampled frames per video, spread across its duration
+        shard_sec: Split videos longer than this many seconds into shards
+                   (None processes every video in one worker)
+        progress_every: Print throughput every this many files (0 disables)
+        track_faces: Track faces through videos (see above)
+
+    Returns:
+        Summary with files, failed, cached, elapsed_sec, files_per_sec and workers
+    """
+    num_workers = plan_workers(workers, threads_per_worker)
+    # Spawn rather than fork: TensorFlow and OpenCV thread pools are not fork-safe
+    ctx = multiprocessing.get_context("spawn")
+    worker_counter = ctx.Value("i", 0)
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+
+    compact_output = Path(output_path).suffix.lower() == ".npz"
+
+    tasks = plan_tasks(paths, None if track_faces else shard_sec, frame_interval_sec, max_frames)
+    merger = ShardMerger()
+
+    done = 0
+    failed = 0
+    cached = 0
+    start = time.perf_counter()
+
+    if compact_output:
+        out = DetectionResultsWriter(output_path)
+    else:
+        out = open(output_path, "w", encoding="utf-8")
+    with ctx.Pool(
+        processes=num_workers,
+        initializer=_init_worker,
+        initargs=(
+            detector_backend,
+            threads_per_worker,
+            frame_interval_sec,
+            batch_size,
+            worker_counter,
+            pin_cores,
+            cache_path,
+            detect_size,
+            prefilter_backend,
+            max_frames,
+            track_faces,
+        ),
+    ) as pool:
+        # Shards are large units of work; hand them out one at a time
+        chunksize = 1 if shard_sec else 4
+        for record in pool.imap_unordered(_process_task, tasks, chunksize=chunksize):
+            record = merger.add(record)
+            if record is None:
+                continue
+            if compact_output:
+                results = record.get("results")
+                if results is None:
+                    results = DetectionResults(sources=[record["path"]])
+                out.add(results, _compact_metadata(record))
+            else:
+                out.write(json.dumps(_jsonl_record(record)) + "\n")
+            done += 1
+            if "error" in record:
+                failed += 1
+                logger.info("Failed: %s: %s", record["path"], record["error"])
+            if record.get("cached"):
+                cached += 1
+
+            if progress_every and done % progress_every == 0:
+                elapsed = time.perf_counter() - start
+                print(f"[{done}/{len(paths)}] {done / elapsed:.2f} files/s")
+
+    out.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "files": done,
+        "failed": failed,
+        "cached": cached,
+        "elapsed_sec": elapsed,
+        "files_per_sec": done / elapsed if elapsed > 0 else 0.0,
+        "workers": num_workers,
+    }
+
+
+def main():
+    """CLI entry point for bulk face detection."""
+    defaults = PipelineConfig()
+    parser = argparse.ArgumentParser(
+        prog="python -m unlabeled_media_tagger.pipeline.bulk_detect",
+        description="Detect faces in every image and video under the given inputs.",
+    )
+    parser.add_argument(
+        "inputs", nargs="+",
+        help="Directories, media files, or .txt files listing one path per line"
+    )
+    parser.add_argument("-o", "--output", default="outputs/detections.jsonl",
+                        help="Output file: .jsonl, or .npz for compact columnar results "
+                             "(default: outputs/detections.jsonl)")
+    parser.add_argument("-b", "--backend", default="retinaface",
+                        help="Detector backend: retinaface (default), mtcnn, opencv, ssd, dlib, mediapipe")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="Worker processes (default: available cores / threads per worker)")
+    parser.add_argument("-t", "--threads-per-worker", type=int, default=1,
+                        help="Intra-op threads per worker (default: 1)")
+    parser.add_argument("--frame-interval", type=float, default=1.0,
+                        help="Seconds between sampled video frames (default: 1.0)")
+    parser.add_argument("--max-frames", type=int, default=defaults.max_frames,
+                        help=f"Maximum sampled frames per video, spread across its duration, "
+                             f"0 for no limit (default: {defaults.max_frames})")
+    parser.add_argument("--batch-size", type=int, default=10,
+                        help="Video frames per detector call (default: 10)")
+    parser.add_argument("--pin-cores", action="store_true",
+                        help="Pin each worker process to its own cores")
+    parser.add_argument("--cache", default=None,
+                        help="SQLite detection cache; files already in it are skipped")
+    parser.add_argument("--detect-size", type=int, default=None,
+                        help="Detect on images downscaled to this longest side (fast mode)")
+    parser.add_argument("--prefilter", default=None,
+                        help="Cheap backend (e.g. opencv) screening files before the detector")
+    parser.add_argument("--shard-sec", type=float, default=None,
+                        help="Split videos longer than this many seconds across workers")
+    parser.add_argument("--track", action="store_true", default=defaults.track_faces,
+                        help="Track faces through videos with optical flow and write per-track timelines")
+    args = parser.parse_args()
+
+    try:
+        paths = collect_inputs(args.inputs)
+    except (FileNotFoundError, NotADirectoryError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if not paths:
+        print("No media files found.")
+        sys.exit(0)
+
+    num_workers = plan_workers(args.workers, args.threads_per_worker)
+    print(f"Processing {len(paths)} file(s) with {num_workers} worker(s) "
+          f"x {args.threads_per_worker} thread(s)")
+    print(f"Using detector: {args.backend}\n")
+
+    summary = bulk_detect(
+        paths,
+        args.output,
+        detector_backend=args.backend,
+        workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+        frame_interval_sec=args.frame_interval,
+        batch_size=args.batch_size,
+        pin_cores=args.pin_cores,
+        cache_path=args.cache,
+        detect_size=args.detect_size,
+        prefilter_backend=args.prefilter,
+        max_frames=args.max_frames or None,
+        shard_sec=args.shard_sec,
+        track_faces=args.track,
+    )
+
+    print(f"\n✓ Processed {summary['files']} file(s) in {summary['elapsed_sec']:.1f}s "
+          f"({summary['files_per_sec']:.2f} files/s)")
+    if args.cache:
+        print(f"✓ {summary['cached']} file(s) served from cache")
+    if summary["failed"]:
+        print(f"✗ {summary['failed']} file(s) failed")
+    print(f"✓ Results written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
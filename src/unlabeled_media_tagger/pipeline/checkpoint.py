@@ -0,0 +1,207 @@
+"""
+Video Processing Checkpoint Module
+
+This module persists the progress of a long video run so it can resume
+after a crash or preemption instead of starting over.
+
+A checkpoint is a journal file: a JSON header line identifying the video
+and the run parameters, followed by one JSON line per processed frame
+record. The header is written atomically (temporary file, fsync, rename);
+records are buffered and appended with an fsync every few frames, after
+the outputs they describe have been flushed. A partially written
+last line left by a crash is ignored on load, so the journal always
+yields a consistent prefix of the run.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+def _fsync_dir(path: Path) -> None:
+    """Flush a directory entry so a rename inside it survives a crash."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(str(path), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_text(path: str, text: str) -> None:
+    """
+    Replace a file's contents so readers see either the old or the new file.
+
+    Args:
+        path: File to write
+        text: New contents
+    """
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, target)
+    _fsync_dir(target.parent)
+
+
+class VideoCheckpoint:
+    """
+    Durable journal of the frame records produced for one video.
+
+    The video is identified by path, size and modification time, and the
+    run by its parameters; a checkpoint that does not match both is
+    ignored and overwritten rather than resumed.
+    """
+
+    def __init__(
+        self,
+        checkpoint_path: str,
+        video_path: str,
+        params: Optional[Dict] = None,
+        sync_every: int = 10
+    ):
+        """
+        Initialize a checkpoint.
+
+        Args:
+            checkpoint_path: Journal file to read and write
+            video_path: Video the checkpoint belongs to
+            params: Run parameters that must match for a resume (e.g.
+                    detector backend and sampling interval); JSON-serializable
+            sync_every: fsync the journal after this many appended records
+        """
+        self.path = Path(checkpoint_path)
+        self.video_path = str(video_path)
+        self.params = params or {}
+        self.sync_every = max(1, sync_every)
+
+        self.records: List[Dict] = []
+        self.sample_interval_sec: Optional[float] = None
+        self._file = None
+        self._pending: List[str] = []
+        self._before_sync: Optional[Callable[[], None]] = None
+
+    def _identity(self) -> Dict:
+        stat = os.stat(self.video_path)
+        return {
+            "video": os.path.abspath(self.video_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "params": self.params,
+        }
+
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        """Timestamp of the last checkpointed frame, or None if empty."""
+        return self.records[-1]["timestamp"] if self.records else None
+
+    def load(self) -> List[Dict]:
+        """
+        Load the records of a matching checkpoint.
+
+        Returns:
+            Checkpointed frame records in order, or [] if there is no
+            checkpoint or it belongs to another video or run
+        """
+        self.records = []
+        self.sample_interval_sec = None
+        if not self.path.exists():
+            return []
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            lines = f.read().split("\n")
+        try:
+            header = json.loads(lines[0])
+        except (json.JSONDecodeError, IndexError):
+            return []
+        if {key: header.get(key) for key in ("video", "size", "mtime_ns", "params")} != self._identity():
+            return []
+
+        self.sample_interval_sec = header.get("sample_interval_sec")
+        for line in lines[1:]:
+            if not line:
+                continue
+            try:
+                self.records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # Torn write from a crash; everything before it is intact
+                break
+        return list(self.records)
+
+    def start(self, sample_interval_sec: float, before_sync: Optional[Callable[[], None]] = None) -> None:
+        """
+        Open the journal for appending, keeping any loaded records.
+
+        The journal is rewritten atomically with the header and the loaded
+        records, which also drops a torn last line.
+
+        Args:
+            sample_interval_sec: Effective sampling interval of the run,
+                                 reused on resume so samples stay on the same grid
+            before_sync: Called before buffered records are written, e.g. to
+                         flush the output files they describe, so a
+                         journaled frame always has its output on disk
+        """
+        if self.sample_interval_sec is None:
+            self.sample_interval_sec = sample_interval_sec
+        header = {**self._identity(), "sample_interval_sec": self.sample_interval_sec}
+        lines = [json.dumps(header)] + [json.dumps(record) for record in self.records]
+        atomic_write_text(str(self.path), "\n".join(lines) + "\n")
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._pending = []
+        self._before_sync = before_sync
+
+    def append(self, record: Dict) -> None:
+        """
+        Journal one frame record; it reaches the file with the next sync().
+
+        Records at or before the last checkpointed timestamp are ignored,
+        so frames replayed after a resume are not journaled twice.
+
+        Args:
+            record: Frame record with frame, timestamp and detections
+        """
+        if self.last_timestamp is not None and record["timestamp"] <= self.last_timestamp:
+            return
+        self.records.append(record)
+        self._pending.append(json.dumps(record) + "\n")
+        if len(self._pending) >= self.sync_every:
+            self.sync()
+
+    def sync(self) -> None:
+        """
+        Write buffered records to stable storage.
+
+        Raises:
+            Exception: Whatever before_sync raises; the buffered records are
+                       then not journaled
+        """
+        if self._file is not None and self._pending:
+            if self._before_sync is not None:
+                self._before_sync()
+            self._file.write("".join(self._pending))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending = []
+
+    def close(self) -> None:
+        """Sync and close the journal, keeping it on disk."""
+        if self._file is not None:
+            try:
+                self.sync()
+            finally:
+                self._file.close()
+                self._file = None
+
+    def remove(self) -> None:
+        """Close and delete the checkpoint once the run has completed."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path.exists():
+            self.path.unlink()
@@ -2,8 +2,34 @@
 Compare Stage - Face Comparison and Clustering
 
 This module handles comparing and clustering detected faces across media files.
+Embeddings are compared with the blocked NumPy engine in similarity, so memory
+stays bounded and no Python loop runs over pairs of faces; graph_cluster
+spreads those blocks over a process pool for large sets. The database of
+known individuals is backed by an IVF approximate nearest-neighbor index
+(ann_index), so matching a new face does not scan every stored embedding,
+and its embeddings can be stored as int8 or product-quantized codes
+(quantization) to shrink it. New faces can also be clustered incrementally
+against existing cluster centroids (incremental_cluster), leaving full
+re-clustering to an occasional compaction.
 """
 
+from pathlib import Path
+
+import numpy as np
+
+from .ann_index import IVFIndex
+from .embedding_store import EmbeddingStore
+from .incremental_cluster import IncrementalClusterer
+from .graph_cluster import cluster_embeddings_parallel
+from ..config.settings import get_option
+
+
+def _embedding_matrix(faces):
+    """Stack embedding vectors, or dicts with an 'embedding' key, into an (N, D) array."""
+    return np.asarray([
+        face["embedding"] if isinstance(face, dict) else face for face in faces
+    ], dtype=np.float32)
+
 
 class CompareStage:
     """
@@ -24,33 +50,284 @@ class CompareStage:
             config: Configuration dictionary for comparison settings
         """
         self.config = config or {}
+        self.similarity_metric = get_option(self.config, "similarity_metric", "cosine")
+        self.similarity_threshold = get_option(self.config, "similarity_threshold", 0.7)
+        self.similarity_dtype = get_option(self.config, "similarity_dtype", "float32")
+        self.similarity_block_size = get_option(self.config, "similarity_block_size", 2048)
+        self.clustering_method = get_option(self.config, "clustering_method", "components")
+        self.clustering_workers = get_option(self.config, "clustering_workers", 1)
+        self.clustering_min_samples = get_option(self.config, "clustering_min_samples", 2)
+        self.ann_nlist = get_option(self.config, "ann_nlist")
+        self.ann_nprobe = get_option(self.config, "ann_nprobe", 8)
+        self.ann_quantizer = get_option(self.config, "ann_quantizer")
+        self.ann_pq_subspaces = get_option(self.config, "ann_pq_subspaces")
+        self.ann_rerank = get_option(self.config, "ann_rerank", 0)
+        
+        # Face database: ANN index of face embeddings and the person of each face
+        self.face_index = None
+        self.face_people = {}
+        self.people = {}
+        
+        # Online clustering state, created on the first assign_faces() call
+        self.clusterer = None
     
     def compare_faces(self, face_embeddings):
         """
         Compare face embeddings and cluster similar faces.
         
+        Faces are linked when their similarity passes similarity_threshold
+        (a minimum cosine similarity, or a maximum L2 distance with the l2
+        metric). With clustering_method "components" each connected group
+        of linked faces is one cluster; "chinese_whispers" and "dbscan"
+        cluster the same graph more strictly, and faces dbscan leaves as
+        noise get a cluster each. The graph is built in blocks over
+        clustering_workers processes, so memory follows the number of
+        linked pairs rather than the square of the face count.
+        
         Args:
-            face_embeddings: List of facial embeddings to compare
+            face_embeddings: Array of shape (N, D), a list of embedding
+                             vectors, a list of dicts with an 'embedding'
+                             key (as returned by DeepFace.represent), or an
+                             EmbeddingStore
             
         Returns:
-            Dictionary mapping cluster IDs to lists of matching faces
-            
+            Dictionary mapping cluster IDs to lists of matching faces (the
+            input items, or face ids for an EmbeddingStore), largest cluster
+            first with IDs numbered from 0
+        """
+        if isinstance(face_embeddings, EmbeddingStore):
+            # Embeddings are streamed from the store's memmaps, not loaded
+            vectors = face_embeddings
+            faces = face_embeddings.face_ids().tolist()
+        else:
+            faces = list(face_embeddings)
+            vectors = _embedding_matrix(faces) if faces else None
+        if not faces:
+            return {}
+        labels = cluster_embeddings_parallel(
+            vectors,
+            self.similarity_threshold,
+            method=self.clustering_method,
+            metric=self.similarity_metric,
+            dtype=self.similarity_dtype,
+            block_size=self.similarity_block_size,
+            workers=self.clustering_workers,
+            min_samples=self.clustering_min_samples
+        )
+        noise = labels < 0
+        labels[noise] = labels.max() + 1 + np.arange(np.count_nonzero(noise))
+        
+        # Renumber clusters by decreasing size (ties by first face)
+        sizes = np.bincount(labels)
+        ranking = np.lexsort((np.arange(len(sizes)), -sizes))
+        clusters = {cluster_id: [] for cluster_id in range(len(sizes))}
+        rank_of = np.empty_like(ranking)
+        rank_of[ranking] = np.arange(len(ranking))
+        for face, label in zip(faces, rank_of[labels]):
+            clusters[int(label)].append(face)
+        return clusters
+    
+    def assign_faces(self, face_embeddings):
+        """
+        Incrementally cluster new faces, e.g. those of one newly processed file.
+        
+        Faces join the cluster with the closest centroid when it passes
+        similarity_threshold, or open new clusters, without re-clustering
+        earlier faces; the cost per call does not grow with the collection.
+        
+        Args:
+            face_embeddings: Embedding vectors, or dicts with an 'embedding' key
+        
+        Returns:
+            List with the cluster ID of each face
+        """
+        faces = list(face_embeddings)
+        if not faces:
+            return []
+        vectors = _embedding_matrix(faces)
+        if self.clusterer is None:
+            self.clusterer = IncrementalClusterer(
+                vectors.shape[1],
+                threshold=self.similarity_threshold,
+                metric=self.similarity_metric,
+                dtype=self.similarity_dtype,
+                nprobe=self.ann_nprobe
+            )
+        return self.clusterer.add(vectors).tolist()
+    
+    def compact_clusters(self, face_embeddings):
+        """
+        Re-cluster all incrementally assigned faces from scratch.
+        
+        Meant to run occasionally offline: it fixes assignments that
+        depended on arrival order and merges clusters that drifted together.
+        
+        Args:
+            face_embeddings: Every face passed to assign_faces(), in order
+        
+        Returns:
+            List with the new cluster ID of each face
+        
         Raises:
-            NotImplementedError: This is a placeholder for future implementation
+            ValueError: If no faces were assigned or the count does not match
+        """
+        if self.clusterer is None:
+            raise ValueError("No faces have been assigned yet")
+        return self.clusterer.compact(_embedding_matrix(list(face_embeddings))).tolist()
+    
+    def _new_index(self, dim):
+        return IVFIndex(
+            dim,
+            nlist=self.ann_nlist,
+            nprobe=self.ann_nprobe,
+            metric=self.similarity_metric,
+            dtype=self.similarity_dtype,
+            quantizer=self.ann_quantizer,
+            subspaces=self.ann_pq_subspaces,
+            rerank=self.ann_rerank
+        )
+    
+    def lookup_faces(self, face_embeddings, k=10):
+        """
+        Find the known person each face belongs to.
+        
+        Each face is matched to the person of its closest database face
+        that passes similarity_threshold, found through the ANN index.
+        
+        Args:
+            face_embeddings: Embedding vectors, or dicts with an 'embedding' key
+            k: Database neighbors examined per face
+        
+        Returns:
+            One (person_id, score) pair per face; person_id is None when no
+            known face passes the threshold
         """
-        raise NotImplementedError("Face comparison not yet implemented")
+        faces = list(face_embeddings)
+        if not faces:
+            return []
+        if self.face_index is None or not len(self.face_index):
+            return [(None, None)] * len(faces)
+        
+        ids, scores = self.face_index.search(_embedding_matrix(faces), k=k)
+        matches = []
+        for face_ids, face_scores in zip(ids, scores):
+            # Missing neighbors have NaN scores, which never pass
+            passing = np.flatnonzero(self.face_index.engine.is_match(face_scores, self.similarity_threshold))
+            if passing.size:
+                best = passing[0]
+                matches.append((self.face_people[int(face_ids[best])], float(face_scores[best])))
+            else:
+                matches.append((None, None))
+        return matches
+    
+    def lookup_face(self, face_embedding, k=10):
+        """
+        Find the known person a single face belongs to.
+        
+        Args:
+            face_embedding: Embedding vector, or a dict with an 'embedding' key
+            k: Database neighbors examined
+        
+        Returns:
+            (person_id, score), with person_id None if nobody matches
+        """
+        return self.lookup_faces([face_embedding], k=k)[0]
     
     def build_face_database(self, clustered_faces):
         """
         Build or update a database of unique individuals.
         
+        Each cluster's mean embedding is looked up in the database. A
+        cluster matching a known person joins that person; otherwise it
+        becomes a new person. Every face of the cluster is then inserted
+        into the ANN index.
+        
         Args:
-            clustered_faces: Dictionary of clustered face data
+            clustered_faces: Dictionary mapping cluster IDs to lists of faces,
+                             as returned by compare_faces()
             
         Returns:
-            Updated face database
-            
+            Dictionary mapping each cluster ID to its person ID
+        """
+        clusters = [(cluster_id, faces) for cluster_id, faces in clustered_faces.items() if faces]
+        if not clusters:
+            return {}
+        matrices = [_embedding_matrix(faces) for _, faces in clusters]
+        if self.face_index is None:
+            self.face_index = self._new_index(matrices[0].shape[1])
+        
+        engine = self.face_index.engine
+        centroids = np.vstack([engine.prepare(matrix).astype(np.float32).mean(axis=0) for matrix in matrices])
+        matches = self.lookup_faces(centroids)
+        
+        assignments = {}
+        next_person = max(self.people, default=-1) + 1
+        for (cluster_id, _), matrix, (person_id, _) in zip(clusters, matrices, matches):
+            if person_id is None:
+                person_id = next_person
+                next_person += 1
+            face_ids = self.face_index.add(matrix)
+            self.face_people.update(dict.fromkeys(face_ids.tolist(), person_id))
+            self.people[person_id] = self.people.get(person_id, 0) + len(face_ids)
+            assignments[cluster_id] = person_id
+        return assignments
+    
+    def remove_faces(self, face_ids):
+        """
+        Delete faces from the database; people left without faces are dropped.
+        
+        Args:
+            face_ids: Ids of faces in the ANN index
+        
+        Returns:
+            Number of faces removed
+        """
+        if self.face_index is None:
+            return 0
+        removed = 0
+        for face_id in face_ids:
+            person_id = self.face_people.pop(int(face_id), None)
+            if person_id is None:
+                continue
+            removed += self.face_index.remove([face_id])
+            self.people[person_id] -= 1
+            if not self.people[person_id]:
+                del self.people[person_id]
+        return removed
+    
+    def save_face_database(self, directory):
+        """
+        Save the face database (index and person assignments) to a directory.
+        
+        Args:
+            directory: Output directory, created if needed
+        """
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        if self.face_index is not None:
+            self.face_index.save(str(path / "index.npz"))
+        face_ids = np.fromiter(self.face_people.keys(), dtype=np.int64, count=len(self.face_people))
+        person_ids = np.fromiter(self.face_people.values(), dtype=np.int64, count=len(self.face_people))
+        with open(path / "people.npz", "wb") as f:
+            np.savez(f, face_ids=face_ids, person_ids=person_ids)
+    
+    def load_face_database(self, directory):
+        """
+        Load a face database saved with save_face_database().
+        
+        Args:
+            directory: Directory written by save_face_database()
+        
         Raises:
-            NotImplementedError: This is a placeholder for future implementation
+            FileNotFoundError: If the directory holds no saved database
         """
-        raise NotImplementedError("Face database building not yet implemented")
+        path = Path(directory)
+        if not (path / "people.npz").exists():
+            raise FileNotFoundError(f"No face database in: {directory}")
+        index_path = path / "index.npz"
+        self.face_index = IVFIndex.load(str(index_path)) if index_path.exists() else None
+        with np.load(path / "people.npz") as data:
+            self.face_people = dict(zip(data["face_ids"].tolist(), data["person_ids"].tolist()))
+        self.people = {}
+        for person_id in self.face_people.values():
+            self.people[person_id] = self.people.get(person_id, 0) + 1
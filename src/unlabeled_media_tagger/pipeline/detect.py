@@ -2,9 +2,11 @@
 Detect Stage - Computer Vision and Facial Recognition
 
 This module handles running computer vision models for detection tasks.
-Future implementation will integrate with external CV and facial recognition models.
+Face detection is backed by the shared DeepFace detector pool in detect_faces.
 """
 
+from ..config.settings import get_option
+
 
 class DetectStage:
     """
@@ -25,21 +27,113 @@ class DetectStage:
             config: Configuration dictionary for model settings
         """
         self.config = config or {}
+        self.detector_backend = get_option(self.config, "detector_backend", "retinaface")
+        self.fast_detect_size = get_option(self.config, "fast_detect_size")
+        self.fast_detect_refine = get_option(self.config, "fast_detect_refine", False)
+        self.cascade_prefilter_backend = get_option(self.config, "cascade_prefilter_backend")
+        self.cascade_prefilter = get_option(self.config, "cascade_prefilter", False)
+        self.cascade_prefilter_size = get_option(self.config, "cascade_prefilter_size", 640)
+        self.cascade_regions = get_option(self.config, "cascade_regions", False)
+        self._cascade_stats = None
+    
+    @property
+    def cascade_enabled(self):
+        """True if images are screened by a prefilter before detection."""
+        return bool(self.cascade_prefilter_backend or self.cascade_prefilter)
+    
+    def _detector(self):
+        """Return the shared warm detector for the configured backend."""
+        # Imported lazily so the stage can be constructed without DeepFace installed
+        from .detect_faces import get_detector
+        return get_detector(self.detector_backend)
+    
+    def warm_up(self):
+        """
+        Load and warm up the configured face detector ahead of the first image.
+        
+        Returns:
+            Dictionary with load_time_sec and warmup_time_sec for the backend
+        """
+        detector = self._detector()
+        return {
+            "load_time_sec": detector.load_time_sec,
+            "warmup_time_sec": detector.warmup_time_sec,
+        }
+    
+    @property
+    def cascade_stats(self):
+        """CascadeStats accumulated by this stage, or None without a prefilter."""
+        if self.cascade_enabled and self._cascade_stats is None:
+            from .detect_faces import CascadeStats
+            self._cascade_stats = CascadeStats()
+        return self._cascade_stats
     
     def detect_faces(self, image):
         """
-        Detect faces in an image.
+        Detect faces in an image or a list of images.
+        
+        Lists are detected in batches of the configured batch_size. When
+        fast_detect_size is configured, detection runs on downscaled images
+        and boxes are mapped back to original coordinates. When
+        cascade_prefilter_backend is configured, a cheap prefilter screens
+        each image first (cascade_prefilter screens with detector_backend
+        itself on a cascade_prefilter_size copy) and per-stage counters
+        accumulate in cascade_stats.
         
         Args:
-            image: Image data or path to image file
+            image: Image data (BGR array), path to image file, or a list of either
             
         Returns:
-            List of detected face bounding boxes and embeddings
+            List of detected face bounding boxes and confidence scores, or one
+            such list per image when a list of images is given
             
         Raises:
-            NotImplementedError: This is a placeholder for future implementation
+            FileNotFoundError: If image is a path that does not exist
+            ValueError: If the image cannot be processed
         """
-        raise NotImplementedError("Face detection not yet implemented")
+        from .detect_faces import (
+            detect_faces_batch,
+            detect_faces_cascade,
+            detect_faces_in_image,
+        )
+        images = image if isinstance(image, (list, tuple)) else [image]
+        
+        if self.cascade_enabled and self.cascade_regions:
+            results = [
+                detect_faces_cascade(
+                    img,
+                    self.detector_backend,
+                    self.cascade_prefilter_backend,
+                    self.cascade_prefilter_size,
+                    regions=True,
+                    stats=self.cascade_stats
+                )
+                for img in images
+            ]
+        elif self.fast_detect_size and self.fast_detect_refine:
+            # Refinement needs each full-resolution image, so go one at a time
+            results = [
+                detect_faces_in_image(
+                    img,
+                    self.detector_backend,
+                    detect_size=self.fast_detect_size,
+                    refine=True
+                )
+                for img in images
+            ]
+        else:
+            results = detect_faces_batch(
+                images,
+                self.detector_backend,
+                get_option(self.config, "batch_size", 10),
+                detect_size=self.fast_detect_size,
+                prefilter_backend=self.cascade_prefilter_backend,
+                prefilter_size=self.cascade_prefilter_size,
+                cascade_stats=self.cascade_stats,
+                cascade=self.cascade_prefilter
+            )
+        
+        return results if isinstance(image, (list, tuple)) else results[0]
     
     def detect_objects(self, image):
         """
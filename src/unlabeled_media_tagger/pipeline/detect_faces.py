@@ -4,70 +4,776 @@ Face Detection Module - DeepFace Integration
 This module provides face detection functionality using DeepFace library.
 """
 
+import logging
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence, Tuple, Union
+import cv2
+import numpy as np
 from deepface import DeepFace
 
+from ..utils.bbox import bbox_iou, non_max_suppression, scale_detections
+from ..utils.detection_cache import DetectionCache
+from ..utils.image_decode import decode_reduced
+
+
+logger = logging.getLogger(__name__)
+
+# An image is either a path on disk or an already-decoded BGR array
+ImageInput = Union[str, Path, np.ndarray]
+
+# Longest image side used by the cascade prefilter pass
+DEFAULT_PREFILTER_SIZE = 640
+
+
+def load_image(image: ImageInput) -> np.ndarray:
+    """
+    Return a BGR image array for a path or an already-decoded array.
+    
+    Arrays are returned as-is (no copy), so callers that already hold a
+    decoded frame never touch the filesystem.
+    
+    Args:
+        image: Path to an image file, or a BGR image array (H, W, 3)
+    
+    Returns:
+        BGR image array
+    
+    Raises:
+        FileNotFoundError: If image is a path that does not exist
+        ValueError: If the image cannot be loaded or the array is not an image
+    """
+    if isinstance(image, np.ndarray):
+        if image.ndim not in (2, 3) or image.size == 0:
+            raise ValueError(f"Invalid image array with shape {image.shape}")
+        return image
+    
+    img_path = Path(image)
+    if not img_path.exists():
+        raise FileNotFoundError(f"Image not found: {image}")
+    
+    loaded = cv2.imread(str(img_path))
+    if loaded is None:
+        raise ValueError(f"Failed to load image: {image}")
+    return loaded
+
+
+def load_image_for_detection(image: ImageInput, detect_size: Optional[int]) -> Tuple[np.ndarray, float]:
+    """
+    Load an image no larger than detection needs.
+    
+    JPEG paths are decoded at a reduced DCT scale (1/2, 1/4 or 1/8) that
+    still covers detect_size, which is much cheaper than a full decode
+    followed by a resize. Arrays, other formats and detect_size=None load
+    at full resolution.
+    
+    Args:
+        image: Path to an image file, or a BGR image array
+        detect_size: Longest image side detection will run at, or None
+    
+    Returns:
+        (BGR image, scale) where scale is the loaded size over the full size
+    
+    Raises:
+        FileNotFoundError: If image is a path that does not exist
+        ValueError: If the image cannot be loaded
+    """
+    if detect_size and not isinstance(image, np.ndarray):
+        return decode_reduced(str(image), detect_size)
+    return load_image(image), 1.0
+
+
+def _normalize_face(face) -> Dict:
+    """
+    Convert a raw detector result into the normalized detection format.
+    
+    Accepts both the dicts returned by DeepFace.extract_faces() and the
+    FacialAreaRegion objects returned by a detector's detect_faces().
+    """
+    if isinstance(face, dict):
+        facial_area = face.get('facial_area', {})
+        x = facial_area.get('x', 0)
+        y = facial_area.get('y', 0)
+        w = facial_area.get('w', 0)
+        h = facial_area.get('h', 0)
+        confidence = face.get('confidence', 0.0)
+    else:
+        x, y, w, h = face.x, face.y, face.w, face.h
+        confidence = getattr(face, 'confidence', 0.0)
+    
+    return {
+        'bbox': {'x': int(x), 'y': int(y), 'w': int(w), 'h': int(h)},
+        'confidence': float(confidence or 0.0)
+    }
+
+
+class DetectorHandle:
+    """
+    A loaded and warmed-up face detector for a single backend.
+    
+    Handles are created by DetectorPool and shared between callers, so the
+    model is built once per process rather than once per image or job.
+    """
+    
+    # Backends wrapping OpenCV/MediaPipe objects that must not run
+    # concurrently from several threads
+    SERIALIZED_BACKENDS = {'opencv', 'ssd', 'dlib', 'mediapipe'}
+    
+    def __init__(self, backend: str, model, load_time_sec: float):
+        """
+        Initialize a detector handle.
+        
+        Args:
+            backend: Detector backend name
+            model: Detector object built by DeepFace
+            load_time_sec: Seconds spent building the model
+        """
+        self.backend = backend
+        self.model = model
+        self.load_time_sec = load_time_sec
+        self.warmup_time_sec = 0.0
+        self.calls = 0
+        # None until the first multi-image call tells us whether the
+        # backend's detect_faces() accepts a list of images
+        self.supports_batch: Optional[bool] = None
+        self._lock = threading.Lock() if backend in self.SERIALIZED_BACKENDS else None
+        # Guards calls and supports_batch, which pool threads update concurrently
+        self._state_lock = threading.Lock()
+    
+    def _count_call(self, supports_batch: Optional[bool] = None) -> None:
+        """Record one detector call, and what it taught us about batching."""
+        with self._state_lock:
+            self.calls += 1
+            if supports_batch is not None:
+                self.supports_batch = supports_batch
+    
+    def warm_up(self, size: int = 224) -> float:
+        """
+        Run one inference on a blank image so graph construction and
+        allocation happen before the first real frame.
+        
+        Args:
+            size: Side length of the synthetic warm-up image
+        
+        Returns:
+            Seconds spent on the warm-up inference
+        """
+        blank = np.zeros((size, size, 3), dtype=np.uint8)
+        start = time.perf_counter()
+        self.model.detect_faces(blank)
+        self.warmup_time_sec = time.perf_counter() - start
+        return self.warmup_time_sec
+    
+    def detect(self, image: np.ndarray) -> List[Dict]:
+        """
+        Detect faces in a decoded BGR image.
+        
+        Args:
+            image: BGR image array
+        
+        Returns:
+            List of normalized detections (see detect_faces_in_image)
+        """
+        if self._lock is not None:
+            with self._lock:
+                faces = self.model.detect_faces(image)
+        else:
+            faces = self.model.detect_faces(image)
+        self._count_call()
+        return [_normalize_face(face) for face in faces]
+    
+    def _run_batch(self, images: List[np.ndarray]) -> Optional[List]:
+        """
+        Try a single batched detector call.
+        
+        Returns:
+            Per-image raw results, or None if the backend rejected the batch
+        
+        Raises:
+            Exception: Any error once batching has already worked, so a
+                       transient failure does not disable batching for good
+        """
+        try:
+            if self._lock is not None:
+                with self._lock:
+                    batch_faces = self.model.detect_faces(images)
+            else:
+                batch_faces = self.model.detect_faces(images)
+        except Exception:
+            # Detectors that expect one ndarray fail on a list in many ways
+            # (AttributeError on img.shape, cv2.error, TypeError...), so any
+            # error on the first probe means the backend cannot batch
+            if self.supports_batch is None:
+                return None
+            raise
+        
+        # A batch-aware backend returns one list of faces per input image
+        if (
+            not isinstance(batch_faces, list)
+            or len(batch_faces) != len(images)
+            or not all(isinstance(faces, list) for faces in batch_faces)
+        ):
+            return None
+        return batch_faces
+    
+    def detect_batch(self, images: List[np.ndarray]) -> List[List[Dict]]:
+        """
+        Detect faces in several decoded BGR images.
+        
+        Images are sent to the model as one batch when the backend supports
+        it; otherwise they are processed in a tight loop over the model.
+        
+        Args:
+            images: List of BGR image arrays
+        
+        Returns:
+            One list of normalized detections per input image
+        """
+        if len(images) > 1 and self.supports_batch is not False:
+            batch_faces = self._run_batch(images)
+            if batch_faces is not None:
+                self._count_call(supports_batch=True)
+                return [
+                    [_normalize_face(face) for face in faces]
+                    for faces in batch_faces
+                ]
+            with self._state_lock:
+                self.supports_batch = False
+        
+        return [self.detect(image) for image in images]
+
+
+class DetectorPool:
+    """
+    Thread-safe registry of warm face detectors keyed by backend.
+    
+    Each backend is built and warmed up at most once; concurrent callers
+    asking for a backend that is still loading wait for that load instead
+    of starting their own.
+    """
+    
+    def __init__(self, warmup: bool = True):
+        """
+        Initialize an empty detector pool.
+        
+        Args:
+            warmup: Run a warm-up inference after building each backend
+        """
+        self.warmup = warmup
+        self._detectors: Dict[str, DetectorHandle] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, backend: str = "retinaface") -> DetectorHandle:
+        """
+        Return the warm detector for a backend, loading it on first use.
+        
+        Args:
+            backend: Detector backend name
+        
+        Returns:
+            DetectorHandle for the backend
+        
+        Raises:
+            ValueError: If the backend cannot be built
+        """
+        handle = self._detectors.get(backend)
+        if handle is not None:
+            return handle
+        
+        with self._lock:
+            load_lock = self._load_locks.setdefault(backend, threading.Lock())
+        
+        with load_lock:
+            # Another thread may have finished loading while we waited
+            handle = self._detectors.get(backend)
+            if handle is not None:
+                return handle
+            
+            start = time.perf_counter()
+            try:
+                model = DeepFace.build_model(model_name=backend, task="face_detector")
+            except Exception as e:
+                raise ValueError(f"Failed to load detector '{backend}': {e}")
+            handle = DetectorHandle(backend, model, time.perf_counter() - start)
+            
+            if self.warmup:
+                handle.warm_up()
+            
+            logger.info(
+                "Loaded detector %s (load %.2fs, warm-up %.2fs)",
+                backend, handle.load_time_sec, handle.warmup_time_sec
+            )
+            self._detectors[backend] = handle
+            return handle
+    
+    def loaded_backends(self) -> List[str]:
+        """Return the names of backends that are already loaded."""
+        return list(self._detectors)
+    
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Report load cost and usage for every loaded backend.
+        
+        Returns:
+            Dictionary mapping backend name to load_time_sec,
+            warmup_time_sec and calls
+        """
+        return {
+            backend: {
+                'load_time_sec': handle.load_time_sec,
+                'warmup_time_sec': handle.warmup_time_sec,
+                'calls': handle.calls
+            }
+            for backend, handle in self._detectors.items()
+        }
+    
+    def clear(self) -> None:
+        """Drop all loaded detectors."""
+        with self._lock:
+            self._detectors.clear()
+            self._load_locks.clear()
+
+
+# Process-wide pool shared by detect_faces_in_image, DetectStage and the CLIs
+_default_pool = DetectorPool()
+
+
+def get_detector_pool() -> DetectorPool:
+    """Return the process-wide detector pool."""
+    return _default_pool
+
+
+def get_detector(detector_backend: str = "retinaface") -> DetectorHandle:
+    """
+    Return the shared warm detector for a backend.
+    
+    Args:
+        detector_backend: Detector backend name
+    
+    Returns:
+        DetectorHandle from the process-wide pool
+    """
+    return _default_pool.get(detector_backend)
+
+
+def downscale_image(image: np.ndarray, max_side: int) -> Tuple[np.ndarray, float]:
+    """
+    Shrink an image so its longest side is at most max_side.
+    
+    Args:
+        image: BGR image array
+        max_side: Maximum length of the longest side in pixels
+    
+    Returns:
+        (resized image, scale factor). Images already small enough are
+        returned unchanged with a scale of 1.0.
+    """
+    height, width = image.shape[:2]
+    scale = max_side / max(height, width)
+    if scale >= 1.0:
+        return image, 1.0
+    resized = cv2.resize(
+        image,
+        (max(1, int(round(width * scale))), max(1, int(round(height * scale)))),
+        interpolation=cv2.INTER_AREA
+    )
+    return resized, scale
+
+
+def _refine_candidates(
+    detector: DetectorHandle,
+    image: np.ndarray,
+    candidates: List[Dict],
+    padding: float = 0.5,
+    keep_unmatched: bool = True
+) -> List[Dict]:
+    """
+    Re-detect each candidate box on a padded full-resolution crop.
+    
+    A candidate is replaced by the best-overlapping face found in its crop;
+    if the crop yields nothing the coarse candidate is kept, unless
+    keep_unmatched is False.
+    """
+    height, width = image.shape[:2]
+    refined = []
+    for candidate in candidates:
+        bbox = candidate['bbox']
+        pad_x = int(bbox['w'] * padding)
+        pad_y = int(bbox['h'] * padding)
+        x0 = max(0, bbox['x'] - pad_x)
+        y0 = max(0, bbox['y'] - pad_y)
+        x1 = min(width, bbox['x'] + bbox['w'] + pad_x)
+        y1 = min(height, bbox['y'] + bbox['h'] + pad_y)
+        if x1 <= x0 or y1 <= y0:
+            continue
+        
+        crop_faces = scale_detections(detector.detect(image[y0:y1, x0:x1]), 1.0, (x0, y0))
+        if crop_faces:
+            refined.append(max(crop_faces, key=lambda face: bbox_iou(face['bbox'], bbox)))
+        elif keep_unmatched:
+            refined.append(candidate)
+    return non_max_suppression(refined)
+
+
+def _detect_fast(
+    detector: DetectorHandle,
+    image: np.ndarray,
+    detect_size: int,
+    refine: bool = False
+) -> List[Dict]:
+    """Detect on a downscaled copy and map boxes back to full resolution."""
+    small, scale = downscale_image(image, detect_size)
+    detections = scale_detections(detector.detect(small), scale)
+    if refine and scale < 1.0 and detections:
+        detections = _refine_candidates(detector, image, detections)
+    return detections
+
+
+class CascadeStats:
+    """
+    Counters for cascaded detection.
+    
+    Tracks how many images the cheap prefilter screened and rejected, how
+    many expensive detector calls ran on full images or candidate regions,
+    and the time spent in each stage. Updates go through add(), so one
+    instance can be shared by several detection threads.
+    """
+    
+    def __init__(self):
+        """Initialize all counters to zero."""
+        self.screened = 0
+        self.rejected = 0
+        self.full_detections = 0
+        self.region_detections = 0
+        self.prefilter_time_sec = 0.0
+        self.detector_time_sec = 0.0
+        self._lock = threading.Lock()
+    
+    def add(self, **counts) -> None:
+        """
+        Increment counters by name, e.g. add(screened=1, rejected=1).
+        
+        Args:
+            **counts: Counter names and amounts to add
+        """
+        with self._lock:
+            for name, amount in counts.items():
+                setattr(self, name, getattr(self, name) + amount)
+    
+    @property
+    def detector_calls_saved(self) -> int:
+        """Full-image detector calls avoided because the prefilter found nothing."""
+        return self.rejected
+    
+    def as_dict(self) -> Dict:
+        """Return the counters as a dictionary."""
+        return {
+            'screened': self.screened,
+            'rejected': self.rejected,
+            'passed': self.screened - self.rejected,
+            'full_detections': self.full_detections,
+            'region_detections': self.region_detections,
+            'detector_calls_saved': self.detector_calls_saved,
+            'prefilter_time_sec': self.prefilter_time_sec,
+            'detector_time_sec': self.detector_time_sec,
+        }
+    
+    def summary(self) -> str:
+        """One-line human-readable summary of the counters."""
+        return (
+            f"Cascade: screened {self.screened}, rejected {self.rejected} "
+            f"({self.detector_calls_saved} detector call(s) saved), "
+            f"prefilter {self.prefilter_time_sec:.2f}s, detector {self.detector_time_sec:.2f}s"
+        )
+
+
+def _screening_backend(
+    detector_backend: str,
+    prefilter_backend: Optional[str],
+    cascade: bool
+) -> Optional[str]:
+    """Backend screening images before the detector, or None with the cascade off."""
+    if prefilter_backend:
+        return prefilter_backend
+    return detector_backend if cascade else None
+
+
+def _prefilter(
+    image: np.ndarray,
+    prefilter_backend: str,
+    prefilter_size: Optional[int],
+    stats: CascadeStats
+) -> List[Dict]:
+    """Run the cheap prefilter pass and return candidates in original coordinates."""
+    start = time.perf_counter()
+    prefilter = get_detector(prefilter_backend)
+    if prefilter_size:
+        candidates = _detect_fast(prefilter, image, prefilter_size)
+    else:
+        candidates = prefilter.detect(image)
+    stats.add(
+        screened=1,
+        rejected=0 if candidates else 1,
+        prefilter_time_sec=time.perf_counter() - start
+    )
+    return candidates
+
+
+def detect_faces_cascade(
+    image_path: ImageInput,
+    detector_backend: str = "retinaface",
+    prefilter_backend: Optional[str] = "opencv",
+    prefilter_size: Optional[int] = DEFAULT_PREFILTER_SIZE,
+    regions: bool = False,
+    stats: Optional[CascadeStats] = None
+) -> List[Dict]:
+    """
+    Detect faces with a cheap prefilter in front of the expensive detector.
+    
+    The prefilter (a cheap backend such as OpenCV's Haar cascade, or the
+    main backend on a downscaled image when prefilter_backend is None)
+    screens the image first. Images with no candidates are returned empty
+    without running the expensive backend. Otherwise the expensive backend
+    runs on the whole image, or only on padded regions around each
+    candidate when regions is True.
+    
+    Recall is bounded by the prefilter: faces it misses are never seen by
+    the expensive backend, so pick a prefilter_size large enough for the
+    smallest faces of interest.
+    
+    Args:
+        image_path: Path to the image file, or a BGR image array
+        detector_backend: Expensive detection backend (default: "retinaface")
+        prefilter_backend: Cheap backend used for screening (default: "opencv"),
+                           or None to screen with detector_backend itself
+        prefilter_size: Longest image side for the prefilter pass, or None
+                        for full resolution
+        regions: Run the expensive backend on candidate regions only
+        stats: Optional CascadeStats updated with per-stage counters
+    
+    Returns:
+        List of detections in the same format as detect_faces_in_image()
+    
+    Raises:
+        FileNotFoundError: If image_path does not exist
+        ValueError: If image cannot be processed
+    """
+    stats = stats if stats is not None else CascadeStats()
+    image = load_image(image_path)
+    
+    try:
+        candidates = _prefilter(
+            image, prefilter_backend or detector_backend, prefilter_size, stats
+        )
+        if not candidates:
+            return []
+        
+        start = time.perf_counter()
+        detector = get_detector(detector_backend)
+        if regions:
+            stats.add(region_detections=len(candidates))
+            results = _refine_candidates(
+                detector, image, candidates, padding=1.0, keep_unmatched=False
+            )
+        else:
+            stats.add(full_detections=1)
+            results = detector.detect(image)
+        stats.add(detector_time_sec=time.perf_counter() - start)
+    except Exception as e:
+        raise ValueError(f"Error processing image: {e}")
+    return results
+
 
 def detect_faces_in_image(
-    image_path: str,
-    detector_backend: str = "retinaface"
+    image_path: ImageInput,
+    detector_backend: str = "retinaface",
+    cache: Optional[DetectionCache] = None,
+    detect_size: Optional[int] = None,
+    refine: bool = False,
+    prefilter_backend: Optional[str] = None,
+    cascade_stats: Optional[CascadeStats] = None,
+    cascade: bool = False,
+    prefilter_size: Optional[int] = DEFAULT_PREFILTER_SIZE
 ) -> List[Dict]:
     """
-    Detect faces in an image using DeepFace.
+    Detect faces in an image using a warm DeepFace detector.
+    
+    The detector for each backend is loaded once per process and reused
+    (see DetectorPool). With detect_size set, detection runs on a copy
+    downscaled to that longest side ("fast detect") and boxes are mapped
+    back to original coordinates; refine re-detects each candidate on a
+    full-resolution crop to recover precise boxes. Without refine, JPEG
+    paths are decoded directly at a reduced scale covering detect_size
+    (see load_image_for_detection).
     
     Args:
-        image_path: Path to the image file
+        image_path: Path to the image file, or a BGR image array such as a
+                    frame from cv2.VideoCapture.read(). Arrays are passed to
+                    the detector directly without being written to disk.
         detector_backend: Detection backend to use (default: "retinaface")
                          Options: retinaface, mtcnn, opencv, ssd, dlib, mediapipe
+        cache: Optional DetectionCache; results for image files are looked up
+               by content hash and stored after detection
+        detect_size: Longest image side used for detection, or None for
+                     full resolution
+        refine: Refine fast-detect candidates at full resolution
+        prefilter_backend: Cheap backend screening the image first; if it finds
+                           nothing the detector is skipped (see detect_faces_cascade)
+        cascade_stats: Optional CascadeStats updated with per-stage counters
+        cascade: Screen with detector_backend itself on a prefilter_size copy
+                 when no prefilter_backend is given
+        prefilter_size: Longest image side for the prefilter pass, or None
+                        for full resolution
     
     Returns:
         List of detected faces, each containing:
             - bbox: dict with x, y, w, h (bounding box coordinates)
             - confidence: float (detection confidence score)
+        The list is empty when no face is found. (DeepFace.extract_faces,
+        used before the detector pool, returned the whole image as a single
+        zero-confidence face instead.)
     
     Raises:
         FileNotFoundError: If image_path does not exist
         ValueError: If image cannot be processed
     """
-    # Verify image exists
-    img_path = Path(image_path)
-    if not img_path.exists():
-        raise FileNotFoundError(f"Image not found: {image_path}")
+    screening_backend = _screening_backend(detector_backend, prefilter_backend, cascade)
+    cache_key = None
+    if cache is not None and not isinstance(image_path, np.ndarray):
+        if not Path(image_path).exists():
+            raise FileNotFoundError(f"Image not found: {image_path}")
+        params = {}
+        if detect_size:
+            params.update(detect_size=detect_size, refine=refine)
+        if screening_backend:
+            params.update(prefilter_backend=screening_backend, prefilter_size=prefilter_size)
+        cache_key = cache.key_for_file(str(image_path), detector_backend, params or None)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
     
-    # Run face detection
+    # Refinement crops at full resolution, so it needs the full decode
+    if detect_size and not refine:
+        image, decode_scale = load_image_for_detection(image_path, detect_size)
+    else:
+        image, decode_scale = load_image(image_path), 1.0
+    detector = get_detector(detector_backend)
+    
+    # Run face detection, unless the cascade prefilter rejects the image
     try:
-        faces = DeepFace.extract_faces(
-            img_path=str(image_path),
-            detector_backend=detector_backend,
-            enforce_detection=False,  # Don't raise error if no faces found
-            align=False  # Don't align faces, just detect
-        )
+        passed = True
+        if screening_backend:
+            if cascade_stats is None:
+                cascade_stats = CascadeStats()
+            passed = bool(
+                _prefilter(image, screening_backend, prefilter_size, cascade_stats)
+            )
+        
+        if not passed:
+            results = []
+        elif detect_size:
+            results = _detect_fast(detector, image, detect_size, refine)
+        else:
+            results = detector.detect(image)
+        
+        if passed and cascade_stats is not None:
+            cascade_stats.add(full_detections=1)
+        if decode_scale != 1.0:
+            results = scale_detections(results, decode_scale)
     except Exception as e:
         raise ValueError(f"Error processing image: {e}")
     
-    # Normalize results
-    results = []
-    for face in faces:
-        # Extract facial area (bounding box)
-        facial_area = face.get('facial_area', {})
-        
-        # Get confidence score
-        confidence = face.get('confidence', 0.0)
-        
-        # Build normalized result
-        result = {
-            'bbox': {
-                'x': facial_area.get('x', 0),
-                'y': facial_area.get('y', 0),
-                'w': facial_area.get('w', 0),
-                'h': facial_area.get('h', 0)
-            },
-            'confidence': confidence
-        }
-        results.append(result)
+    if cache_key is not None:
+        cache.put(cache_key, results)
+    return results
+
+
+def detect_faces_batch(
+    images: Sequence[ImageInput],
+    detector_backend: str = "retinaface",
+    batch_size: int = 10,
+    detect_size: Optional[int] = None,
+    prefilter_backend: Optional[str] = None,
+    prefilter_size: Optional[int] = DEFAULT_PREFILTER_SIZE,
+    cascade_stats: Optional[CascadeStats] = None,
+    cascade: bool = False
+) -> List[List[Dict]]:
+    """
+    Detect faces in many images or frames, batch_size at a time.
     
+    Paths are decoded one batch at a time, so memory stays bounded by
+    batch_size images regardless of how many inputs are given; with
+    detect_size, JPEG paths are decoded at a reduced scale. With a
+    prefilter_backend (or cascade), each image is screened first (see
+    detect_faces_cascade) and only images with candidates are batched
+    through the expensive detector.
+    
+    Args:
+        images: Image paths and/or BGR image arrays
+        detector_backend: Detection backend to use (default: "retinaface")
+        batch_size: Number of images sent to the detector per call
+        detect_size: Longest image side used for detection, or None for
+                     full resolution (see detect_faces_in_image)
+        prefilter_backend: Cheap backend screening each image, or None to
+                           disable the cascade
+        prefilter_size: Longest image side for the prefilter pass
+        cascade_stats: Optional CascadeStats updated with per-stage counters
+        cascade: Screen with detector_backend itself on a prefilter_size copy
+                 when no prefilter_backend is given
+    
+    Returns:
+        One list of detections per input image, in input order, in the
+        same format as detect_faces_in_image()
+    
+    Raises:
+        FileNotFoundError: If an image path does not exist
+        ValueError: If batch_size is not positive or an image cannot be processed
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+    
+    screening_backend = _screening_backend(detector_backend, prefilter_backend, cascade)
+    if screening_backend and cascade_stats is None:
+        cascade_stats = CascadeStats()
+    
+    detector = get_detector(detector_backend)
+    results: List[List[Dict]] = []
+    for start in range(0, len(images), batch_size):
+        batch, decode_scales = map(list, zip(*(
+            load_image_for_detection(image, detect_size) for image in images[start:start + batch_size]
+        )))
+        batch_results: List[List[Dict]] = [[] for _ in batch]
+        try:
+            # Indices of images that go on to the expensive detector
+            keep = list(range(len(batch)))
+            if screening_backend:
+                keep = [
+                    i for i in keep
+                    if _prefilter(batch[i], screening_backend, prefilter_size, cascade_stats)
+                ]
+            
+            if keep:
+                detect_start = time.perf_counter()
+                inputs = [batch[i] for i in keep]
+                scales = [1.0] * len(inputs)
+                if detect_size:
+                    inputs, scales = map(
+                        list, zip(*(downscale_image(img, detect_size) for img in inputs))
+                    )
+                batch_detections = detector.detect_batch(inputs)
+                for i, detections, scale in zip(keep, batch_detections, scales):
+                    batch_results[i] = scale_detections(detections, scale * decode_scales[i])
+                if cascade_stats is not None:
+                    cascade_stats.add(
+                        full_detections=len(keep),
+                        detector_time_sec=time.perf_counter() - detect_start
+                    )
+        except Exception as e:
+            raise ValueError(f"Error processing image batch: {e}")
+        results.extend(batch_results)
     return results
 
 
@@ -85,6 +791,11 @@ def main():
     print(f"Using detector: {detector_backend}\n")
     
     try:
+        detector = get_detector(detector_backend)
+        print(
+            f"Detector ready (load {detector.load_time_sec:.2f}s, "
+            f"warm-up {detector.warmup_time_sec:.2f}s)\n"
+        )
         results = detect_faces_in_image(image_path, detector_backend)
         
         print(f"Detected {len(results)} face(s):\n")
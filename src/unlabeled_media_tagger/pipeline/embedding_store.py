@@ -0,0 +1,364 @@
+"""
+Embedding Store Module
+
+This module stores face embeddings and their detection metadata on disk in
+append-only segments that are read through np.memmap, so neither loading
+nor comparing the collection requires holding it in RAM or pickling it.
+
+A store is a directory:
+
+- seg-GGGGG-NNNNN.emb: raw embedding rows (float32 or float16, dim values
+  each) of segment N written in compaction generation G
+- seg-GGGGG-NNNNN.meta: raw sidecar rows (SIDECAR_DTYPE: face id plus the
+  DETECTION_DTYPE fields source_id, frame_index, timestamp, bbox, confidence)
+- sources.txt: source paths, one per line, indexed by source_id
+- tombstones.i64: ids of deleted faces
+- manifest.json: the committed row count of every file above
+
+Rows are written and flushed before the manifest is atomically replaced,
+so a reader that loads the manifest only maps complete rows. One writer
+can therefore append while any number of readers (opened with
+readonly=True) keep reading; a reader sees new rows after refresh().
+compact() rewrites the live rows into fresh segments and drops deleted ones.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .checkpoint import atomic_write_text
+from .results import DETECTION_DTYPE, DetectionResults
+
+
+# Sidecar row: the face id followed by the detection fields
+SIDECAR_DTYPE = np.dtype([('face_id', np.int64)] + DETECTION_DTYPE.descr)
+
+DEFAULT_SEGMENT_ROWS = 1 << 20
+
+_MANIFEST = "manifest.json"
+_SOURCES = "sources.txt"
+_TOMBSTONES = "tombstones.i64"
+
+
+class EmbeddingStore:
+    """
+    Append-only, memory-mapped store of face embeddings and detection metadata.
+
+    Faces get sequential ids in append order. Only one process may write to
+    a store at a time.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dim: Optional[int] = None,
+        dtype: str = 'float32',
+        segment_rows: int = DEFAULT_SEGMENT_ROWS,
+        readonly: bool = False
+    ):
+        """
+        Open a store, creating it if needed.
+
+        Args:
+            path: Store directory
+            dim: Embedding dimension (required to create a store)
+            dtype: Embedding dtype of a new store, 'float32' or 'float16'
+            segment_rows: Rows per segment before a new one is started
+            readonly: Open for reading only
+
+        Raises:
+            FileNotFoundError: If the store does not exist and cannot be created
+            ValueError: If dim is missing for a new store or does not match
+        """
+        self.path = Path(path)
+        self.readonly = readonly
+        manifest = self.path / _MANIFEST
+        if not manifest.exists():
+            if readonly:
+                raise FileNotFoundError(f"No embedding store in: {path}")
+            if dim is None:
+                raise ValueError("dim is required to create an embedding store")
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._manifest = {
+                'dim': dim,
+                'dtype': np.dtype(dtype).name,
+                'segment_rows': segment_rows,
+                'next_face_id': 0,
+                'segments': [],
+                'sources': 0,
+                'tombstones': 0,
+                'generation': 0,
+            }
+            self._write_manifest()
+        self._views = {}
+        self.refresh()
+        if dim is not None and dim != self.dim:
+            raise ValueError(f"Store has dimension {self.dim}, not {dim}")
+
+    @property
+    def dim(self) -> int:
+        return self._manifest['dim']
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(self._manifest['dtype'])
+
+    def _write_manifest(self) -> None:
+        atomic_write_text(str(self.path / _MANIFEST), json.dumps(self._manifest, indent=1))
+
+    def refresh(self) -> None:
+        """Reload the manifest, making rows committed since opening visible."""
+        with open(self.path / _MANIFEST, 'r', encoding='utf-8') as f:
+            self._manifest = json.load(f)
+        sources_path = self.path / _SOURCES
+        text = sources_path.read_text(encoding='utf-8') if sources_path.exists() else ''
+        self._sources = text.split('\n')[:self._manifest['sources']]
+        count = self._manifest['tombstones']
+        try:
+            deleted = np.fromfile(self.path / _TOMBSTONES, dtype=np.int64, count=count) \
+                if count else np.empty(0, dtype=np.int64)
+        except FileNotFoundError:
+            deleted = None
+        if deleted is None or len(deleted) < count:
+            # A concurrent compact() dropped the tombstones after the manifest
+            # was read; the manifest it committed first no longer counts them
+            return self.refresh()
+        self._deleted = np.sort(deleted)
+        # Drop cached maps of segments that changed or disappeared
+        current = {(s['name'], s['rows']) for s in self._manifest['segments']}
+        self._views = {key: view for key, view in self._views.items() if key in current}
+
+    def _segment_view(self, segment) -> Tuple[np.ndarray, np.ndarray]:
+        key = (segment['name'], segment['rows'])
+        if key not in self._views:
+            rows = segment['rows']
+            if rows:
+                embeddings = np.memmap(self.path / f"{segment['name']}.emb", dtype=self.dtype,
+                                       mode='r', shape=(rows, self.dim))
+                sidecar = np.memmap(self.path / f"{segment['name']}.meta", dtype=SIDECAR_DTYPE,
+                                    mode='r', shape=(rows,))
+            else:
+                embeddings = np.empty((0, self.dim), dtype=self.dtype)
+                sidecar = np.empty(0, dtype=SIDECAR_DTYPE)
+            self._views[key] = (embeddings, sidecar)
+        return self._views[key]
+
+    def segments(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Return zero-copy (embeddings, sidecar) views of every segment.
+
+        Views include deleted rows; use live_mask() to skip them. If a
+        concurrent compact() removed a segment since the last refresh(), the
+        manifest is reloaded once.
+        """
+        try:
+            return [self._segment_view(segment) for segment in self._manifest['segments']]
+        except FileNotFoundError:
+            self.refresh()
+            return [self._segment_view(segment) for segment in self._manifest['segments']]
+
+    def live_mask(self, sidecar: np.ndarray) -> np.ndarray:
+        """Return a mask of sidecar rows that have not been deleted."""
+        if not len(self._deleted):
+            return np.ones(len(sidecar), dtype=bool)
+        return ~np.isin(sidecar['face_id'], self._deleted)
+
+    def iter_blocks(self, block_rows: int = 65536) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Yield (embeddings, sidecar) blocks of live rows in face id order.
+
+        Blocks without deleted rows are zero-copy slices of the memmaps.
+
+        Args:
+            block_rows: Maximum rows per block
+        """
+        for embeddings, sidecar in self.segments():
+            for start in range(0, len(sidecar), block_rows):
+                block_embeddings = embeddings[start:start + block_rows]
+                block_sidecar = sidecar[start:start + block_rows]
+                live = self.live_mask(block_sidecar)
+                if not live.all():
+                    block_embeddings, block_sidecar = block_embeddings[live], block_sidecar[live]
+                if len(block_sidecar):
+                    yield block_embeddings, block_sidecar
+
+    def face_ids(self) -> np.ndarray:
+        """Return the ids of live faces in face id order, without reading embeddings."""
+        ids = [sidecar['face_id'][self.live_mask(sidecar)] for _, sidecar in self.segments()]
+        return np.concatenate(ids) if ids else np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        """Number of live faces."""
+        return sum(s['rows'] for s in self._manifest['segments']) - len(self._deleted)
+
+    @property
+    def sources(self) -> List[str]:
+        """Source paths indexed by source_id."""
+        return list(self._sources)
+
+    def load_all(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Read every live row into memory.
+
+        Returns:
+            (embeddings of shape (N, dim), sidecar rows)
+        """
+        blocks = list(self.iter_blocks())
+        if not blocks:
+            return np.empty((0, self.dim), dtype=self.dtype), np.empty(0, dtype=SIDECAR_DTYPE)
+        return np.concatenate([b[0] for b in blocks]), np.concatenate([b[1] for b in blocks])
+
+    def detections(self, sidecar: np.ndarray) -> DetectionResults:
+        """Return sidecar rows as DetectionResults with the store's sources."""
+        array = np.empty(len(sidecar), dtype=DETECTION_DTYPE)
+        for field in DETECTION_DTYPE.names:
+            array[field] = sidecar[field]
+        return DetectionResults(array, self.sources)
+
+    def _require_writer(self) -> None:
+        if self.readonly:
+            raise PermissionError(f"Embedding store opened read-only: {self.path}")
+
+    def _source_ids(self, sources: Sequence[str]) -> np.ndarray:
+        """Map source paths to store source ids, appending new ones."""
+        known = {source: index for index, source in enumerate(self._sources)}
+        new = [source for source in dict.fromkeys(sources) if source not in known]
+        if new:
+            with open(self.path / _SOURCES, 'a', encoding='utf-8') as f:
+                # Stored lines end at the committed count; a torn tail is overwritten
+                f.truncate(sum(len(s.encode('utf-8')) + 1 for s in self._sources))
+                for source in new:
+                    f.write(source.replace('\n', ' ') + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            for source in new:
+                known[source] = len(self._sources)
+                self._sources.append(source)
+        return np.array([known[source] for source in sources], dtype=np.int32)
+
+    def append(self, embeddings, detections: Optional[DetectionResults] = None) -> np.ndarray:
+        """
+        Append faces and commit them.
+
+        Args:
+            embeddings: Array of shape (N, dim)
+            detections: DetectionResults with one row per embedding (default:
+                        rows with no source, frame or box)
+
+        Returns:
+            The new face ids
+
+        Raises:
+            ValueError: If shapes do not match
+            PermissionError: If the store is read-only
+        """
+        self._require_writer()
+        embeddings = np.ascontiguousarray(embeddings, dtype=self.dtype)
+        if embeddings.ndim != 2 or embeddings.shape[1] != self.dim:
+            raise ValueError(f"Expected embeddings of shape (N, {self.dim}), got {embeddings.shape}")
+        count = len(embeddings)
+        sidecar = np.zeros(count, dtype=SIDECAR_DTYPE)
+        if detections is not None:
+            if len(detections) != count:
+                raise ValueError(f"{len(detections)} detections for {count} embeddings")
+            for field in DETECTION_DTYPE.names:
+                sidecar[field] = detections.array[field]
+            sources = [detections.sources[i] if i < len(detections.sources) else ''
+                       for i in detections.array['source_id']]
+            sidecar['source_id'] = self._source_ids(sources) if count else []
+        else:
+            sidecar['source_id'] = -1
+            sidecar['frame_index'] = -1
+            sidecar['timestamp'] = np.nan
+        first_id = self._manifest['next_face_id']
+        sidecar['face_id'] = np.arange(first_id, first_id + count)
+
+        written = 0
+        while written < count:
+            segments = self._manifest['segments']
+            if not segments or segments[-1]['rows'] >= self._manifest['segment_rows']:
+                segments.append({'name': f"seg-{self._manifest['generation']:05d}-{len(segments):05d}",
+                                 'rows': 0})
+            segment = segments[-1]
+            take = min(count - written, self._manifest['segment_rows'] - segment['rows'])
+            self._append_rows(segment, embeddings[written:written + take], sidecar[written:written + take])
+            segment['rows'] += take
+            written += take
+
+        self._manifest['next_face_id'] = first_id + count
+        self._manifest['sources'] = len(self._sources)
+        self._write_manifest()
+        return sidecar['face_id'].copy()
+
+    def _append_rows(self, segment, embeddings: np.ndarray, sidecar: np.ndarray) -> None:
+        """Write rows after the segment's committed rows and flush them."""
+        for suffix, array, row_bytes in (
+            ('emb', embeddings, self.dim * self.dtype.itemsize),
+            ('meta', sidecar, SIDECAR_DTYPE.itemsize),
+        ):
+            with open(self.path / f"{segment['name']}.{suffix}", 'ab') as f:
+                # Discard rows a crashed writer left after the committed count
+                f.truncate(segment['rows'] * row_bytes)
+                f.write(array.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+    def delete(self, face_ids: Sequence[int]) -> int:
+        """
+        Mark faces as deleted; their rows are dropped by the next compact().
+
+        Returns:
+            Number of faces newly deleted
+        """
+        self._require_writer()
+        new = np.setdiff1d(np.asarray(face_ids, dtype=np.int64), self._deleted)
+        new = new[(new >= 0) & (new < self._manifest['next_face_id'])]
+        if not len(new):
+            return 0
+        with open(self.path / _TOMBSTONES, 'ab') as f:
+            f.truncate(self._manifest['tombstones'] * 8)
+            f.write(new.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        self._deleted = np.union1d(self._deleted, new)
+        self._manifest['tombstones'] += len(new)
+        self._write_manifest()
+        return len(new)
+
+    def compact(self) -> None:
+        """
+        Rewrite live rows into full segments and drop deleted rows.
+
+        Face ids are kept. Readers that mapped old segments keep reading
+        them until they refresh(); the old files are removed afterwards
+        (on POSIX, open maps stay valid).
+        """
+        self._require_writer()
+        old_names = [segment['name'] for segment in self._manifest['segments']]
+        generation = self._manifest['generation'] + 1
+        segment_rows = self._manifest['segment_rows']
+
+        # Live blocks are streamed from the old maps into the new segments
+        new_segments = []
+        for embeddings, sidecar in self.iter_blocks():
+            start = 0
+            while start < len(sidecar):
+                if not new_segments or new_segments[-1]['rows'] == segment_rows:
+                    new_segments.append({'name': f"seg-{generation:05d}-{len(new_segments):05d}", 'rows': 0})
+                segment = new_segments[-1]
+                take = min(len(sidecar) - start, segment_rows - segment['rows'])
+                self._append_rows(segment, embeddings[start:start + take], sidecar[start:start + take])
+                segment['rows'] += take
+                start += take
+
+        self._manifest.update(segments=new_segments, tombstones=0, generation=generation)
+        self._write_manifest()
+        (self.path / _TOMBSTONES).unlink(missing_ok=True)
+        self._deleted = np.empty(0, dtype=np.int64)
+        self._views = {}
+        for name in old_names:
+            for suffix in ('emb', 'meta'):
+                (self.path / f"{name}.{suffix}").unlink(missing_ok=True)
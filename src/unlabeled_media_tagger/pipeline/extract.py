@@ -2,8 +2,136 @@
 Extract Stage - Media Frame and Metadata Extraction
 
 This module handles extracting frames, timestamps, and metadata from media files.
+Frames are produced lazily: a background thread decodes ahead of the consumer
+into a buffer bounded by a memory budget, so long high-resolution videos never
+hold more than that many bytes of frames at once. Metadata and embedded EXIF
+thumbnails are read from file headers without decoding the media.
 """
 
+import threading
+from collections import deque
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from .frame_sampler import FrameSampler
+from ..config.settings import get_option
+from ..utils.file_utils import is_image_file, is_video_file
+from ..utils.media_headers import HeaderError, read_exif_thumbnail, read_media_header
+
+# cv2.rotate codes turning an EXIF-oriented image upright (mirrored variants unrotated)
+_EXIF_ROTATIONS = {
+    3: cv2.ROTATE_180,
+    6: cv2.ROTATE_90_CLOCKWISE,
+    8: cv2.ROTATE_90_COUNTERCLOCKWISE,
+}
+
+_face_cascade_instance = None
+
+
+def _face_cascade():
+    """
+    Load OpenCV's frontal-face Haar cascade once.
+    
+    Returns None on OpenCV builds that ship without Haar cascades.
+    """
+    global _face_cascade_instance
+    if _face_cascade_instance is None:
+        data = getattr(cv2, "data", None)
+        if not hasattr(cv2, "CascadeClassifier") or data is None:
+            return None
+        cascade = cv2.CascadeClassifier(data.haarcascades + "haarcascade_frontalface_default.xml")
+        if cascade.empty():
+            return None
+        _face_cascade_instance = cascade
+    return _face_cascade_instance
+
+
+class FramePrefetcher:
+    """
+    Iterate over (timestamp, frame) pairs decoded ahead on a background thread.
+    
+    The decoder thread keeps at most memory_budget_bytes of frames buffered
+    (always at least one frame, even if a single frame is larger). Stopping
+    iteration early, or closing the prefetcher, stops the decoder thread and
+    closes the source iterator.
+    
+    After iteration, peak_bytes reports the largest amount buffered at once.
+    """
+    
+    def __init__(self, source, memory_budget_bytes):
+        """
+        Initialize the prefetcher.
+        
+        Args:
+            source: Iterator of (timestamp, frame) pairs, consumed on the decoder thread
+            memory_budget_bytes: Maximum bytes of decoded frames buffered ahead
+        """
+        self.source = source
+        self.memory_budget_bytes = max(0, int(memory_budget_bytes))
+        self.peak_bytes = 0
+        self._buffer = deque()
+        self._buffered_bytes = 0
+        self._done = False
+        self._stopped = False
+        self._error = None
+        self._cond = threading.Condition()
+        self._thread = None
+    
+    def _decode(self):
+        try:
+            for timestamp, frame in self.source:
+                with self._cond:
+                    # Wait for room; an empty buffer always accepts one frame
+                    while (not self._stopped and self._buffer
+                           and self._buffered_bytes + frame.nbytes > self.memory_budget_bytes):
+                        self._cond.wait()
+                    if self._stopped:
+                        break
+                    self._buffer.append((timestamp, frame))
+                    self._buffered_bytes += frame.nbytes
+                    self.peak_bytes = max(self.peak_bytes, self._buffered_bytes)
+                    self._cond.notify_all()
+        except BaseException as e:
+            self._error = e
+        finally:
+            close = getattr(self.source, "close", None)
+            if close is not None:
+                close()
+            with self._cond:
+                self._done = True
+                self._cond.notify_all()
+    
+    def __iter__(self):
+        self._thread = threading.Thread(target=self._decode, name="frame-prefetch", daemon=True)
+        self._thread.start()
+        try:
+            while True:
+                with self._cond:
+                    while not self._buffer and not self._done:
+                        self._cond.wait()
+                    if not self._buffer:
+                        break
+                    timestamp, frame = self._buffer.popleft()
+                    self._buffered_bytes -= frame.nbytes
+                    self._cond.notify_all()
+                yield timestamp, frame
+        finally:
+            self.close()
+        if self._error is not None:
+            raise self._error
+    
+    def close(self):
+        """Stop the decoder thread and drop buffered frames."""
+        with self._cond:
+            self._stopped = True
+            self._buffer.clear()
+            self._buffered_bytes = 0
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
 
 class ExtractStage:
     """
@@ -12,8 +140,12 @@ class ExtractStage:
     This stage is responsible for:
     - Extracting frames from videos at specified intervals
     - Extracting timestamps and duration information
-    - Reading EXIF data from images
+    - Reading EXIF data and embedded thumbnails from image headers
     - Preparing media data for analysis
+    
+    Recognized configuration options: frame_interval (seconds, default 1.0),
+    max_frames (default: no limit), sampling_strategy (default "auto") and
+    frame_memory_budget_mb (default 256).
     """
     
     def __init__(self, config=None):
@@ -24,18 +156,244 @@ class ExtractStage:
             config: Configuration dictionary for extraction settings
         """
         self.config = config or {}
+        self.frame_interval = get_option(self.config, "frame_interval", 1.0)
+        self.max_frames = get_option(self.config, "max_frames")
+        self.sampling_strategy = get_option(self.config, "sampling_strategy", "auto")
+        self.frame_memory_budget_mb = get_option(self.config, "frame_memory_budget_mb", 256)
+    
+    def _video_frames(self, media_file):
+        """Yield (timestamp, frame) pairs sampled from a video."""
+        cap = cv2.VideoCapture(str(media_file))
+        if not cap.isOpened():
+            raise ValueError(f"Failed to open video: {media_file}")
+        try:
+            sampler = FrameSampler.from_path(
+                cap, str(media_file),
+                frame_interval_sec=self.frame_interval,
+                max_frames=self.max_frames,
+                strategy=self.sampling_strategy
+            )
+            for _, timestamp, frame in sampler:
+                yield timestamp, frame
+        finally:
+            cap.release()
+    
+    def iter_frames(self, media_file):
+        """
+        Lazily yield sampled frames from a media file.
+        
+        Video frames are decoded ahead on a background thread, holding at most
+        frame_memory_budget_mb of frames in memory. An image yields itself
+        once with timestamp 0.0.
+        
+        Args:
+            media_file: Path to an image or video file
+        
+        Yields:
+            (timestamp, frame) pairs, frame being a BGR numpy array
+        
+        Raises:
+            FileNotFoundError: If media_file does not exist
+            ValueError: If the file type is unsupported or cannot be decoded
+        """
+        if not Path(media_file).exists():
+            raise FileNotFoundError(f"Media file not found: {media_file}")
+        
+        if is_image_file(media_file):
+            image = cv2.imread(str(media_file))
+            if image is None:
+                raise ValueError(f"Failed to load image: {media_file}")
+            yield 0.0, image
+            return
+        if not is_video_file(media_file):
+            raise ValueError(f"Unsupported media file: {media_file}")
+        
+        budget = self.frame_memory_budget_mb * 1024 * 1024
+        yield from FramePrefetcher(self._video_frames(media_file), budget)
+    
+    def feed_ring(self, media_file, ring, consumers=1):
+        """
+        Stream sampled frames into a SharedFrameRing for worker processes.
+        
+        Frames are copied into shared memory instead of being pickled; put()
+        blocks while every ring slot is in use, so memory stays bounded by the
+        ring size. Consumers are told the stream has ended even on error.
+        
+        Args:
+            media_file: Path to an image or video file
+            ring: SharedFrameRing read by the worker processes
+            consumers: Number of worker processes reading the ring
+        
+        Returns:
+            Number of frames put into the ring
+        """
+        count = 0
+        try:
+            for timestamp, frame in self.iter_frames(media_file):
+                ring.put(frame, timestamp)
+                count += 1
+        finally:
+            ring.finish(consumers)
+        return count
+    
+    def _probe_video(self, media_file):
+        """Read video metadata through a capture, for containers without a parsed header."""
+        cap = cv2.VideoCapture(str(media_file))
+        try:
+            if not cap.isOpened():
+                raise ValueError(f"Failed to open video: {media_file}")
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            return {
+                "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                "fps": fps,
+                "frame_count": frame_count,
+                "duration_sec": frame_count / fps if fps > 0 else 0.0,
+            }
+        finally:
+            cap.release()
+    
+    def extract_metadata(self, media_file):
+        """
+        Read a media file's metadata from its header, without decoding it.
+        
+        Dimensions, EXIF fields and video duration come from the container
+        header (see utils.media_headers). Formats whose header cannot be
+        parsed fall back to OpenCV: a video capture for videos, a full decode
+        for images.
+        
+        Args:
+            media_file: Path to an image or video file
+        
+        Returns:
+            Dictionary with width and height (as displayed, i.e. after EXIF
+            orientation), for videos fps, frame_count and duration_sec, and
+            for images with an EXIF block an exif dictionary
+        
+        Raises:
+            FileNotFoundError: If media_file does not exist
+            ValueError: If the file type is unsupported or cannot be read
+        """
+        if not Path(media_file).exists():
+            raise FileNotFoundError(f"Media file not found: {media_file}")
+        is_video = is_video_file(media_file)
+        if not is_video and not is_image_file(media_file):
+            raise ValueError(f"Unsupported media file: {media_file}")
+        
+        try:
+            header = read_media_header(str(media_file))
+        except HeaderError:
+            header = None
+        
+        if is_video:
+            if header is None or "duration_sec" not in header or "width" not in header:
+                return self._probe_video(media_file)
+            fps = header.get("fps", 0.0)
+            frame_count = header.get("frame_count", int(round(header["duration_sec"] * fps)))
+            return {
+                "width": header["width"],
+                "height": header["height"],
+                "fps": fps,
+                "frame_count": frame_count,
+                "duration_sec": header["duration_sec"],
+            }
+        
+        if header is None:
+            _, image = next(self.iter_frames(media_file))
+            height, width = image.shape[:2]
+            return {"width": width, "height": height}
+        
+        metadata = {"width": header["width"], "height": header["height"]}
+        exif = header.get("exif")
+        if exif:
+            if exif.get("orientation", 1) >= 5:
+                # Orientations 5-8 rotate by 90 degrees, as cv2.imread does
+                metadata["width"], metadata["height"] = metadata["height"], metadata["width"]
+            metadata["exif"] = {
+                key: value for key, value in exif.items() if not key.startswith("thumbnail_")
+            }
+        return metadata
+    
+    def extract_thumbnail(self, media_file):
+        """
+        Decode the JPEG thumbnail embedded in an image's EXIF block.
+        
+        Only the header and the thumbnail bytes are read; the full image is
+        never decoded. The thumbnail is rotated to the EXIF orientation.
+        
+        Args:
+            media_file: Path to an image file
+        
+        Returns:
+            BGR numpy array, or None if the file has no embedded thumbnail
+        """
+        try:
+            header = read_media_header(str(media_file))
+        except (HeaderError, OSError):
+            return None
+        data = read_exif_thumbnail(str(media_file), header)
+        if data is None:
+            return None
+        thumbnail = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if thumbnail is None:
+            return None
+        orientation = header.get("exif", {}).get("orientation", 1)
+        rotation = _EXIF_ROTATIONS.get(orientation)
+        return cv2.rotate(thumbnail, rotation) if rotation is not None else thumbnail
+    
+    def prescreen_faces(self, media_file):
+        """
+        Check for likely faces on the embedded thumbnail only.
+        
+        Runs OpenCV's frontal-face Haar cascade on the EXIF thumbnail, so an
+        image with no face candidates can be skipped before its full decode.
+        Recall is bounded by the thumbnail resolution: faces smaller than
+        about a tenth of the image side are easily missed, so use this to
+        order or skip work only where that loss is acceptable.
+        
+        Args:
+            media_file: Path to an image file
+        
+        Returns:
+            True if the thumbnail shows face candidates, False if it shows
+            none, or None if the file has no thumbnail or OpenCV has no Haar
+            cascades (decide on the full image)
+        """
+        cascade = _face_cascade()
+        thumbnail = self.extract_thumbnail(media_file) if cascade is not None else None
+        if thumbnail is None:
+            return None
+        gray = cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY)
+        faces = cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=3, minSize=(12, 12))
+        return len(faces) > 0
     
     def extract(self, media_file):
         """
         Extract frames and metadata from a media file.
         
+        Nothing is decoded up front: metadata comes from the file header (see
+        extract_metadata) and 'frames' is a lazy iterator (see iter_frames),
+        so memory stays bounded however long the video is.
+        
         Args:
             media_file: Path to the media file to process
-            
+        
         Returns:
-            Dictionary containing extracted frames, timestamps, and metadata
-            
+            Dictionary containing:
+                - media_file: the input path
+                - media_type: "image" or "video"
+                - metadata: as returned by extract_metadata
+                - frames: iterator of (timestamp, frame) pairs
+        
         Raises:
-            NotImplementedError: This is a placeholder for future implementation
+            FileNotFoundError: If media_file does not exist
+            ValueError: If the file type is unsupported or cannot be opened
         """
-        raise NotImplementedError("Extract stage not yet implemented")
+        metadata = self.extract_metadata(media_file)
+        return {
+            "media_file": str(media_file),
+            "media_type": "video" if is_video_file(media_file) else "image",
+            "metadata": metadata,
+            "frames": self.iter_frames(media_file),
+        }
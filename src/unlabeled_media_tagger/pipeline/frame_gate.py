@@ -0,0 +1,119 @@
+"""
+Near-Duplicate Frame Gating Module
+
+This module decides whether a sampled video frame differs enough from the
+last frame that went through the detector to be worth detecting again.
+Static footage (talking heads, fixed security cameras) produces long runs
+of nearly identical frames whose detections can simply be reused.
+
+Frames are compared by a cheap signature: the frame converted to grayscale
+and downscaled to a small thumbnail, so noise and compression artifacts
+average out. The difference is the mean absolute pixel difference between
+two thumbnails, on a 0-255 scale.
+"""
+
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+# Thumbnail side used for frame signatures
+SIGNATURE_SIZE = 32
+
+
+def frame_signature(frame: np.ndarray, size: int = SIGNATURE_SIZE) -> np.ndarray:
+    """
+    Compute a small grayscale thumbnail used to compare frames.
+
+    Args:
+        frame: BGR or grayscale image
+        size: Side of the square thumbnail
+
+    Returns:
+        (size, size) float32 array of intensities in 0-255
+    """
+    if frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    thumb = cv2.resize(frame, (size, size), interpolation=cv2.INTER_AREA)
+    return thumb.astype(np.float32)
+
+
+def signature_difference(a: np.ndarray, b: np.ndarray) -> float:
+    """Mean absolute difference between two signatures (0-255)."""
+    return float(np.abs(a - b).mean())
+
+
+class FrameGate:
+    """
+    Flag sampled frames that are near-duplicates of the last detected frame.
+
+    Each frame is compared against the reference frame, i.e. the last frame
+    that was sent to the detector, not against its immediate predecessor, so
+    a slow drift still triggers detection once it adds up past the threshold.
+
+    After processing, checked, reused and last_difference describe the run.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 2.0,
+        max_reuse: Optional[int] = None,
+        size: int = SIGNATURE_SIZE
+    ):
+        """
+        Initialize a frame gate.
+
+        Args:
+            threshold: Mean absolute thumbnail difference (0-255) at or below
+                       which a frame counts as unchanged
+            max_reuse: Force detection after this many consecutive reused
+                       frames, or None for no limit
+            size: Thumbnail side used for signatures
+
+        Raises:
+            ValueError: If threshold is negative
+        """
+        if threshold < 0:
+            raise ValueError(f"threshold must not be negative, got {threshold}")
+        self.threshold = threshold
+        self.max_reuse = max_reuse
+        self.size = size
+
+        self._reference: Optional[np.ndarray] = None
+        self._run = 0
+        self.checked = 0
+        self.reused = 0
+        self.last_difference: Optional[float] = None
+
+    def is_duplicate(self, frame: np.ndarray) -> bool:
+        """
+        Check a frame and update the reference when it must be detected.
+
+        Args:
+            frame: Sampled frame, in playback order
+
+        Returns:
+            True if the previous detections can be reused for this frame
+        """
+        self.checked += 1
+        signature = frame_signature(frame, self.size)
+
+        if self._reference is not None:
+            self.last_difference = signature_difference(signature, self._reference)
+            under_limit = self.max_reuse is None or self._run < self.max_reuse
+            if self.last_difference <= self.threshold and under_limit:
+                self._run += 1
+                self.reused += 1
+                return True
+
+        self._reference = signature
+        self._run = 0
+        return False
+
+    def summary(self) -> str:
+        """Return a one-line human-readable summary."""
+        return (
+            f"Frame gate: reused detections for {self.reused}/{self.checked} frame(s) "
+            f"(threshold {self.threshold})"
+        )
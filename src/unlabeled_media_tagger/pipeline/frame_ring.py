@@ -0,0 +1,163 @@
+"""
+Shared-Memory Frame Ring Module
+
+This module passes decoded frames from a producer to worker processes
+through a ring of fixed-size slots in one shared-memory block, instead of
+pickling every frame through a pipe. Only small messages travel through
+multiprocessing queues: the slot index, timestamp, shape and dtype.
+
+The producer takes a free slot, copies the frame into it and announces it;
+a consumer maps the slot as a NumPy array without copying and hands the
+slot back with release() once done. With every slot in use, put() blocks,
+which bounds memory to slots * slot_bytes.
+"""
+
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+
+class SharedFrameRing:
+    """
+    Fixed-size ring of shared-memory frame slots.
+
+    Create the ring in the producer process and pass it to worker processes
+    as a Process argument; workers attach to the same memory when unpickled.
+    """
+
+    def __init__(self, slots: int, slot_bytes: int, ctx=None):
+        """
+        Create a ring.
+
+        Args:
+            slots: Number of frames that can be in flight at once
+            slot_bytes: Size of each slot; must fit the largest frame
+                        (height * width * channels for uint8 frames)
+            ctx: multiprocessing context used for the queues (default: spawn)
+
+        Raises:
+            ValueError: If slots or slot_bytes is not positive
+        """
+        if slots < 1 or slot_bytes < 1:
+            raise ValueError("slots and slot_bytes must be positive")
+        ctx = ctx or multiprocessing.get_context("spawn")
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self._shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        self._owner = True
+        self._free = ctx.Queue()
+        self._ready = ctx.Queue()
+        for slot in range(slots):
+            self._free.put(slot)
+
+    @classmethod
+    def for_frame(cls, frame_shape: Tuple[int, ...], slots: int = 8, dtype=np.uint8, ctx=None) -> "SharedFrameRing":
+        """Create a ring whose slots fit frames of the given shape and dtype."""
+        slot_bytes = int(np.prod(frame_shape)) * np.dtype(dtype).itemsize
+        return cls(slots, slot_bytes, ctx)
+
+    @property
+    def name(self) -> str:
+        """Name of the shared-memory block."""
+        return self._shm.name
+
+    def __getstate__(self):
+        return {
+            "slots": self.slots,
+            "slot_bytes": self.slot_bytes,
+            "name": self._shm.name,
+            "free": self._free,
+            "ready": self._ready,
+        }
+
+    def __setstate__(self, state):
+        self.slots = state["slots"]
+        self.slot_bytes = state["slot_bytes"]
+        self._free = state["free"]
+        self._ready = state["ready"]
+        self._shm = shared_memory.SharedMemory(name=state["name"])
+        self._owner = False
+        try:
+            # Only the creating process may unlink the block; stop this
+            # process's resource tracker from doing so when it exits
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+        except Exception:
+            pass
+
+    def _view(self, slot: int, shape: Tuple[int, ...], dtype: str) -> np.ndarray:
+        return np.ndarray(shape, dtype=np.dtype(dtype), buffer=self._shm.buf, offset=slot * self.slot_bytes)
+
+    def put(self, frame: np.ndarray, timestamp: float, timeout: Optional[float] = None) -> None:
+        """
+        Copy a frame into a free slot and announce it to consumers.
+
+        Blocks while every slot is in use.
+
+        Args:
+            frame: Frame array
+            timestamp: Frame time in seconds
+            timeout: Seconds to wait for a free slot (default: forever)
+
+        Raises:
+            ValueError: If the frame does not fit in a slot
+            queue.Empty: If no slot became free within timeout
+        """
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame of {frame.nbytes} bytes does not fit a {self.slot_bytes}-byte slot")
+        slot = self._free.get(timeout=timeout)
+        self._view(slot, frame.shape, frame.dtype.str)[...] = frame
+        self._ready.put((slot, timestamp, frame.shape, frame.dtype.str))
+
+    def finish(self, consumers: int = 1) -> None:
+        """Tell consumers that no more frames will be put."""
+        for _ in range(consumers):
+            self._ready.put(None)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[int, float, np.ndarray]]:
+        """
+        Take the next announced frame.
+
+        The returned array is a view into shared memory; call release(slot)
+        when done with it, after which it may be overwritten.
+
+        Args:
+            timeout: Seconds to wait for a frame (default: forever)
+
+        Returns:
+            (slot, timestamp, frame), or None once the producer has finished
+        """
+        item = self._ready.get(timeout=timeout)
+        if item is None:
+            return None
+        slot, timestamp, shape, dtype = item
+        return slot, timestamp, self._view(slot, shape, dtype)
+
+    def release(self, slot: int) -> None:
+        """Return a slot to the producer."""
+        self._free.put(slot)
+
+    def __iter__(self) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        Yield (timestamp, frame) until the producer finishes.
+
+        Each slot is released when the next frame is requested, so copy a
+        frame that must outlive the loop iteration.
+        """
+        while True:
+            item = self.get()
+            if item is None:
+                return
+            slot, timestamp, frame = item
+            try:
+                yield timestamp, frame
+            finally:
+                self.release(slot)
+
+    def close(self) -> None:
+        """Detach from the shared memory, freeing it in the creating process."""
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
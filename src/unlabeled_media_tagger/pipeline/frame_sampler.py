@@ -0,0 +1,259 @@
+"""
+Video Frame Sampling Module
+
+This module samples frames from a video at a fixed time interval without
+fully decoding every frame in between. Three strategies are available:
+
+- grab: advance with cap.grab() and only cap.retrieve() sampled frames,
+  which skips the color conversion and copy of unsampled frames
+- seek: jump straight to each sample with CAP_PROP_POS_FRAMES, so only the
+  frames between the preceding keyframe and the sample are decoded
+- read: decode every frame with cap.read() (the original behavior)
+
+Seeking is frame-accurate: the FFmpeg backend decodes forward from the
+preceding keyframe to the requested frame. OpenCV has no keyframe-only
+decoding, so seeking saves work only when samples are a GOP or more apart.
+
+The "auto" strategy picks the cheapest one for the container and codec.
+"""
+
+import math
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+# Containers whose demuxers seek reliably by frame index in OpenCV's FFmpeg backend
+SEEKABLE_CONTAINERS = {'.mp4', '.m4v', '.mov', '.mkv', '.webm', '.avi'}
+
+# Codecs where every frame is a keyframe, so a seek decodes exactly one frame
+INTRA_ONLY_CODECS = {'MJPG', 'MJPA', 'mjpg', 'jpeg', 'PNG ', 'png ', 'apch', 'apcn', 'apcs', 'apco', 'ap4h', 'AVdn'}
+
+# For inter-frame codecs, seek only when samples are at least this far apart;
+# closer samples fall within one GOP and grabbing through them is cheaper
+SEEK_MIN_GAP_SEC = 2.0
+
+
+def video_fourcc(cap: cv2.VideoCapture) -> str:
+    """
+    Return the four-character codec code of an open capture.
+
+    Args:
+        cap: Opened video capture
+
+    Returns:
+        Codec code such as "avc1" or "MJPG", or "" if unknown
+    """
+    code = int(cap.get(cv2.CAP_PROP_FOURCC))
+    if code <= 0:
+        return ""
+    return code.to_bytes(4, 'little').decode('latin-1')
+
+
+def choose_strategy(
+    container: str,
+    fourcc: str,
+    frame_interval_sec: float,
+    fps: float,
+    frame_count: int
+) -> str:
+    """
+    Pick the cheapest sampling strategy for a video.
+
+    Args:
+        container: File extension, e.g. ".mp4"
+        fourcc: Codec code from video_fourcc()
+        frame_interval_sec: Seconds between samples
+        fps: Frames per second reported by the capture
+        frame_count: Frame count reported by the capture
+
+    Returns:
+        "seek" or "grab"
+    """
+    # Without a frame rate and length we cannot compute seek targets
+    if fps <= 0 or frame_count <= 0 or container.lower() not in SEEKABLE_CONTAINERS:
+        return 'grab'
+
+    gap_frames = frame_interval_sec * fps
+    if fourcc in INTRA_ONLY_CODECS:
+        return 'seek' if gap_frames > 1 else 'grab'
+    return 'seek' if frame_interval_sec >= SEEK_MIN_GAP_SEC else 'grab'
+
+
+class FrameSampler:
+    """
+    Iterate over frames sampled every frame_interval_sec seconds.
+
+    When max_frames is set and the duration is known, the interval is
+    widened so the frame budget is spread evenly across the whole video
+    instead of being used up at the start.
+
+    frame_interval_sec may be changed between samples to sample adaptively;
+    the new interval applies from the next sample on.
+
+    start_sec and end_sec restrict sampling to a time range, so several
+    workers can each sample one shard of a long video. Sample times stay on
+    the same grid (multiples of frame_interval_sec) as a pass over the
+    whole video, so the shards together yield the same frames.
+
+    After iteration, decoded and skipped report how many frames were
+    converted to images and how many were passed over up to the last
+    sample. With seek, the decoder may still decode some skipped frames
+    internally on its way from a keyframe to a sample.
+    """
+
+    STRATEGIES = ('auto', 'grab', 'seek', 'read')
+
+    def __init__(
+        self,
+        cap: cv2.VideoCapture,
+        frame_interval_sec: float = 1.0,
+        max_frames: Optional[int] = None,
+        strategy: str = 'auto',
+        container: str = '',
+        start_sec: float = 0.0,
+        end_sec: Optional[float] = None
+    ):
+        """
+        Initialize a frame sampler.
+
+        Args:
+            cap: Opened video capture, positioned at the start
+            frame_interval_sec: Seconds between sampled frames
+            max_frames: Maximum number of frames to yield, or None for no limit
+            strategy: One of "auto", "grab", "seek" or "read"
+            container: File extension of the video, used by "auto"
+            start_sec: Start of the time range to sample (default: 0.0)
+            end_sec: End of the time range, exclusive (default: end of video)
+
+        Raises:
+            ValueError: If the strategy, interval or time range is invalid
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown sampling strategy '{strategy}', expected one of {self.STRATEGIES}")
+        if frame_interval_sec <= 0:
+            raise ValueError(f"frame_interval_sec must be positive, got {frame_interval_sec}")
+        if start_sec < 0 or (end_sec is not None and end_sec <= start_sec):
+            raise ValueError(f"Invalid time range: start_sec={start_sec}, end_sec={end_sec}")
+
+        self.cap = cap
+        self.fps = cap.get(cv2.CAP_PROP_FPS)
+        self.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.duration_sec = self.frame_count / self.fps if self.fps > 0 else 0.0
+        self.max_frames = max_frames
+        self.start_sec = start_sec
+        self.end_sec = end_sec
+
+        self.frame_interval_sec = frame_interval_sec
+        range_end = min(end_sec, self.duration_sec) if end_sec is not None else self.duration_sec
+        range_sec = range_end - start_sec
+        if max_frames and range_sec > 0:
+            budget_interval = range_sec / max_frames
+            # Ignore float noise, so a budget that exactly fits the range
+            # (as plan_tasks gives shards) keeps the grid unchanged
+            if budget_interval > frame_interval_sec * (1 + 1e-9):
+                self.frame_interval_sec = budget_interval
+
+        if strategy == 'auto':
+            strategy = choose_strategy(
+                container, video_fourcc(cap), self.frame_interval_sec, self.fps, self.frame_count
+            )
+        self.strategy = strategy
+
+        self.decoded = 0
+        self.skipped = 0
+
+    @classmethod
+    def from_path(cls, cap: cv2.VideoCapture, video_path: str, **kwargs) -> "FrameSampler":
+        """Create a sampler using the container type of video_path."""
+        return cls(cap, container=Path(video_path).suffix, **kwargs)
+
+    def __iter__(self) -> Iterator[Tuple[int, float, np.ndarray]]:
+        """
+        Yield sampled frames.
+
+        Yields:
+            (frame_number, time_sec, frame) for each sampled frame
+        """
+        if self.max_frames is not None and self.max_frames <= 0:
+            return
+        if self.strategy == 'seek':
+            samples = self._iter_seek()
+        else:
+            samples = self._iter_sequential(retrieve_all=self.strategy == 'read')
+
+        for count, sample in enumerate(samples, 1):
+            yield sample
+            if self.max_frames and count >= self.max_frames:
+                break
+
+    def _first_sample_time(self) -> float:
+        """Return the first sample time on the interval grid at or after start_sec."""
+        if self.start_sec <= 0:
+            return 0.0
+        # Round away float noise so a start exactly on the grid is kept
+        steps = math.ceil(round(self.start_sec / self.frame_interval_sec, 9))
+        return steps * self.frame_interval_sec
+
+    def _before_end(self, time_sec: float) -> bool:
+        return self.end_sec is None or time_sec < self.end_sec - 1e-9
+
+    def _iter_sequential(self, retrieve_all: bool) -> Iterator[Tuple[int, float, np.ndarray]]:
+        """Walk every frame, decoding to an image only when sampling."""
+        frame_number = 0
+        next_sample_time_ms = self._first_sample_time() * 1000.0
+
+        if self.start_sec > 0 and self.fps > 0:
+            # Land a little before the first sample; the grab loop walks up to it
+            frame_number = max(0, int(self.start_sec * self.fps) - 1)
+            if not self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number):
+                frame_number = 0
+            else:
+                frame_number = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+
+        while self.cap.grab():
+            current_time_ms = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+            if not self._before_end(current_time_ms / 1000.0):
+                break
+
+            if retrieve_all or current_time_ms >= next_sample_time_ms:
+                ret, frame = self.cap.retrieve()
+                if not ret:
+                    break
+                self.decoded += 1
+
+                if current_time_ms >= next_sample_time_ms:
+                    yield frame_number, current_time_ms / 1000.0, frame
+                    next_sample_time_ms += self.frame_interval_sec * 1000.0
+            else:
+                self.skipped += 1
+
+            frame_number += 1
+
+    def _iter_seek(self) -> Iterator[Tuple[int, float, np.ndarray]]:
+        """Seek directly to each sample's frame index."""
+        next_sample_time = self._first_sample_time()
+        previous_frame = math.ceil(round(self.start_sec * self.fps, 9)) - 1
+        while self._before_end(next_sample_time):
+            target_frame = int(round(next_sample_time * self.fps))
+            if target_frame >= self.frame_count:
+                break
+
+            if not self.cap.set(cv2.CAP_PROP_POS_FRAMES, target_frame):
+                break
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            self.decoded += 1
+
+            # The FFmpeg backend lands on target_frame exactly; read the
+            # position back in case another backend rounds the seek
+            frame_number = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES)) - 1
+            time_sec = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            self.skipped += max(0, frame_number - previous_frame - 1)
+            previous_frame = frame_number
+            yield frame_number, time_sec, frame
+
+            next_sample_time += self.frame_interval_sec
@@ -0,0 +1,307 @@
+"""
+Parallel Graph Clustering Module
+
+This module clusters very large face sets (a whole back catalogue) in one
+offline run. The thresholded similarity graph is built in row stripes of
+the upper-triangular score matrix, spread over a process pool: the
+prepared embeddings are placed in shared memory once, and each worker
+scores one stripe block by block and returns only the pairs that pass the
+threshold. Memory therefore grows with the number of edges, never with N².
+
+The sparse graph is then clustered with one of:
+
+- components: connected components (single linkage, as cluster_embeddings)
+- chinese_whispers: weighted label propagation, which splits chains that
+  single linkage would merge
+- dbscan: density-based clustering on the graph; faces with fewer than
+  min_samples - 1 neighbors that touch no dense face are noise (label -1)
+"""
+
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from .embedding_store import EmbeddingStore
+from .similarity import SimilarityEngine, concat_pairs, connected_components, neighbor_lists
+from ..utils.workers import available_cpus, limit_threads, plan_workers
+
+
+GRAPH_METHODS = ('components', 'chinese_whispers', 'dbscan')
+
+# Per-process state set up by _init_worker
+_worker_state: Dict = {}
+
+
+def _init_worker(name: str, shape: Tuple[int, int], dtype: str, metric: str,
+                 threshold: float, block_size: int, threads: int) -> None:
+    """Process pool initializer: cap the worker's threads and attach to the shared embedding matrix."""
+    limit_threads(threads)
+    # Spawned pool workers share the parent's resource tracker, so the
+    # block stays registered once and is unlinked by the parent
+    shm = shared_memory.SharedMemory(name=name)
+    _worker_state.update({
+        "shm": shm,
+        "embeddings": np.ndarray(shape, dtype=dtype, buffer=shm.buf),
+        "engine": SimilarityEngine(metric, dtype, block_size),
+        "threshold": threshold,
+    })
+
+
+def _stripe_pairs(row: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Matching pairs of one row stripe, scored in the worker."""
+    return _stripe(_worker_state["engine"], _worker_state["embeddings"], row, _worker_state["threshold"])
+
+
+def _stripe(engine: SimilarityEngine, prepared: np.ndarray, row: int,
+            threshold: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pairs between rows row..row + block_size and every later row."""
+    queries = prepared[row:row + engine.block_size]
+    return concat_pairs([
+        engine.block_pairs(row, col, engine.scores(queries, prepared[col:col + engine.block_size]), threshold)
+        for col in range(row, len(prepared), engine.block_size)
+    ])
+
+
+def _embedding_blocks(embeddings, block_size: int) -> Tuple[Iterator[np.ndarray], Tuple[int, int]]:
+    """Row blocks of an array or of an EmbeddingStore's live memmapped rows, and the full shape."""
+    if isinstance(embeddings, EmbeddingStore):
+        blocks = (block for block, _ in embeddings.iter_blocks(block_size))
+        return blocks, (len(embeddings), embeddings.dim)
+    embeddings = np.asarray(embeddings)
+    if embeddings.ndim != 2:
+        raise ValueError(f"Embeddings must have shape (N, D), got {embeddings.shape}")
+    blocks = (embeddings[row:row + block_size] for row in range(0, len(embeddings), block_size))
+    return blocks, embeddings.shape
+
+
+def threshold_graph(
+    embeddings,
+    threshold: float,
+    metric: str = 'cosine',
+    dtype: str = 'float32',
+    block_size: int = 2048,
+    workers: Optional[int] = 1
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build the thresholded similarity graph, in parallel row stripes.
+
+    Args:
+        embeddings: Array-like of shape (N, D), or an EmbeddingStore whose
+                    live rows are read block by block from its memmaps
+        threshold: Minimum cosine similarity or maximum L2 distance
+        metric: 'cosine' or 'l2'
+        dtype: 'float32' or 'float16'
+        block_size: Rows per stripe and columns per block
+        workers: Worker processes (None = available cores, 1 = in-process)
+
+    Returns:
+        (rows, cols, scores) with rows < cols, one entry per matching pair
+    """
+    engine = SimilarityEngine(metric, dtype, block_size)
+    blocks, shape = _embedding_blocks(embeddings, block_size)
+    stripes = range(0, shape[0], block_size)
+    workers = min(plan_workers(workers), len(stripes))
+    if workers <= 1:
+        prepared = engine.prepare_into(blocks, np.empty(shape, dtype=engine.dtype))
+        return concat_pairs([_stripe(engine, prepared, row, threshold) for row in stripes])
+
+    # Blocks are prepared straight into the shared matrix
+    shm = shared_memory.SharedMemory(create=True, size=max(1, shape[0] * shape[1] * engine.dtype.itemsize))
+    try:
+        engine.prepare_into(blocks, np.ndarray(shape, dtype=engine.dtype, buffer=shm.buf))
+        # Workers split the cores between them; each sets its own limit, so
+        # the parent's environment is never touched
+        threads = max(1, len(available_cpus()) // workers)
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(
+            processes=workers,
+            initializer=_init_worker,
+            initargs=(shm.name, shape, engine.dtype.name, metric, threshold, block_size, threads),
+        ) as pool:
+            return concat_pairs(list(pool.imap_unordered(_stripe_pairs, stripes)))
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def edge_weights(scores: np.ndarray, metric: str = 'cosine') -> np.ndarray:
+    """Positive edge weights, larger for closer faces."""
+    return scores if metric == 'cosine' else 1.0 / (1.0 + scores)
+
+
+def chinese_whispers(
+    n: int,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    weights: np.ndarray,
+    iterations: int = 20,
+    seed: int = 0
+) -> np.ndarray:
+    """
+    Cluster a weighted graph with Chinese Whispers.
+
+    Every node starts in its own cluster and repeatedly adopts the label
+    with the largest total edge weight among its neighbors (ties go to the
+    smaller label). Nodes are visited in a random order, in chunks that are
+    updated together, until no label changes.
+
+    Args:
+        n: Number of nodes
+        rows, cols: Edges, each listed once
+        weights: Positive weight of each edge
+        iterations: Maximum passes over all nodes
+        seed: Random seed for the visiting order
+
+    Returns:
+        Array of n cluster labels numbered 0..
+    """
+    rng = np.random.default_rng(seed)
+    indptr, neighbors, neighbor_weights = neighbor_lists(n, rows, cols, weights)
+    degree = np.diff(indptr)
+    labels = np.arange(n, dtype=np.int64)
+    connected = np.flatnonzero(degree)
+    for _ in range(iterations):
+        changed = 0
+        for chunk in np.array_split(rng.permutation(connected), min(16, max(1, len(connected)))):
+            if not len(chunk):
+                continue
+            counts = degree[chunk]
+            owners = np.repeat(np.arange(len(chunk)), counts)
+            ends = np.cumsum(counts)
+            edges = np.arange(ends[-1]) - np.repeat(ends - counts - indptr[chunk], counts)
+            candidate = labels[neighbors[edges]]
+
+            # Total weight per (node, neighbor label), then the heaviest label per node
+            order = np.lexsort((candidate, owners))
+            owners, candidate = owners[order], candidate[order]
+            starts = np.flatnonzero(np.r_[True, (owners[1:] != owners[:-1]) | (candidate[1:] != candidate[:-1])])
+            totals = np.add.reduceat(neighbor_weights[edges][order], starts)
+            owners, candidate = owners[starts], candidate[starts]
+            best = np.lexsort((candidate, -totals, owners))
+            first = best[np.r_[True, owners[best][1:] != owners[best][:-1]]]
+
+            updated = candidate[first]
+            changed += int(np.count_nonzero(labels[chunk] != updated))
+            labels[chunk] = updated
+        if not changed:
+            break
+    return np.unique(labels, return_inverse=True)[1]
+
+
+def dbscan(
+    n: int,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    scores: np.ndarray,
+    min_samples: int = 2,
+    metric: str = 'cosine'
+) -> np.ndarray:
+    """
+    DBSCAN over a thresholded graph (eps is the graph threshold).
+
+    Core nodes have at least min_samples - 1 neighbors. Connected core
+    nodes form clusters, every other node joins the cluster of its closest
+    core neighbor, and nodes with no core neighbor are noise.
+
+    Args:
+        n: Number of nodes
+        rows, cols: Edges, each listed once
+        scores: Similarity or distance of each edge
+        min_samples: Minimum neighborhood size of a core node, itself included
+        metric: 'cosine' or 'l2', to tell which scores are closer
+
+    Returns:
+        Array of n labels numbered 0.., with -1 for noise
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    degree = np.bincount(rows, minlength=n) + np.bincount(cols, minlength=n)
+    core = degree + 1 >= min_samples
+    core_edges = core[rows] & core[cols]
+    components = connected_components(n, rows[core_edges], cols[core_edges])
+
+    labels = np.full(n, -1, dtype=np.int64)
+    labels[core] = np.unique(components[core], return_inverse=True)[1]
+
+    # Border nodes: edges from a non-core node to a core node, closest first
+    border = core[rows] != core[cols]
+    nodes = np.where(core[rows[border]], cols[border], rows[border])
+    anchors = np.where(core[rows[border]], rows[border], cols[border])
+    closeness = -scores[border] if metric == 'cosine' else scores[border]
+    order = np.lexsort((closeness, nodes))
+    nodes, anchors = nodes[order], anchors[order]
+    first = np.r_[True, nodes[1:] != nodes[:-1]] if len(nodes) else np.empty(0, dtype=bool)
+    labels[nodes[first]] = labels[anchors[first]]
+    return labels
+
+
+def cluster_graph(
+    n: int,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    scores: np.ndarray,
+    method: str = 'components',
+    metric: str = 'cosine',
+    min_samples: int = 2,
+    iterations: int = 20
+) -> np.ndarray:
+    """
+    Cluster a thresholded similarity graph.
+
+    Args:
+        n: Number of nodes
+        rows, cols, scores: Pairs as returned by threshold_graph
+        method: 'components', 'chinese_whispers' or 'dbscan'
+        metric: 'cosine' or 'l2'
+        min_samples: DBSCAN core neighborhood size
+        iterations: Chinese Whispers passes
+
+    Returns:
+        Array of n labels numbered 0.. (-1 marks DBSCAN noise)
+
+    Raises:
+        ValueError: If method is unknown
+    """
+    if method == 'components':
+        return connected_components(n, rows, cols)
+    if method == 'chinese_whispers':
+        return chinese_whispers(n, rows, cols, edge_weights(scores, metric), iterations)
+    if method == 'dbscan':
+        return dbscan(n, rows, cols, scores, min_samples, metric)
+    raise ValueError(f"Unknown clustering method '{method}', expected one of {GRAPH_METHODS}")
+
+
+def cluster_embeddings_parallel(
+    embeddings,
+    threshold: float,
+    method: str = 'components',
+    metric: str = 'cosine',
+    dtype: str = 'float32',
+    block_size: int = 2048,
+    workers: Optional[int] = None,
+    min_samples: int = 2
+) -> np.ndarray:
+    """
+    Build the similarity graph over a process pool, then cluster it.
+
+    Args:
+        embeddings: Array-like of shape (N, D), or an EmbeddingStore
+        threshold: Minimum cosine similarity or maximum L2 distance
+        method: 'components', 'chinese_whispers' or 'dbscan'
+        metric: 'cosine' or 'l2'
+        dtype: 'float32' or 'float16'
+        block_size: Rows per stripe and columns per block
+        workers: Worker processes (None = available cores, 1 = in-process)
+        min_samples: DBSCAN core neighborhood size
+
+    Returns:
+        Array of N labels numbered 0.. (-1 marks DBSCAN noise)
+    """
+    if method not in GRAPH_METHODS:
+        raise ValueError(f"Unknown clustering method '{method}', expected one of {GRAPH_METHODS}")
+    if not isinstance(embeddings, EmbeddingStore):
+        embeddings = np.asarray(embeddings)
+    rows, cols, scores = threshold_graph(embeddings, threshold, metric, dtype, block_size, workers)
+    return cluster_graph(len(embeddings), rows, cols, scores, method, metric, min_samples)
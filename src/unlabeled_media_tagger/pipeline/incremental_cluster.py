@@ -0,0 +1,221 @@
+"""
+Incremental Face Clustering Module
+
+This module assigns newly processed faces to existing face clusters
+without re-clustering the whole collection. Each cluster is summarized by
+its centroid (a running sum and count), and the centroids are kept in an
+IVF index, so placing a batch of new faces costs a nearest-centroid lookup
+per face, roughly independent of how many faces came before:
+
+- A face whose closest centroid passes the threshold joins that cluster,
+  and the centroid moves toward it.
+- The remaining faces of the batch are clustered among themselves with
+  the blocked similarity engine; each group opens a new cluster.
+
+Online assignment depends on arrival order and centroids drift, so an
+occasional offline compact() re-clusters all embeddings from scratch and
+rebuilds the centroids.
+"""
+
+import json
+
+import numpy as np
+
+from .ann_index import IVFIndex
+from .similarity import SimilarityEngine, cluster_embeddings, connected_components
+
+
+class IncrementalClusterer:
+    """
+    Online centroid-based face clustering with offline compaction.
+
+    Faces are numbered in the order they are added; labels[i] is the
+    cluster of face i.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        threshold: float = 0.7,
+        metric: str = 'cosine',
+        dtype: str = 'float32',
+        nprobe: int = 8
+    ):
+        """
+        Initialize an empty clusterer.
+
+        Args:
+            dim: Embedding dimension
+            threshold: Minimum cosine similarity (or maximum L2 distance)
+                       between a face and a cluster centroid to join it
+            metric: 'cosine' or 'l2'
+            dtype: Storage dtype of the centroid index, 'float32' or 'float16'
+            nprobe: Centroid index cells scanned per face
+        """
+        self.dim = dim
+        self.threshold = threshold
+        self.metric = metric
+        self.dtype = dtype
+        self.nprobe = nprobe
+        self.engine = SimilarityEngine(metric, dtype)
+
+        self._sums = np.empty((0, dim), dtype=np.float64)
+        self._counts = np.empty(0, dtype=np.int64)
+        self._labels = np.empty(0, dtype=np.int64)
+        self._face_count = 0
+        self._index = self._new_index()
+
+    def _new_index(self) -> IVFIndex:
+        return IVFIndex(self.dim, nprobe=self.nprobe, metric=self.metric, dtype=self.dtype)
+
+    @property
+    def labels(self) -> np.ndarray:
+        """Cluster id of every face added so far."""
+        return self._labels[:self._face_count]
+
+    @property
+    def cluster_sizes(self) -> np.ndarray:
+        """Number of faces in each cluster, indexed by cluster id."""
+        return self._counts.copy()
+
+    @property
+    def centroids(self) -> np.ndarray:
+        """Mean prepared embedding of each cluster, indexed by cluster id."""
+        return (self._sums / np.maximum(self._counts, 1)[:, None]).astype(np.float32)
+
+    def __len__(self) -> int:
+        """Number of clusters."""
+        return len(self._counts)
+
+    def _append_labels(self, labels: np.ndarray) -> None:
+        needed = self._face_count + len(labels)
+        if needed > len(self._labels):
+            grown = np.empty(max(needed, 2 * len(self._labels), 1024), dtype=np.int64)
+            grown[:self._face_count] = self._labels[:self._face_count]
+            self._labels = grown
+        self._labels[self._face_count:needed] = labels
+        self._face_count = needed
+
+    def _refresh_centroids(self, cluster_ids: np.ndarray) -> None:
+        """Re-insert updated centroids into the index."""
+        if not len(cluster_ids):
+            return
+        self._index.remove(cluster_ids.tolist())
+        self._index.add(self.centroids[cluster_ids], ids=cluster_ids)
+
+    def add(self, embeddings) -> np.ndarray:
+        """
+        Assign a batch of new faces to clusters.
+
+        Args:
+            embeddings: Array of shape (N, D), e.g. the faces of one file
+
+        Returns:
+            Cluster id of each face
+        """
+        prepared = self.engine.prepare(embeddings).astype(np.float32)
+        labels = np.full(len(prepared), -1, dtype=np.int64)
+        if not len(prepared):
+            return labels
+
+        if len(self._index):
+            ids, scores = self._index.search(prepared, k=1)
+            matched = self.engine.is_match(scores[:, 0], self.threshold)
+            labels[matched] = ids[matched, 0]
+
+        new = np.flatnonzero(labels < 0)
+        if new.size:
+            # Faces of this batch that match no cluster may match each other
+            groups = cluster_embeddings(prepared[new], self.threshold, self.metric, self.dtype)
+            labels[new] = len(self._counts) + groups
+            group_count = int(groups.max()) + 1
+            self._sums = np.vstack([self._sums, np.zeros((group_count, self.dim))])
+            self._counts = np.concatenate([self._counts, np.zeros(group_count, dtype=np.int64)])
+
+        np.add.at(self._sums, labels, prepared)
+        self._counts += np.bincount(labels, minlength=len(self._counts))
+        self._refresh_centroids(np.unique(labels))
+        self._append_labels(labels)
+        return labels
+
+    def compact(self, embeddings, merge: bool = True) -> np.ndarray:
+        """
+        Re-cluster every face from scratch (the offline compaction job).
+
+        Faces are clustered as connected components of the thresholded
+        similarity graph, then centroids are rebuilt; with merge, clusters
+        whose centroids pass the threshold are also merged.
+
+        Args:
+            embeddings: All faces added so far, in the order they were added
+            merge: Merge clusters with matching centroids after re-clustering
+
+        Returns:
+            The new cluster id of every face
+
+        Raises:
+            ValueError: If the number of embeddings differs from the faces added
+        """
+        prepared = self.engine.prepare(embeddings).astype(np.float32)
+        if len(prepared) != self._face_count:
+            raise ValueError(
+                f"compact() needs all {self._face_count} faces, got {len(prepared)}"
+            )
+        labels = cluster_embeddings(prepared, self.threshold, self.metric, self.dtype)
+        if merge and len(labels):
+            count = int(labels.max()) + 1
+            sums = np.zeros((count, self.dim))
+            np.add.at(sums, labels, prepared)
+            centroids = sums / np.bincount(labels, minlength=count)[:, None]
+            rows, cols, _ = self.engine.pairs(centroids, self.threshold)
+            labels = connected_components(count, rows, cols)[labels]
+
+        count = int(labels.max()) + 1 if len(labels) else 0
+        self._sums = np.zeros((count, self.dim))
+        np.add.at(self._sums, labels, prepared)
+        self._counts = np.bincount(labels, minlength=count).astype(np.int64)
+        self._labels = labels.astype(np.int64)
+        self._index = self._new_index()
+        if count:
+            self._index.add(self.centroids, ids=np.arange(count))
+        return self.labels
+
+    def save(self, path: str) -> None:
+        """
+        Save the clusterer state (centroid sums, counts and labels) to a .npz file.
+
+        Args:
+            path: Output file path
+        """
+        settings = {
+            'dim': self.dim,
+            'threshold': self.threshold,
+            'metric': self.metric,
+            'dtype': self.dtype,
+            'nprobe': self.nprobe,
+        }
+        with open(path, 'wb') as f:
+            np.savez(f, sums=self._sums, counts=self._counts, labels=self.labels,
+                     settings=np.array(json.dumps(settings)))
+
+    @classmethod
+    def load(cls, path: str) -> "IncrementalClusterer":
+        """
+        Load a clusterer saved with save().
+
+        Args:
+            path: .npz file path
+
+        Returns:
+            IncrementalClusterer ready to assign further faces
+        """
+        with np.load(path) as data:
+            settings = json.loads(str(data['settings']))
+            clusterer = cls(**settings)
+            clusterer._sums = data['sums']
+            clusterer._counts = data['counts']
+            clusterer._labels = data['labels'].astype(np.int64)
+        clusterer._face_count = len(clusterer._labels)
+        if len(clusterer._counts):
+            clusterer._index.add(clusterer.centroids, ids=np.arange(len(clusterer._counts)))
+        return clusterer
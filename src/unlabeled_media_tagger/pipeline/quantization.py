@@ -0,0 +1,235 @@
+"""
+Embedding Quantization Module
+
+This module compresses face embeddings into small codes so a large face
+database fits in memory and cache:
+
+- sq8 (scalar quantization): every dimension is mapped to one byte over
+  its trained [min, max] range; 512-d float32 embeddings shrink from 2 KB
+  to 512 bytes.
+- pq (product quantization): the embedding is split into subspaces and
+  each sub-vector is replaced by the index of its closest of 256 k-means
+  centroids, one byte per subspace; with the default dim / 8 subspaces a
+  512-d embedding takes 64 bytes.
+
+Scores are computed directly on the codes against float queries
+(asymmetric distance computation), without decoding the database: sq8
+folds the per-dimension scale into the query, and pq sums per-subspace
+lookup tables built once per query.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from .ann_index import assign, kmeans
+
+
+QUANTIZERS = ('sq8', 'pq')
+
+
+class ScalarQuantizer:
+    """
+    8-bit scalar quantizer with a per-dimension range.
+
+    A value x of dimension j is stored as round((x - low[j]) / step[j]),
+    clipped to 0..255.
+    """
+
+    def __init__(self, dim: int):
+        """
+        Initialize an untrained quantizer.
+
+        Args:
+            dim: Embedding dimension
+        """
+        self.dim = dim
+        self.low: Optional[np.ndarray] = None
+        self.step: Optional[np.ndarray] = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self.low is not None
+
+    @property
+    def code_size(self) -> int:
+        """Bytes per encoded vector."""
+        return self.dim
+
+    def train(self, vectors: np.ndarray) -> None:
+        """Learn the value range of every dimension."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.low = vectors.min(axis=0)
+        span = vectors.max(axis=0) - self.low
+        self.step = np.where(span > 0, span / 255.0, 1.0).astype(np.float32)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Return uint8 codes of shape (N, dim)."""
+        scaled = (np.asarray(vectors, dtype=np.float32) - self.low) / self.step
+        return np.clip(np.rint(scaled), 0, 255).astype(np.uint8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Return the float32 vectors the codes stand for."""
+        return self.low + codes.astype(np.float32) * self.step
+
+    def scores(self, queries: np.ndarray, codes: np.ndarray, metric: str) -> np.ndarray:
+        """
+        Score prepared float queries against codes.
+
+        The dot product with a decoded vector is q . low + (q * step) . code,
+        so one matrix product runs on the raw codes.
+
+        Args:
+            queries: Prepared float queries of shape (Q, dim)
+            codes: Codes of shape (N, dim)
+            metric: 'cosine' (similarity) or 'l2' (distance)
+
+        Returns:
+            float32 array of shape (Q, N)
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        products = (queries * self.step) @ codes.T.astype(np.float32)
+        products += (queries @ self.low)[:, None]
+        if metric == 'cosine':
+            return products
+        # |x|^2 of each decoded vector, expanded the same way
+        codes = codes.astype(np.float32)
+        norms = (self.low @ self.low) + 2.0 * (codes @ (self.low * self.step)) + (codes * codes) @ (self.step ** 2)
+        squared = (queries * queries).sum(axis=1)[:, None] + norms[None, :] - 2.0 * products
+        return np.sqrt(np.maximum(squared, 0.0, out=squared), out=squared)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """Arrays needed to restore the trained quantizer."""
+        return {'low': self.low, 'step': self.step}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        """Restore a state returned by state()."""
+        self.low = np.asarray(state['low'], dtype=np.float32)
+        self.step = np.asarray(state['step'], dtype=np.float32)
+
+
+def default_subspaces(dim: int) -> int:
+    """Largest divisor of dim that is at most dim / 8 (8-d sub-vectors for typical sizes)."""
+    target = max(1, dim // 8)
+    return next(m for m in range(target, 0, -1) if dim % m == 0)
+
+
+class ProductQuantizer:
+    """
+    Product quantizer with 256 centroids (one byte) per subspace.
+    """
+
+    # Training vectors sampled per k-means run
+    _TRAIN_SAMPLE = 16384
+
+    def __init__(self, dim: int, subspaces: Optional[int] = None):
+        """
+        Initialize an untrained quantizer.
+
+        Args:
+            dim: Embedding dimension
+            subspaces: Number of subspaces, i.e. bytes per code; must divide
+                       dim (default: default_subspaces(dim))
+
+        Raises:
+            ValueError: If subspaces does not divide dim
+        """
+        subspaces = subspaces or default_subspaces(dim)
+        if dim % subspaces:
+            raise ValueError(f"subspaces must divide the dimension {dim}, got {subspaces}")
+        self.dim = dim
+        self.subspaces = subspaces
+        self.sub_dim = dim // subspaces
+        self.codebooks: Optional[np.ndarray] = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self.codebooks is not None
+
+    @property
+    def code_size(self) -> int:
+        """Bytes per encoded vector."""
+        return self.subspaces
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        """View (N, dim) vectors as (N, subspaces, sub_dim)."""
+        return np.asarray(vectors, dtype=np.float32).reshape(len(vectors), self.subspaces, self.sub_dim)
+
+    def train(self, vectors: np.ndarray, seed: int = 0) -> None:
+        """Learn the codebook of every subspace with k-means."""
+        parts = self._split(vectors)
+        centroids = min(256, len(parts))
+        self.codebooks = np.stack([
+            kmeans(parts[:, j], centroids, 'l2', seed=seed + j, sample_size=self._TRAIN_SAMPLE)
+            for j in range(self.subspaces)
+        ])
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Return uint8 codes of shape (N, subspaces)."""
+        parts = self._split(vectors)
+        codes = np.empty((len(parts), self.subspaces), dtype=np.uint8)
+        for j in range(self.subspaces):
+            codes[:, j] = assign(np.ascontiguousarray(parts[:, j]), self.codebooks[j], 'l2')
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Return the float32 vectors the codes stand for."""
+        parts = self.codebooks[np.arange(self.subspaces), codes]
+        return parts.reshape(len(codes), self.dim)
+
+    def scores(self, queries: np.ndarray, codes: np.ndarray, metric: str) -> np.ndarray:
+        """
+        Score prepared float queries against codes.
+
+        Each query gets a (subspaces, 256) table of partial dot products or
+        squared distances to the centroids; a code's score is the sum of
+        one table entry per subspace.
+
+        Args:
+            queries: Prepared float queries of shape (Q, dim)
+            codes: Codes of shape (N, subspaces)
+            metric: 'cosine' (similarity) or 'l2' (distance)
+
+        Returns:
+            float32 array of shape (Q, N)
+        """
+        parts = self._split(queries)
+        # Tables laid out (subspaces, Q, 256) so each subspace is contiguous
+        tables = np.einsum('qjd,jkd->jqk', parts, self.codebooks)
+        if metric != 'cosine':
+            centroid_norms = (self.codebooks ** 2).sum(axis=2)
+            tables = (parts ** 2).sum(axis=2).T[:, :, None] + centroid_norms[:, None, :] - 2.0 * tables
+
+        result = np.zeros((len(parts), len(codes)), dtype=np.float32)
+        for j, column in enumerate(codes.T):
+            result += np.take(tables[j], column, axis=1)
+        if metric == 'cosine':
+            return result
+        return np.sqrt(np.maximum(result, 0.0, out=result), out=result)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """Arrays needed to restore the trained quantizer."""
+        return {'codebooks': self.codebooks}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        """Restore a state returned by state()."""
+        self.codebooks = np.asarray(state['codebooks'], dtype=np.float32)
+
+
+def make_quantizer(kind: str, dim: int, subspaces: Optional[int] = None):
+    """
+    Create an untrained quantizer.
+
+    Args:
+        kind: 'sq8' or 'pq'
+        dim: Embedding dimension
+        subspaces: pq subspaces (ignored for sq8)
+
+    Raises:
+        ValueError: If kind is unknown
+    """
+    if kind == 'sq8':
+        return ScalarQuantizer(dim)
+    if kind == 'pq':
+        return ProductQuantizer(dim, subspaces)
+    raise ValueError(f"Unknown quantizer '{kind}', expected one of {QUANTIZERS}")
@@ -0,0 +1,331 @@
+"""
+Compact Detection Results
+
+This module provides a columnar container for face detections backed by a
+NumPy structured array. It is far smaller than lists of nested dicts, pickles
+as a single buffer between processes, and saves to disk as .npz, while still
+offering the dict view used by annotate_image() and the CLIs.
+DetectionResultsWriter builds such a file incrementally, for runs with more
+detections than should be held in memory.
+"""
+
+import io
+import json
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+
+# One row per detected face
+DETECTION_DTYPE = np.dtype([
+    ('source_id', np.int32),    # Index into DetectionResults.sources
+    ('frame_index', np.int32),  # Video frame number, -1 for still images
+    ('timestamp', np.float64),  # Frame time in seconds, NaN for still images
+    ('x', np.int32),
+    ('y', np.int32),
+    ('w', np.int32),
+    ('h', np.int32),
+    ('confidence', np.float32),
+])
+
+
+class DetectionResults:
+    """
+    Columnar face detections for one or many images and video frames.
+
+    Rows are stored in a structured array with DETECTION_DTYPE. Source files
+    are kept once in the sources list and referenced by source_id, with an
+    optional metadata dict per source (e.g. media_type, frames_sampled or
+    error from bulk_detect). Iterating yields detection dicts in the
+    detect_faces_in_image() format, extended with source, frame_index and
+    timestamp.
+    """
+
+    def __init__(
+        self,
+        array: Optional[np.ndarray] = None,
+        sources: Optional[List[str]] = None,
+        metadata: Optional[List[Dict]] = None
+    ):
+        """
+        Initialize detection results.
+
+        Args:
+            array: Structured array with DETECTION_DTYPE (default: empty)
+            sources: Source identifiers (e.g. file paths) indexed by source_id
+            metadata: One dict per source, or None for no metadata
+
+        Raises:
+            ValueError: If array does not have DETECTION_DTYPE, or metadata
+                        does not have one entry per source
+        """
+        if array is None:
+            array = np.empty(0, dtype=DETECTION_DTYPE)
+        if array.dtype != DETECTION_DTYPE:
+            raise ValueError(f"Expected dtype {DETECTION_DTYPE}, got {array.dtype}")
+        self.array = array
+        self.sources = list(sources or [])
+        self.metadata = list(metadata) if metadata is not None else None
+        if self.metadata is not None and len(self.metadata) != len(self.sources):
+            raise ValueError(
+                f"Expected metadata for {len(self.sources)} source(s), got {len(self.metadata)}"
+            )
+
+    @classmethod
+    def from_detections(
+        cls,
+        detections: Sequence[Dict],
+        source: Optional[str] = None,
+        frame_index: int = -1,
+        timestamp: float = float('nan')
+    ) -> "DetectionResults":
+        """
+        Build results from a list of detection dicts for one image or frame.
+
+        Args:
+            detections: Detections from detect_faces_in_image()
+            source: Source identifier, such as the file path
+            frame_index: Video frame number, or -1 for a still image
+            timestamp: Frame time in seconds, or NaN for a still image
+
+        Returns:
+            DetectionResults with one row per detection
+        """
+        array = np.empty(len(detections), dtype=DETECTION_DTYPE)
+        array['source_id'] = 0
+        array['frame_index'] = frame_index
+        array['timestamp'] = timestamp
+        if detections:
+            bboxes = [detection['bbox'] for detection in detections]
+            for field in ('x', 'y', 'w', 'h'):
+                array[field] = [bbox[field] for bbox in bboxes]
+            array['confidence'] = [detection['confidence'] for detection in detections]
+        return cls(array, [source if source is not None else ''])
+
+    @classmethod
+    def from_frames(cls, records: Sequence[Dict], source: Optional[str] = None) -> "DetectionResults":
+        """
+        Build results from per-frame video records.
+
+        Args:
+            records: Records from detect_faces_in_video(), each with frame,
+                     timestamp and detections
+            source: Source identifier, such as the video path
+
+        Returns:
+            DetectionResults with one row per detection across all frames
+        """
+        parts = [
+            cls.from_detections(record['detections'], source, record['frame'], record['timestamp'])
+            for record in records
+        ]
+        if not parts:
+            return cls(sources=[source if source is not None else ''])
+        return cls(np.concatenate([part.array for part in parts]), parts[0].sources)
+
+    @classmethod
+    def concatenate(cls, results: Sequence["DetectionResults"]) -> "DetectionResults":
+        """
+        Merge several results into one, remapping source ids.
+
+        Args:
+            results: DetectionResults to merge
+
+        Returns:
+            A single DetectionResults containing every row and source
+        """
+        sources: List[str] = []
+        metadata: List[Dict] = []
+        arrays = []
+        for part in results:
+            array = part.array.copy()
+            array['source_id'] += len(sources)
+            sources.extend(part.sources)
+            metadata.extend(part.metadata if part.metadata is not None else [{} for _ in part.sources])
+            arrays.append(array)
+        if not arrays:
+            return cls()
+        has_metadata = any(part.metadata is not None for part in results)
+        return cls(np.concatenate(arrays), sources, metadata if has_metadata else None)
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def _row_to_dict(self, row) -> Dict:
+        source_id = int(row['source_id'])
+        return {
+            'bbox': {
+                'x': int(row['x']),
+                'y': int(row['y']),
+                'w': int(row['w']),
+                'h': int(row['h'])
+            },
+            'confidence': float(row['confidence']),
+            'source': self.sources[source_id] if source_id < len(self.sources) else source_id,
+            'frame_index': int(row['frame_index']),
+            'timestamp': float(row['timestamp'])
+        }
+
+    def __iter__(self) -> Iterator[Dict]:
+        for row in self.array:
+            yield self._row_to_dict(row)
+
+    def __getitem__(self, key: Union[int, slice, np.ndarray]) -> Union[Dict, "DetectionResults"]:
+        """Return a dict for an integer index, or a new DetectionResults for a slice or mask."""
+        if isinstance(key, (int, np.integer)):
+            return self._row_to_dict(self.array[key])
+        return DetectionResults(self.array[key], self.sources, self.metadata)
+
+    def to_dicts(self) -> List[Dict]:
+        """Return every detection as a dict (see class docstring)."""
+        return list(self)
+
+    def to_frames(self) -> List[Dict]:
+        """
+        Group detections into per-frame records like detect_faces_in_video().
+
+        Frames are grouped per source, so frames with the same number in
+        different videos stay apart. Frames without detections are not
+        stored and therefore not returned.
+
+        Returns:
+            Records with source, frame, timestamp and detections, ordered by
+            source_id and then frame
+        """
+        records: List[Dict] = []
+        order = np.lexsort((self.array['frame_index'], self.array['source_id']))
+        for detection in self[order]:
+            source = detection.pop('source')
+            frame_index = detection.pop('frame_index')
+            timestamp = detection.pop('timestamp')
+            if not records or (records[-1]['source'], records[-1]['frame']) != (source, frame_index):
+                records.append({'source': source, 'frame': frame_index, 'timestamp': timestamp, 'detections': []})
+            records[-1]['detections'].append(detection)
+        return records
+
+    def bboxes(self) -> np.ndarray:
+        """Return an (N, 4) int32 array of x, y, w, h."""
+        return np.stack(
+            [self.array['x'], self.array['y'], self.array['w'], self.array['h']], axis=1
+        )
+
+    def to_bytes(self) -> bytes:
+        """Serialize to a compact byte string (raw rows plus source list)."""
+        buffer = io.BytesIO()
+        self.save(buffer)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DetectionResults":
+        """Deserialize results produced by to_bytes()."""
+        return cls.load(io.BytesIO(data))
+
+    def save(self, file) -> None:
+        """
+        Save results in NumPy .npz format.
+
+        Args:
+            file: Path or binary file object
+        """
+        arrays = {
+            'detections': self.array,
+            'sources': _json_array(self.sources),
+        }
+        if self.metadata is not None:
+            arrays['metadata'] = _json_array(self.metadata)
+        np.savez(file, **arrays)
+
+    @classmethod
+    def load(cls, file) -> "DetectionResults":
+        """
+        Load results saved with save().
+
+        Args:
+            file: Path or binary file object
+
+        Returns:
+            DetectionResults
+        """
+        with np.load(file, allow_pickle=False) as data:
+            sources = _from_json_array(data['sources'])
+            metadata = _from_json_array(data['metadata']) if 'metadata' in data else None
+            return cls(data['detections'], sources, metadata)
+
+    def __getstate__(self):
+        # Pickle as the raw row buffer and the source list only
+        return {'array': self.array, 'sources': self.sources, 'metadata': self.metadata}
+
+    def __setstate__(self, state):
+        self.array = state['array']
+        self.sources = state['sources']
+        self.metadata = state.get('metadata')
+
+    def __repr__(self) -> str:
+        return f"DetectionResults({len(self)} detection(s), {len(self.sources)} source(s))"
+
+
+def _json_array(value) -> np.ndarray:
+    """Encode a JSON-serializable value as a uint8 array for .npz storage."""
+    return np.frombuffer(json.dumps(value).encode('utf-8'), dtype=np.uint8)
+
+
+def _from_json_array(array: np.ndarray):
+    """Decode a value stored with _json_array()."""
+    return json.loads(array.tobytes().decode('utf-8'))
+
+
+class DetectionResultsWriter:
+    """
+    Build a DetectionResults .npz file one part at a time.
+
+    Rows are appended to a temporary file next to the output as they
+    arrive, so only the sources and their metadata stay in memory; close()
+    writes the .npz from a memory map of the spooled rows.
+    """
+
+    def __init__(self, path: str):
+        """
+        Start a new results file.
+
+        Args:
+            path: Output .npz path, written by close()
+        """
+        self.path = path
+        self.sources: List[str] = []
+        self.metadata: List[Dict] = []
+        self._rows = tempfile.TemporaryFile(dir=Path(path).parent)
+        self._count = 0
+
+    def add(self, results: "DetectionResults", metadata: Optional[Dict] = None) -> None:
+        """
+        Append the rows and sources of one part, remapping source ids.
+
+        Args:
+            results: Detections of one file (or several)
+            metadata: Metadata for every source of the part, used when the
+                      part carries none of its own
+        """
+        array = results.array.copy()
+        array['source_id'] += len(self.sources)
+        self._rows.write(array.tobytes())
+        self._count += len(array)
+        self.sources.extend(results.sources)
+        if results.metadata is not None:
+            self.metadata.extend(results.metadata)
+        else:
+            self.metadata.extend(dict(metadata or {}) for _ in results.sources)
+
+    def close(self) -> None:
+        """Write the .npz file and discard the spooled rows."""
+        try:
+            self._rows.flush()
+            if self._count:
+                rows = np.memmap(self._rows, dtype=DETECTION_DTYPE, mode='r', shape=(self._count,))
+            else:
+                rows = np.empty(0, dtype=DETECTION_DTYPE)
+            DetectionResults(rows, self.sources, self.metadata).save(self.path)
+            del rows
+        finally:
+            self._rows.close()
@@ -0,0 +1,223 @@
+"""
+Media Task Scheduling Module
+
+This module plans the work bulk_detect hands to its worker processes when
+long videos are mixed with many small files:
+
+- Videos longer than the shard length are split into time ranges (shards)
+  aligned to the sampling grid; each shard is decoded by a worker that
+  seeks straight to its start (see FrameSampler start_sec/end_sec). With a
+  frame budget, every shard samples on the grid a single pass would use
+  and the shard budgets add up to that pass's frame count.
+- Videos are probed for their duration on a thread pool, since opening
+  a container is mostly I/O.
+- Tasks are ordered longest first, so big shards start early and images
+  fill the remaining gaps instead of one long video finishing last on a
+  single core.
+- ShardMerger reassembles the per-shard results of each video into one
+  record with detections in timestamp order.
+"""
+
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .results import DetectionResults
+from ..utils.file_utils import is_video_file
+
+
+def probe_video(video_path: str) -> Tuple[float, float]:
+    """
+    Read a video's duration and frame rate without decoding frames.
+
+    Args:
+        video_path: Path to the video file
+
+    Returns:
+        (duration_sec, fps); both are 0.0 if the video cannot be opened or
+        does not report them
+    """
+    cap = cv2.VideoCapture(str(video_path))
+    try:
+        if not cap.isOpened():
+            return 0.0, 0.0
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        if fps <= 0 or frame_count <= 0:
+            return 0.0, 0.0
+        return frame_count / fps, fps
+    finally:
+        cap.release()
+
+
+def probe_durations(paths: Sequence[str], workers: int = 8) -> Dict[str, float]:
+    """
+    Probe the duration of many videos concurrently.
+
+    OpenCV releases the GIL while opening a container, so a few threads
+    overlap the file I/O of the probes.
+
+    Args:
+        paths: Video paths
+        workers: Probing threads
+
+    Returns:
+        Duration in seconds by path (0.0 where unknown)
+    """
+    if not paths:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(paths))), thread_name_prefix='probe') as pool:
+        return {path: probe[0] for path, probe in zip(paths, pool.map(probe_video, paths))}
+
+
+def plan_tasks(
+    paths: Sequence[str],
+    shard_sec: Optional[float] = None,
+    frame_interval_sec: float = 1.0,
+    max_frames: Optional[int] = None,
+    probe_workers: int = 8
+) -> List[Dict]:
+    """
+    Turn media paths into worker tasks, sharding long videos.
+
+    With max_frames, a sharded video is sampled at the interval a single
+    pass would widen to (see FrameSampler), shard boundaries sit on that
+    grid, and each shard's budget is the number of grid samples in its
+    range, so the shards sample exactly the frames of a single pass and
+    their budgets never add up to more than max_frames.
+
+    Args:
+        paths: Image and video paths
+        shard_sec: Split videos longer than this into ranges of about this
+                   many seconds, or None to process every file whole (in
+                   input order, without probing videos)
+        frame_interval_sec: Sampling interval; shard boundaries are placed on
+                            its grid so shards sample the same frames as one pass
+        max_frames: Per-video frame budget, divided between shards
+        probe_workers: Threads probing video durations
+
+    Returns:
+        Task dicts with path, start_sec, end_sec (None = to the end),
+        shard, shards, max_frames and cost (estimated sampled frames),
+        ordered by decreasing cost when sharding. Shards also carry the
+        frame_interval_sec they must sample at.
+    """
+    if not shard_sec:
+        return [
+            {'path': path, 'start_sec': 0.0, 'end_sec': None, 'shard': 0, 'shards': 1,
+             'max_frames': max_frames, 'cost': 1.0}
+            for path in paths
+        ]
+
+    durations = probe_durations([path for path in paths if is_video_file(path)], probe_workers)
+    tasks: List[Dict] = []
+    for path in paths:
+        duration = durations.get(path, 0.0)
+        # The interval a single pass over the whole video would sample at
+        interval = frame_interval_sec
+        if max_frames and duration > 0:
+            interval = max(frame_interval_sec, duration / max_frames)
+        # Whole sampling steps per shard, so every boundary lies on the sample grid
+        steps = max(1, round(shard_sec / interval))
+        shard_len = steps * interval
+
+        if duration <= shard_len:
+            cost = max(1.0, duration / interval)
+            tasks.append({'path': path, 'start_sec': 0.0, 'end_sec': None, 'shard': 0, 'shards': 1,
+                          'max_frames': max_frames, 'cost': cost})
+            continue
+
+        # Grid samples of the whole video, then consecutive runs of them per shard
+        samples = math.ceil(round(duration / interval, 9))
+        if max_frames:
+            samples = min(samples, max_frames)
+        shards = math.ceil(samples / steps)
+        for index in range(shards):
+            start = index * shard_len
+            end = None if index == shards - 1 else (index + 1) * shard_len
+            count = min(steps, samples - index * steps)
+            tasks.append({'path': path, 'start_sec': start, 'end_sec': end, 'shard': index,
+                          'shards': shards, 'max_frames': count if max_frames else None,
+                          'frame_interval_sec': interval, 'cost': float(count)})
+
+    # Longest processing time first; sort is stable, so ties keep input order
+    tasks.sort(key=lambda task: task['cost'], reverse=True)
+    return tasks
+
+
+def merge_shard_records(records: Sequence[Dict]) -> Dict:
+    """
+    Combine the worker records of one video's shards.
+
+    Args:
+        records: One record per shard, as returned by the bulk_detect worker
+
+    Returns:
+        A single record: detections merged in timestamp order, frames_sampled
+        and elapsed_sec summed, cached only if every shard was cached, and
+        the first error (with its shard) if any shard failed
+    """
+    records = sorted(records, key=lambda record: record.get('shard', 0))
+    merged: Dict = {'path': records[0]['path'], 'media_type': records[0].get('media_type', 'video')}
+
+    parts = [record['results'] for record in records if record.get('results') is not None]
+    if parts:
+        array = np.concatenate([part.array for part in parts])
+        array['source_id'] = 0
+        order = np.argsort(array['timestamp'], kind='stable')
+        merged['results'] = DetectionResults(array[order], [merged['path']])
+
+    merged['frames_sampled'] = sum(record.get('frames_sampled', 0) for record in records)
+    merged['shards'] = len(records)
+
+    errors = [record for record in records if 'error' in record]
+    if errors:
+        merged['error'] = f"shard {errors[0].get('shard', 0)}: {errors[0]['error']}"
+    if any('cached' in record for record in records):
+        merged['cached'] = all(record.get('cached') for record in records)
+
+    merged['elapsed_sec'] = round(sum(record.get('elapsed_sec', 0.0) for record in records), 4)
+    return merged
+
+
+class ShardMerger:
+    """
+    Collect shard results as they arrive and release each video once complete.
+
+    Records for unsharded files pass straight through.
+    """
+
+    def __init__(self):
+        """Initialize an empty merger."""
+        self._pending: Dict[str, List[Dict]] = {}
+
+    def add(self, record: Dict) -> Optional[Dict]:
+        """
+        Add a worker record.
+
+        Args:
+            record: Worker record with path, shard and shards
+
+        Returns:
+            The complete record for the file if all its shards have arrived,
+            otherwise None
+        """
+        shards = record.pop('shards', 1)
+        if shards <= 1:
+            record.pop('shard', None)
+            return record
+
+        parts = self._pending.setdefault(record['path'], [])
+        parts.append(record)
+        if len(parts) < shards:
+            return None
+        del self._pending[record['path']]
+        return merge_shard_records(parts)
+
+    @property
+    def pending(self) -> int:
+        """Number of videos with shards still outstanding."""
+        return len(self._pending)
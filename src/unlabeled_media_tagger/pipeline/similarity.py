@@ -0,0 +1,385 @@
+"""
+Blocked Face Similarity Module
+
+This module compares face embeddings with NumPy matrix products instead of
+pairwise Python loops. Embeddings are compared block by block, so only a
+block_size x block_size score matrix exists at any time and memory stays
+predictable however many faces there are; only pairs that pass the
+threshold are kept, as sparse neighbor lists (COO row/column/score arrays).
+
+Supported metrics:
+
+- cosine: similarity of L2-normalized embeddings, higher is closer; the
+  threshold is a minimum similarity
+- l2: Euclidean distance, lower is closer; the threshold is a maximum distance
+
+Embeddings can be held as float32 or float16. float16 halves the memory
+of the embedding matrix; each block is widened to float32 for the matrix
+product, since NumPy has no fast float16 matrix multiply.
+"""
+
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+METRICS = ('cosine', 'l2')
+DTYPES = ('float32', 'float16')
+
+
+def normalize_embeddings(embeddings: np.ndarray) -> np.ndarray:
+    """
+    Scale each row to unit L2 norm (zero rows stay zero).
+
+    Args:
+        embeddings: Array of shape (N, D)
+
+    Returns:
+        New float32 array of shape (N, D)
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
+
+
+def connected_components(n: int, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """
+    Label the connected components of a sparse graph.
+
+    A vectorized union-find: every node repeatedly hooks onto the smallest
+    label among its neighbors, and labels are then compressed by pointer
+    jumping, until nothing changes. Each pass is a few NumPy operations
+    over the edge arrays.
+
+    Args:
+        n: Number of nodes
+        rows: Edge source indices
+        cols: Edge target indices
+
+    Returns:
+        Array of n component labels, numbered 0.. in order of each
+        component's smallest node
+    """
+    labels = np.arange(n, dtype=np.int64)
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    while rows.size:
+        smallest = np.minimum(labels[rows], labels[cols])
+        updated = labels.copy()
+        # Hook the roots of both endpoints onto the smaller label
+        np.minimum.at(updated, labels[rows], smallest)
+        np.minimum.at(updated, labels[cols], smallest)
+        # Pointer jumping until every node points at its root
+        while True:
+            jumped = updated[updated]
+            if np.array_equal(jumped, updated):
+                break
+            updated = jumped
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+    return np.unique(labels, return_inverse=True)[1]
+
+
+class SimilarityEngine:
+    """
+    Memory-bounded blocked similarity search over face embeddings.
+
+    Peak working memory beyond the embeddings themselves is about
+    block_size * block_size * 4 bytes (16 MB at the default 2048) plus the
+    pairs that pass the threshold.
+    """
+
+    def __init__(self, metric: str = 'cosine', dtype: str = 'float32', block_size: int = 2048):
+        """
+        Initialize the engine.
+
+        Args:
+            metric: 'cosine' (similarity) or 'l2' (distance)
+            dtype: Storage dtype of prepared embeddings, 'float32' or 'float16'
+            block_size: Rows and columns compared per block
+
+        Raises:
+            ValueError: If metric, dtype or block_size is invalid
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}', expected one of {METRICS}")
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown dtype '{dtype}', expected one of {DTYPES}")
+        if block_size < 1:
+            raise ValueError(f"block_size must be positive, got {block_size}")
+        self.metric = metric
+        self.dtype = np.dtype(dtype)
+        self.block_size = block_size
+
+    def prepare(self, embeddings) -> np.ndarray:
+        """
+        Convert embeddings to the engine's layout.
+
+        Cosine embeddings are L2-normalized, so similarity is a plain dot
+        product.
+
+        Args:
+            embeddings: Array-like of shape (N, D)
+
+        Returns:
+            Contiguous array of shape (N, D) in the engine dtype
+        """
+        embeddings = np.asarray(embeddings)
+        if embeddings.ndim != 2:
+            raise ValueError(f"Embeddings must have shape (N, D), got {embeddings.shape}")
+        if self.metric == 'cosine':
+            embeddings = normalize_embeddings(embeddings)
+        return np.ascontiguousarray(embeddings, dtype=self.dtype)
+
+    def prepare_into(self, blocks: Iterable[np.ndarray], out: np.ndarray) -> np.ndarray:
+        """
+        Prepare embeddings block by block into a preallocated array.
+
+        Blocks can be memory-mapped (e.g. from EmbeddingStore.iter_blocks)
+        and out can live in shared memory: the raw embeddings are never
+        concatenated, only one block at a time is converted.
+
+        Args:
+            blocks: Arrays of shape (n, D) whose rows add up to len(out)
+            out: Array of shape (N, D) in the engine dtype
+
+        Returns:
+            out
+
+        Raises:
+            ValueError: If the blocks do not fill out exactly
+        """
+        start = 0
+        for block in blocks:
+            if start + len(block) > len(out):
+                raise ValueError(f"Blocks hold more than the {len(out)} expected rows")
+            out[start:start + len(block)] = self.prepare(block)
+            start += len(block)
+        if start != len(out):
+            raise ValueError(f"Blocks hold {start} rows, expected {len(out)}")
+        return out
+
+    def is_match(self, scores: np.ndarray, threshold: float) -> np.ndarray:
+        """Return a mask of scores that pass the threshold for the metric."""
+        return scores >= threshold if self.metric == 'cosine' else scores <= threshold
+
+    def scores(self, queries: np.ndarray, database: np.ndarray) -> np.ndarray:
+        """
+        Score one block of prepared queries against prepared database rows.
+
+        Returns:
+            float32 array (len(queries), len(database)) of cosine
+            similarities or L2 distances
+        """
+        q = queries.astype(np.float32, copy=False)
+        d = database.astype(np.float32, copy=False)
+        products = q @ d.T
+        if self.metric == 'cosine':
+            return products
+        squared = (q * q).sum(axis=1)[:, None] + (d * d).sum(axis=1)[None, :] - 2.0 * products
+        return np.sqrt(np.maximum(squared, 0.0, out=squared), out=squared)
+
+    def iter_blocks(
+        self,
+        queries: np.ndarray,
+        database: Optional[np.ndarray] = None
+    ) -> Iterator[Tuple[int, int, np.ndarray]]:
+        """
+        Yield (row_offset, col_offset, scores) for each block of the score matrix.
+
+        Args:
+            queries: Prepared query embeddings
+            database: Prepared database embeddings, or None to compare the
+                      queries with themselves; only blocks on or above the
+                      diagonal are then produced
+
+        Yields:
+            Row and column offsets of the block and its float32 scores
+        """
+        self_join = database is None
+        database = queries if self_join else database
+        for row in range(0, len(queries), self.block_size):
+            query_block = queries[row:row + self.block_size]
+            first_col = row if self_join else 0
+            for col in range(first_col, len(database), self.block_size):
+                yield row, col, self.scores(query_block, database[col:col + self.block_size])
+
+    def pairs(self, embeddings, threshold: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find every pair of distinct embeddings that passes the threshold.
+
+        Args:
+            embeddings: Array-like of shape (N, D), raw or prepared
+            threshold: Minimum cosine similarity or maximum L2 distance
+
+        Returns:
+            (rows, cols, scores) with rows < cols, one entry per matching pair
+        """
+        prepared = self.prepare(embeddings)
+        return concat_pairs([
+            self.block_pairs(row, col, block, threshold)
+            for row, col, block in self.iter_blocks(prepared)
+        ])
+
+    def block_pairs(
+        self,
+        row: int,
+        col: int,
+        block: np.ndarray,
+        threshold: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Extract the matching pairs of one self-join block from iter_blocks.
+
+        Returns:
+            (rows, cols, scores) in global indices, with rows < cols
+        """
+        mask = self.is_match(block, threshold)
+        if row == col:
+            # Diagonal block: keep the strict upper triangle only
+            mask &= np.triu(np.ones(mask.shape, dtype=bool), k=1)
+        r, c = np.nonzero(mask)
+        return r + row, c + col, block[r, c]
+
+    def _sort_key(self, scores: np.ndarray) -> np.ndarray:
+        """Scores arranged so that smaller sorts closer."""
+        return -scores if self.metric == 'cosine' else scores
+
+    def search(
+        self,
+        queries,
+        database,
+        k: Optional[int] = None,
+        threshold: Optional[float] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Find the neighbors of each query in a database.
+
+        Database blocks are streamed past each block of queries; with k set,
+        only a running top-k per query is kept, so memory stays at about
+        block_size * (block_size + k) scores.
+
+        Args:
+            queries: Array-like of shape (Q, D)
+            database: Array-like of shape (N, D)
+            k: Keep at most the k closest neighbors per query (None = all)
+            threshold: Keep only neighbors passing the threshold (None = all)
+
+        Returns:
+            One (indices, scores) pair per query, closest first
+        """
+        queries = self.prepare(queries)
+        database = self.prepare(database)
+        if k is None and threshold is None:
+            k = len(database)
+
+        results: List[Tuple[np.ndarray, np.ndarray]] = []
+        for row in range(0, len(queries), self.block_size):
+            query_block = queries[row:row + self.block_size]
+            count = len(query_block)
+            if k is not None:
+                best_idx = np.empty((count, 0), dtype=np.int64)
+                best_scores = np.empty((count, 0), dtype=np.float32)
+                for col in range(0, len(database), self.block_size):
+                    block = self.scores(query_block, database[col:col + self.block_size])
+                    columns = np.broadcast_to(np.arange(col, col + block.shape[1]), block.shape)
+                    best_scores = np.hstack([best_scores, block])
+                    best_idx = np.hstack([best_idx, columns])
+                    if best_scores.shape[1] > k:
+                        keep = np.argpartition(self._sort_key(best_scores), k - 1, axis=1)[:, :k]
+                        best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                        best_idx = np.take_along_axis(best_idx, keep, axis=1)
+                for idx, scores in zip(best_idx, best_scores):
+                    if threshold is not None:
+                        mask = self.is_match(scores, threshold)
+                        idx, scores = idx[mask], scores[mask]
+                    order = np.argsort(self._sort_key(scores), kind='stable')
+                    results.append((idx[order], scores[order]))
+                continue
+
+            # Threshold only: collect matches as COO, then split per query
+            hit_rows, hit_cols, hit_scores = [], [], []
+            for col in range(0, len(database), self.block_size):
+                block = self.scores(query_block, database[col:col + self.block_size])
+                r, c = np.nonzero(self.is_match(block, threshold))
+                hit_rows.append(r)
+                hit_cols.append(c + col)
+                hit_scores.append(block[r, c])
+            r = np.concatenate(hit_rows) if hit_rows else np.empty(0, np.int64)
+            c = np.concatenate(hit_cols) if hit_cols else np.empty(0, np.int64)
+            sc = np.concatenate(hit_scores) if hit_scores else np.empty(0, np.float32)
+            order = np.lexsort((self._sort_key(sc), r))
+            bounds = np.searchsorted(r[order], np.arange(count + 1))
+            for i in range(count):
+                selected = order[bounds[i]:bounds[i + 1]]
+                results.append((c[selected].astype(np.int64), sc[selected]))
+        return results
+
+
+def concat_pairs(parts: Sequence[Tuple[np.ndarray, np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Concatenate (rows, cols, scores) pair arrays into int64 / float32 arrays."""
+    parts = [part for part in parts if len(part[0])]
+    if not parts:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.float32)
+    rows, cols, scores = zip(*parts)
+    return (
+        np.concatenate(rows).astype(np.int64),
+        np.concatenate(cols).astype(np.int64),
+        np.concatenate(scores).astype(np.float32),
+    )
+
+
+def neighbor_lists(
+    n: int,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    scores: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convert symmetric pairs into CSR neighbor lists.
+
+    Args:
+        n: Number of embeddings
+        rows, cols, scores: Pairs as returned by SimilarityEngine.pairs
+
+    Returns:
+        (indptr, indices, scores): the neighbors of embedding i are
+        indices[indptr[i]:indptr[i + 1]] with matching scores
+    """
+    both_rows = np.concatenate([rows, cols])
+    both_cols = np.concatenate([cols, rows])
+    both_scores = np.concatenate([scores, scores])
+    order = np.argsort(both_rows, kind='stable')
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(both_rows, minlength=n), out=indptr[1:])
+    return indptr, both_cols[order], both_scores[order]
+
+
+def cluster_embeddings(
+    embeddings: Sequence,
+    threshold: float,
+    metric: str = 'cosine',
+    dtype: str = 'float32',
+    block_size: int = 2048
+) -> np.ndarray:
+    """
+    Group embeddings whose similarity chain passes the threshold.
+
+    Two faces share a cluster if they are connected by a chain of matching
+    pairs (single linkage).
+
+    Args:
+        embeddings: Array-like of shape (N, D)
+        threshold: Minimum cosine similarity or maximum L2 distance
+        metric: 'cosine' or 'l2'
+        dtype: 'float32' or 'float16'
+        block_size: Rows and columns compared per block
+
+    Returns:
+        Array of N cluster labels numbered 0..
+    """
+    engine = SimilarityEngine(metric, dtype, block_size)
+    embeddings = np.asarray(embeddings)
+    rows, cols, _ = engine.pairs(embeddings, threshold)
+    return connected_components(len(embeddings), rows, cols)
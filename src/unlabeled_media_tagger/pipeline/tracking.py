@@ -0,0 +1,427 @@
+"""
+Face Tracking Module
+
+This module carries detected faces across sampled video frames so the
+detector only has to run on some of them:
+
+- On keyframes (every keyframe_interval_sec), and whenever a track is lost,
+  the full detector runs and detections are associated with existing tracks
+  by bounding-box IoU.
+- In between, each tracked box is moved with sparse Lucas-Kanade optical
+  flow of corner points inside it, which costs far less than detection.
+
+Sampling is adaptive: frames are sampled densely while faces are moving,
+at the base interval while faces are visible, and increasingly sparsely
+while the scene stays empty. The result includes a timeline per track.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .frame_sampler import FrameSampler
+from ..utils.bbox import bbox_iou
+
+
+class Track:
+    """A face followed across frames, with its per-frame boxes."""
+
+    def __init__(self, track_id: int):
+        """
+        Initialize an empty track.
+
+        Args:
+            track_id: Identifier unique within one video
+        """
+        self.track_id = track_id
+        self.observations: List[Dict] = []
+        self.misses = 0
+
+    @property
+    def last(self) -> Dict:
+        """The most recent observation."""
+        return self.observations[-1]
+
+    def add(self, frame: int, timestamp: float, detection: Dict, tracked: bool) -> Dict:
+        """
+        Append an observation and return it as a detection with track_id.
+
+        Args:
+            frame: Frame number
+            timestamp: Frame time in seconds
+            detection: Detection dict with bbox and confidence
+            tracked: True if the box came from optical flow rather than the detector
+        """
+        observation = {
+            'frame': frame,
+            'timestamp': timestamp,
+            'bbox': detection['bbox'],
+            'confidence': detection['confidence'],
+            'tracked': tracked
+        }
+        self.observations.append(observation)
+        self.misses = 0
+        return {
+            'bbox': detection['bbox'],
+            'confidence': detection['confidence'],
+            'track_id': self.track_id,
+            'tracked': tracked
+        }
+
+    def timeline(self) -> Dict:
+        """
+        Summarize the track.
+
+        Returns:
+            Dictionary with track_id, start/end frame and time, and the
+            list of observations
+        """
+        return {
+            'track_id': self.track_id,
+            'start_frame': self.observations[0]['frame'],
+            'end_frame': self.last['frame'],
+            'start_time': self.observations[0]['timestamp'],
+            'end_time': self.last['timestamp'],
+            'observations': list(self.observations)
+        }
+
+
+class IoUTracker:
+    """
+    Associate detections with tracks by greedy bounding-box IoU matching.
+
+    Tracks that go unmatched for more than max_misses consecutive detection
+    passes are closed.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_misses: int = 1):
+        """
+        Initialize the tracker.
+
+        Args:
+            iou_threshold: Minimum IoU for a detection to continue a track
+            max_misses: Detection passes a track may go unmatched before closing
+        """
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.active: List[Track] = []
+        self.finished: List[Track] = []
+        self._next_id = 0
+
+    def update(self, detections: List[Dict], frame: int, timestamp: float) -> List[Dict]:
+        """
+        Match fresh detections to active tracks, opening tracks for new faces.
+
+        Args:
+            detections: Detections from the detector for this frame
+            frame: Frame number
+            timestamp: Frame time in seconds
+
+        Returns:
+            The detections with track_id and tracked=False added
+        """
+        pairs = sorted(
+            (
+                (bbox_iou(track.last['bbox'], detection['bbox']), i, j)
+                for i, track in enumerate(self.active)
+                for j, detection in enumerate(detections)
+            ),
+            reverse=True
+        )
+        assigned: Dict[int, int] = {}
+        used_tracks = set()
+        for iou, i, j in pairs:
+            if iou < self.iou_threshold:
+                break
+            if i in used_tracks or j in assigned:
+                continue
+            used_tracks.add(i)
+            assigned[j] = i
+
+        output = []
+        for j, detection in enumerate(detections):
+            if j in assigned:
+                track = self.active[assigned[j]]
+            else:
+                track = Track(self._next_id)
+                self._next_id += 1
+                self.active.append(track)
+            output.append(track.add(frame, timestamp, detection, tracked=False))
+
+        still_active = []
+        for i, track in enumerate(self.active):
+            if track.observations[-1]['frame'] != frame:
+                track.misses += 1
+                if track.misses > self.max_misses:
+                    self.finished.append(track)
+                    continue
+            still_active.append(track)
+        self.active = still_active
+        return output
+
+    def carry(self, moved: List[Optional[Dict]], frame: int, timestamp: float) -> List[Dict]:
+        """
+        Record boxes propagated by optical flow for the active tracks.
+
+        Args:
+            moved: One entry per active track (same order): the moved
+                   detection, or None if the track could not be followed
+            frame: Frame number
+            timestamp: Frame time in seconds
+
+        Returns:
+            The carried detections with track_id and tracked=True added
+        """
+        output = []
+        for track, detection in zip(self.active, moved):
+            if detection is not None:
+                output.append(track.add(frame, timestamp, detection, tracked=True))
+        return output
+
+    def timelines(self) -> List[Dict]:
+        """Return the timelines of all tracks, ordered by track_id."""
+        tracks = sorted(self.finished + self.active, key=lambda track: track.track_id)
+        return [track.timeline() for track in tracks]
+
+
+def propagate_detections(
+    prev_gray: np.ndarray,
+    gray: np.ndarray,
+    detections: List[Dict],
+    min_points: int = 4
+) -> List[Optional[Tuple[Dict, float]]]:
+    """
+    Move detection boxes from one frame to the next with optical flow.
+
+    Corner points inside each box are followed with pyramidal Lucas-Kanade
+    flow and the box is shifted by their median displacement.
+
+    Args:
+        prev_gray: Grayscale frame the boxes belong to
+        gray: Grayscale frame to move them to
+        detections: Detections in prev_gray
+        min_points: Fewest successfully tracked points needed to trust a box
+
+    Returns:
+        One entry per detection: (moved detection, displacement relative to
+        box size), or None if the face could not be followed
+    """
+    height, width = gray.shape[:2]
+    moved: List[Optional[Tuple[Dict, float]]] = []
+    for detection in detections:
+        bbox = detection['bbox']
+        x0, y0 = max(0, bbox['x']), max(0, bbox['y'])
+        x1, y1 = min(width, bbox['x'] + bbox['w']), min(height, bbox['y'] + bbox['h'])
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            moved.append(None)
+            continue
+
+        mask = np.zeros_like(prev_gray)
+        mask[y0:y1, x0:x1] = 255
+        points = cv2.goodFeaturesToTrack(prev_gray, maxCorners=40, qualityLevel=0.01, minDistance=3, mask=mask)
+        if points is None or len(points) < min_points:
+            moved.append(None)
+            continue
+
+        next_points, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, points, None)
+        good = status.ravel() == 1
+        if good.sum() < min_points:
+            moved.append(None)
+            continue
+
+        dx, dy = np.median((next_points - points).reshape(-1, 2)[good], axis=0)
+        new_x = int(round(bbox['x'] + dx))
+        new_y = int(round(bbox['y'] + dy))
+        # A box pushed entirely out of the frame means the face left it
+        if new_x + bbox['w'] <= 0 or new_y + bbox['h'] <= 0 or new_x >= width or new_y >= height:
+            moved.append(None)
+            continue
+
+        displacement = float(np.hypot(dx, dy)) / max(bbox['w'], bbox['h'])
+        moved.append(({
+            **detection,
+            'bbox': {'x': new_x, 'y': new_y, 'w': bbox['w'], 'h': bbox['h']}
+        }, displacement))
+    return moved
+
+
+def track_faces_in_video(
+    video_path: str,
+    detector_backend: str = "retinaface",
+    frame_interval_sec: float = 1.0,
+    min_interval_sec: float = 0.25,
+    max_interval_sec: float = 4.0,
+    keyframe_interval_sec: float = 2.0,
+    motion_threshold: float = 0.1,
+    iou_threshold: float = 0.3,
+    detect_size: Optional[int] = None,
+    max_frames: Optional[int] = None
+) -> Dict:
+    """
+    Detect and track faces through a video with adaptive frame sampling.
+
+    Args:
+        video_path: Path to the input video file
+        detector_backend: Detection backend to use (default: "retinaface")
+        frame_interval_sec: Sampling interval while faces are visible (default: 1.0)
+        min_interval_sec: Sampling interval while faces are moving (default: 0.25)
+        max_interval_sec: Longest interval the sampler backs off to while the
+                          scene is empty (default: 4.0)
+        keyframe_interval_sec: Run the detector at least this often while
+                               tracking, to pick up new faces (default: 2.0)
+        motion_threshold: Box displacement, relative to box size, above
+                          which a face counts as moving (default: 0.1)
+        iou_threshold: Minimum IoU to continue a track with a detection
+        detect_size: Longest frame side used for detection, or None for
+                     full resolution
+        max_frames: Maximum number of sampled frames (None for no limit)
+
+    Returns:
+        Dictionary containing:
+            - frames: one record per sampled frame with frame, timestamp,
+              detected (whether the detector ran) and detections, each
+              carrying track_id and tracked
+            - tracks: timeline per track (see Track.timeline)
+            - frames_sampled: number of sampled frames
+            - detector_calls: number of frames the detector ran on
+
+    Raises:
+        FileNotFoundError: If video_path does not exist
+        ValueError: If video cannot be opened or processed
+    """
+    from .detect_faces import detect_faces_in_image
+    from .annotate_video import open_video
+
+    cap = open_video(video_path)
+    tracker = IoUTracker(iou_threshold=iou_threshold)
+    records: List[Dict] = []
+    detector_calls = 0
+    last_keyframe_time: Optional[float] = None
+    prev_gray: Optional[np.ndarray] = None
+    prev_frame_number = -1
+
+    try:
+        sampler = FrameSampler.from_path(
+            cap, video_path,
+            frame_interval_sec=frame_interval_sec,
+            max_frames=max_frames,
+            strategy='grab'
+        )
+        for frame_number, time_sec, frame in sampler:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+            moved: List[Optional[Tuple[Dict, float]]] = []
+            if tracker.active and prev_gray is not None:
+                moved = propagate_detections(
+                    prev_gray, gray, [track.last for track in tracker.active]
+                )
+                # Tracks the last detection pass missed cannot be followed by
+                # flow from the previous frame; they count as lost
+                moved = [
+                    entry if track.last['frame'] == prev_frame_number else None
+                    for track, entry in zip(tracker.active, moved)
+                ]
+
+            need_detection = (
+                not tracker.active
+                or last_keyframe_time is None
+                or time_sec - last_keyframe_time >= keyframe_interval_sec
+                or any(entry is None for entry in moved)
+            )
+
+            if need_detection:
+                detections = detect_faces_in_image(frame, detector_backend, detect_size=detect_size)
+                detector_calls += 1
+                last_keyframe_time = time_sec
+                frame_detections = tracker.update(detections, frame_number, time_sec)
+            else:
+                frame_detections = tracker.carry(
+                    [entry[0] for entry in moved], frame_number, time_sec
+                )
+
+            records.append({
+                'frame': frame_number,
+                'timestamp': time_sec,
+                'detected': need_detection,
+                'detections': frame_detections
+            })
+            prev_gray = gray
+            prev_frame_number = frame_number
+
+            # Adapt the interval to the next sample
+            if not tracker.active:
+                sampler.frame_interval_sec = min(max_interval_sec, sampler.frame_interval_sec * 2)
+            elif any(entry is not None and entry[1] > motion_threshold for entry in moved):
+                sampler.frame_interval_sec = min_interval_sec
+            else:
+                sampler.frame_interval_sec = frame_interval_sec
+    finally:
+        cap.release()
+
+    return {
+        'frames': records,
+        'tracks': tracker.timelines(),
+        'frames_sampled': len(records),
+        'detector_calls': detector_calls
+    }
+
+
+def main():
+    """CLI entry point for face tracking."""
+    parser = argparse.ArgumentParser(
+        prog="python -m unlabeled_media_tagger.pipeline.tracking",
+        description="Track faces through a video and write per-track timelines.",
+    )
+    parser.add_argument("video_path", help="Video file to process")
+    parser.add_argument("detector_backend", nargs="?", default="retinaface",
+                        help="Detector backend: retinaface (default), mtcnn, opencv, ssd, dlib, mediapipe")
+    parser.add_argument("-o", "--output", default=None,
+                        help="JSON file for the track timelines (default: outputs/<video>_tracks.json)")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="Seconds between samples while faces are visible (default: 1.0)")
+    parser.add_argument("--min-interval", type=float, default=0.25,
+                        help="Seconds between samples while faces move (default: 0.25)")
+    parser.add_argument("--max-interval", type=float, default=4.0,
+                        help="Longest gap between samples in empty scenes (default: 4.0)")
+    parser.add_argument("--keyframe-interval", type=float, default=2.0,
+                        help="Run the detector at least this often while tracking (default: 2.0)")
+    parser.add_argument("--detect-size", type=int, default=None,
+                        help="Detect on frames downscaled to this longest side (fast mode)")
+    args = parser.parse_args()
+
+    output_path = Path(args.output or Path("outputs") / f"{Path(args.video_path).stem}_tracks.json")
+
+    print(f"Tracking faces in: {args.video_path}")
+    print(f"Using detector: {args.detector_backend}\n")
+
+    try:
+        result = track_faces_in_video(
+            args.video_path,
+            args.detector_backend,
+            frame_interval_sec=args.interval,
+            min_interval_sec=args.min_interval,
+            max_interval_sec=args.max_interval,
+            keyframe_interval_sec=args.keyframe_interval,
+            detect_size=args.detect_size
+        )
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({'video': args.video_path, 'tracks': result['tracks']}, f, indent=2)
+
+    print(f"✓ Sampled {result['frames_sampled']} frame(s), "
+          f"ran the detector on {result['detector_calls']}")
+    print(f"✓ Found {len(result['tracks'])} track(s)")
+    print(f"✓ Timelines written to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
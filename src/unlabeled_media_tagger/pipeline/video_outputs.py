@@ -0,0 +1,264 @@
+"""
+Video Annotation Output Module
+
+This module provides the ways annotate_video() can write its results:
+
+- frames: one annotated JPEG per sampled frame in a directory (the original
+  behavior; many small files)
+- video: a single annotated video of the sampled frames, via cv2.VideoWriter
+- timeline: a single NDJSON file with one line of detections per sampled
+  frame and no image output at all
+
+Every output exposes write(sample, detections, reused), flush() and
+close(), and can be used as a context manager.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..utils.image_writer import AsyncImageWriter
+
+OUTPUT_MODES = ('frames', 'video', 'timeline')
+
+
+class FrameImageOutput:
+    """
+    Write each annotated sampled frame as its own JPEG file.
+
+    Frames are encoded and written by a background AsyncImageWriter, so the
+    caller only pays for drawing.
+    """
+
+    def __init__(self, output_dir: str, jpeg_quality: int = 95, writer_threads: int = 2):
+        """
+        Initialize the output.
+
+        Args:
+            output_dir: Directory the frame images are written to
+            jpeg_quality: JPEG quality, 0-100 (default: 95)
+            writer_threads: Background encoding threads (default: 2)
+        """
+        # Imported lazily so timeline output works without the detector stack
+        from .annotate_image import draw_detections
+
+        self._draw = draw_detections
+        self._writer = AsyncImageWriter(workers=writer_threads, jpeg_quality=jpeg_quality)
+        self.path = Path(output_dir)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.written = 0
+
+    def write(self, sample: Tuple[int, float, np.ndarray], detections: List[Dict], reused: bool = False) -> None:
+        """Annotate the frame in place and queue it as frame_<n>_t<time>s.jpg."""
+        frame_number, time_sec, frame = sample
+        output_path = self.path / f"frame_{frame_number:04d}_t{time_sec:.1f}s.jpg"
+        self._writer.submit(self._draw(frame, detections), str(output_path))
+        self.written += 1
+
+    def flush(self) -> None:
+        """
+        Wait for the frames queued so far to be written.
+
+        Raises:
+            ValueError: A frame could not be encoded
+            OSError: A frame could not be written
+        """
+        self._writer.flush()
+
+    def close(self) -> None:
+        """Wait for queued frames to be written."""
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class AnnotatedVideoOutput:
+    """
+    Write annotated sampled frames into one video file.
+
+    The writer is opened on the first frame, so the frame size does not need
+    to be known up front. Playing the result at fps shows one sampled frame
+    per sampling interval, keeping the original timing.
+    """
+
+    def __init__(self, output_path: str, fps: float, fourcc: str = 'mp4v'):
+        """
+        Initialize the output.
+
+        Args:
+            output_path: Video file to write, e.g. outputs/clip_annotated.mp4
+            fps: Frame rate of the output video
+            fourcc: Four-character codec code for cv2.VideoWriter (default: mp4v)
+
+        Raises:
+            ValueError: If fps is not positive
+        """
+        if fps <= 0:
+            raise ValueError(f"fps must be positive, got {fps}")
+        from .annotate_image import draw_detections
+
+        self._draw = draw_detections
+        self.path = Path(output_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fps = fps
+        self.fourcc = fourcc
+        self._writer: Optional[cv2.VideoWriter] = None
+        self._size: Optional[Tuple[int, int]] = None
+        self.written = 0
+
+    def write(self, sample: Tuple[int, float, np.ndarray], detections: List[Dict], reused: bool = False) -> None:
+        """
+        Draw detections onto the frame in place and append it to the video.
+
+        Raises:
+            ValueError: If the video writer cannot be opened
+        """
+        _, _, frame = sample
+        height, width = frame.shape[:2]
+        if self._writer is None:
+            self._size = (width, height)
+            self._writer = cv2.VideoWriter(
+                str(self.path), cv2.VideoWriter_fourcc(*self.fourcc), self.fps, self._size
+            )
+            if not self._writer.isOpened():
+                raise ValueError(f"Failed to open video writer for: {self.path}")
+        elif (width, height) != self._size:
+            frame = cv2.resize(frame, self._size)
+
+        self._writer.write(self._draw(frame, detections))
+        self.written += 1
+
+    def flush(self) -> None:
+        """Nothing to do: cv2.VideoWriter gives no partial-file guarantee before close()."""
+
+    def close(self) -> None:
+        """Finalize the video file."""
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class TimelineOutput:
+    """
+    Write detections as an NDJSON timeline, one line per sampled frame.
+
+    Each line holds frame, timestamp, reused and detections (bbox,
+    confidence and track_id when faces are tracked), so a timeline can be
+    streamed and appended to cheaply.
+    """
+
+    def __init__(self, output_path: str):
+        """
+        Initialize the output.
+
+        Args:
+            output_path: NDJSON file to write, e.g. outputs/clip_detections.ndjson
+        """
+        self.path = Path(output_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self.written = 0
+
+    def write(self, sample: Tuple[int, float, np.ndarray], detections: List[Dict], reused: bool = False) -> None:
+        """Append one line for the frame."""
+        frame_number, time_sec, _ = sample
+        record = {
+            'frame': frame_number,
+            'timestamp': round(time_sec, 3),
+            'reused': reused,
+            'detections': [_timeline_detection(detection) for detection in detections]
+        }
+        self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self.written += 1
+
+    def flush(self) -> None:
+        """Push the lines written so far to the file."""
+        if not self._file.closed:
+            self._file.flush()
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _timeline_detection(detection: Dict) -> Dict:
+    """The fields of a detection stored in a timeline line."""
+    entry = {'bbox': detection['bbox'], 'confidence': round(float(detection['confidence']), 4)}
+    if 'track_id' in detection:
+        entry['track_id'] = detection['track_id']
+    return entry
+
+
+def default_output_path(video_path: str, mode: str, output_root: str = "outputs") -> str:
+    """
+    Return where annotate_video() writes a mode's output by default.
+
+    Args:
+        video_path: Input video path
+        mode: One of OUTPUT_MODES
+        output_root: Base output directory (default: outputs)
+
+    Returns:
+        outputs/<stem>/ for frames, outputs/<stem>_annotated.mp4 for video,
+        outputs/<stem>_detections.ndjson for timeline
+    """
+    stem = Path(video_path).stem
+    if mode == 'frames':
+        return str(Path(output_root) / stem)
+    if mode == 'video':
+        return str(Path(output_root) / f"{stem}_annotated.mp4")
+    if mode == 'timeline':
+        return str(Path(output_root) / f"{stem}_detections.ndjson")
+    raise ValueError(f"Unknown output mode '{mode}', expected one of {OUTPUT_MODES}")
+
+
+def create_output(
+    mode: str,
+    output_path: str,
+    fps: float = 1.0,
+    jpeg_quality: int = 95,
+    writer_threads: int = 2
+):
+    """
+    Create the output writer for a mode.
+
+    Args:
+        mode: One of OUTPUT_MODES
+        output_path: Directory (frames) or file (video, timeline) to write
+        fps: Frame rate of the annotated video (video mode only)
+        jpeg_quality: JPEG quality of frame images (frames mode only)
+        writer_threads: Background encoding threads (frames mode only)
+
+    Returns:
+        FrameImageOutput, AnnotatedVideoOutput or TimelineOutput
+
+    Raises:
+        ValueError: If mode is unknown
+    """
+    if mode == 'frames':
+        return FrameImageOutput(output_path, jpeg_quality, writer_threads)
+    if mode == 'video':
+        return AnnotatedVideoOutput(output_path, fps)
+    if mode == 'timeline':
+        return TimelineOutput(output_path)
+    raise ValueError(f"Unknown output mode '{mode}', expected one of {OUTPUT_MODES}")
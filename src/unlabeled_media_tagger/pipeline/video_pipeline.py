@@ -0,0 +1,314 @@
+"""
+Video Processing Pipeline Module
+
+This module overlaps the stages of video processing on separate threads:
+
+    decoder thread -> [bounded queue] -> detection workers -> [bounded queue] -> writer
+
+Frame decoding, detector inference and image encoding all release the GIL,
+so the stages run concurrently. Queues are bounded and the number of
+batches in flight is capped, so a slow stage makes the faster ones wait
+(backpressure) instead of letting decoded frames pile up in memory.
+
+An optional gate lets the decoder mark frames whose detections can be
+reused from the previous frame (see frame_gate.FrameGate); those frames
+skip the detector and are written with the most recent detections.
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Marks the end of the stream on a queue
+_DONE = object()
+
+# How often blocked stages wake up to check whether the pipeline was stopped
+_POLL_SEC = 0.1
+
+
+class StageStats:
+    """
+    Busy time and item count for one pipeline stage.
+
+    Utilization is the share of wall-clock time the stage's threads spent
+    working rather than waiting on a queue.
+    """
+
+    def __init__(self, name: str, workers: int = 1):
+        """
+        Initialize stage statistics.
+
+        Args:
+            name: Stage name
+            workers: Number of threads running the stage
+        """
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy_sec = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, busy_sec: float, items: int = 1) -> None:
+        """Record work done by one of the stage's threads."""
+        with self._lock:
+            self.busy_sec += busy_sec
+            self.items += items
+
+    def as_dict(self, wall_sec: float) -> Dict:
+        """
+        Summarize the stage.
+
+        Args:
+            wall_sec: Wall-clock duration of the whole pipeline run
+
+        Returns:
+            Dictionary with items, busy_sec, workers and utilization (0-1)
+        """
+        capacity = wall_sec * self.workers
+        return {
+            'items': self.items,
+            'busy_sec': self.busy_sec,
+            'workers': self.workers,
+            'utilization': self.busy_sec / capacity if capacity > 0 else 0.0,
+        }
+
+
+class VideoPipeline:
+    """
+    Run decode, detection and writing of sampled frames concurrently.
+
+    Samples are grouped into batches of batch_size. The decoder thread pulls
+    samples from the source iterator, detect_workers threads call
+    detect_batch on each batch, and the calling thread acts as the writer,
+    passing every sample and its detections to sink in the original order.
+
+    If gate is given it is called on every sample in the decoder thread;
+    samples for which it returns True are not detected and reuse the result
+    of the closest earlier sample.
+
+    At most queue_size batches wait in each queue and at most
+    2 * queue_size + detect_workers batches are alive at once, which bounds
+    memory regardless of video length.
+    """
+
+    def __init__(
+        self,
+        detect_batch: Callable[[List[Tuple]], Sequence],
+        sink: Callable[[Tuple, object, bool], None],
+        batch_size: int = 10,
+        detect_workers: int = 1,
+        queue_size: int = 4,
+        gate: Optional[Callable[[Tuple], bool]] = None
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            detect_batch: Called with a list of samples; returns one result per sample
+            sink: Called with (sample, result, reused) for every sample, in
+                  order; reused is True when the gate skipped detection
+            batch_size: Samples per detection batch
+            detect_workers: Number of detection threads
+            queue_size: Maximum batches waiting in each queue
+            gate: Optional predicate marking samples whose detections can be
+                  reused from the previous sample
+
+        Raises:
+            ValueError: If any size is not positive
+        """
+        if batch_size < 1 or detect_workers < 1 or queue_size < 1:
+            raise ValueError("batch_size, detect_workers and queue_size must be positive")
+        self.detect_batch = detect_batch
+        self.sink = sink
+        self.batch_size = batch_size
+        self.detect_workers = detect_workers
+        self.queue_size = queue_size
+        self.gate = gate
+        self.stats: Dict[str, StageStats] = {}
+
+    def run(self, samples: Iterable[Tuple]) -> Dict[str, Dict]:
+        """
+        Process every sample from the source iterator.
+
+        Args:
+            samples: Iterable of samples, e.g. FrameSampler yielding
+                     (frame_number, time_sec, frame)
+
+        Returns:
+            Per-stage statistics (see StageStats.as_dict) keyed by
+            decode, detect and write, plus wall_sec and reused (samples
+            the gate let skip detection)
+
+        Raises:
+            Exception: The first error raised by any stage
+        """
+        decode_q: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        result_q: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        in_flight = threading.Semaphore(2 * self.queue_size + self.detect_workers)
+        stop = threading.Event()
+        errors: List[BaseException] = []
+
+        self.stats = {
+            'decode': StageStats('decode'),
+            'detect': StageStats('detect', self.detect_workers),
+            'write': StageStats('write'),
+        }
+
+        def fail(error: BaseException) -> None:
+            errors.append(error)
+            stop.set()
+
+        def put(q: "queue.Queue", item) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=_POLL_SEC)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(q: "queue.Queue"):
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=_POLL_SEC)
+                except queue.Empty:
+                    continue
+            return _DONE
+
+        def acquire_slot() -> bool:
+            while not stop.is_set():
+                if in_flight.acquire(timeout=_POLL_SEC):
+                    return True
+            return False
+
+        def decoder() -> None:
+            try:
+                iterator = iter(samples)
+                seq = 0
+                batch: List[Tuple] = []
+                reused: List[bool] = []
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    try:
+                        sample = next(iterator)
+                    except StopIteration:
+                        break
+                    # The gate must see frames in order, so it runs here
+                    reused.append(self.gate is not None and self.gate(sample))
+                    self.stats['decode'].add(time.perf_counter() - start)
+
+                    batch.append(sample)
+                    if len(batch) == self.batch_size:
+                        if not (acquire_slot() and put(decode_q, (seq, batch, reused))):
+                            return
+                        seq += 1
+                        batch = []
+                        reused = []
+
+                if batch and acquire_slot():
+                    put(decode_q, (seq, batch, reused))
+            except BaseException as e:
+                fail(e)
+            finally:
+                for _ in range(self.detect_workers):
+                    put(decode_q, _DONE)
+
+        def detector() -> None:
+            try:
+                while True:
+                    item = get(decode_q)
+                    if item is _DONE:
+                        break
+                    seq, batch, reused = item
+                    fresh = [sample for sample, skip in zip(batch, reused) if not skip]
+                    results: Sequence = []
+                    if fresh:
+                        start = time.perf_counter()
+                        results = self.detect_batch(fresh)
+                        self.stats['detect'].add(time.perf_counter() - start, len(fresh))
+                    if not put(result_q, (seq, batch, reused, results)):
+                        break
+            except BaseException as e:
+                fail(e)
+            finally:
+                put(result_q, _DONE)
+
+        threads = [threading.Thread(target=decoder, name='video-decode', daemon=True)]
+        threads += [
+            threading.Thread(target=detector, name=f'video-detect-{i}', daemon=True)
+            for i in range(self.detect_workers)
+        ]
+
+        wall_start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        # Writer stage: emit batches in sequence order as they complete
+        try:
+            ready: Dict[int, Tuple] = {}
+            next_seq = 0
+            finished_workers = 0
+            previous = None
+            reused_count = 0
+            while finished_workers < self.detect_workers and not stop.is_set():
+                item = get(result_q)
+                if item is _DONE:
+                    finished_workers += 1
+                    continue
+                seq, batch, reused, results = item
+                ready[seq] = (batch, reused, results)
+
+                while next_seq in ready:
+                    batch, reused, results = ready.pop(next_seq)
+                    start = time.perf_counter()
+                    fresh_results = iter(results)
+                    for sample, skip in zip(batch, reused):
+                        if skip:
+                            reused_count += 1
+                        else:
+                            previous = next(fresh_results)
+                        self.sink(sample, previous, skip)
+                    self.stats['write'].add(time.perf_counter() - start, len(batch))
+                    in_flight.release()
+                    next_seq += 1
+        except BaseException as e:
+            fail(e)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        if errors:
+            raise errors[0]
+
+        wall_sec = time.perf_counter() - wall_start
+        report: Dict[str, Dict] = {
+            name: stage.as_dict(wall_sec) for name, stage in self.stats.items()
+        }
+        report['wall_sec'] = wall_sec
+        report['reused'] = reused_count
+        return report
+
+
+def format_stage_report(report: Dict[str, Dict]) -> str:
+    """
+    Format VideoPipeline.run() statistics for printing.
+
+    Args:
+        report: Statistics returned by VideoPipeline.run()
+
+    Returns:
+        One line per stage with item count, busy time and utilization
+    """
+    lines = []
+    for name in ('decode', 'detect', 'write'):
+        stage = report.get(name)
+        if stage is None:
+            continue
+        lines.append(
+            f"  {name:<7} {stage['items']:>6} item(s)  busy {stage['busy_sec']:7.2f}s  "
+            f"utilization {stage['utilization'] * 100:5.1f}% (x{stage['workers']})"
+        )
+    return "\n".join(lines)
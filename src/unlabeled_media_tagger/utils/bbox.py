@@ -0,0 +1,117 @@
+"""
+Bounding box helpers for normalized face detections.
+
+Detections use the format returned by detect_faces_in_image():
+{'bbox': {'x', 'y', 'w', 'h'}, 'confidence'}.
+"""
+
+from typing import Dict, List, Tuple
+
+
+def scale_detections(
+    detections: List[Dict],
+    scale: float,
+    offset: Tuple[int, int] = (0, 0)
+) -> List[Dict]:
+    """
+    Map detections from a resized and/or cropped image back to the original.
+
+    Args:
+        detections: Detections in the resized/cropped image's coordinates
+        scale: Factor the original image was resized by (e.g. 0.25)
+        offset: (x, y) of the crop's top-left corner in the original image
+
+    Returns:
+        New list of detections in original image coordinates
+    """
+    off_x, off_y = offset
+    mapped = []
+    for detection in detections:
+        bbox = detection['bbox']
+        mapped.append({
+            **detection,
+            'bbox': {
+                'x': int(round(bbox['x'] / scale)) + off_x,
+                'y': int(round(bbox['y'] / scale)) + off_y,
+                'w': int(round(bbox['w'] / scale)),
+                'h': int(round(bbox['h'] / scale)),
+            }
+        })
+    return mapped
+
+
+def bbox_iou(a: Dict, b: Dict) -> float:
+    """
+    Intersection over union of two bbox dicts with x, y, w, h.
+
+    Args:
+        a: First bounding box
+        b: Second bounding box
+
+    Returns:
+        IoU in [0, 1]
+    """
+    ix = max(0, min(a['x'] + a['w'], b['x'] + b['w']) - max(a['x'], b['x']))
+    iy = max(0, min(a['y'] + a['h'], b['y'] + b['h']) - max(a['y'], b['y']))
+    inter = ix * iy
+    union = a['w'] * a['h'] + b['w'] * b['h'] - inter
+    return inter / union if union > 0 else 0.0
+
+
+def non_max_suppression(
+    detections: List[Dict],
+    iou_threshold: float = 0.4
+) -> List[Dict]:
+    """
+    Drop detections that overlap a higher-confidence detection.
+
+    Args:
+        detections: Detections to filter
+        iou_threshold: Overlap above which the lower-confidence box is dropped
+
+    Returns:
+        Kept detections, highest confidence first
+    """
+    kept: List[Dict] = []
+    for detection in sorted(detections, key=lambda d: d['confidence'], reverse=True):
+        if all(bbox_iou(detection['bbox'], k['bbox']) <= iou_threshold for k in kept):
+            kept.append(detection)
+    return kept
+
+
+def match_detections(
+    predicted: List[Dict],
+    reference: List[Dict],
+    iou_threshold: float = 0.5
+) -> int:
+    """
+    Count reference detections matched by a predicted detection.
+
+    Each predicted box can match at most one reference box (greedy by IoU).
+
+    Args:
+        predicted: Detections to evaluate
+        reference: Ground-truth or full-resolution detections
+        iou_threshold: Minimum IoU for a match
+
+    Returns:
+        Number of matched reference detections
+    """
+    pairs = sorted(
+        (
+            (bbox_iou(p['bbox'], r['bbox']), i, j)
+            for i, p in enumerate(predicted)
+            for j, r in enumerate(reference)
+        ),
+        reverse=True
+    )
+    used_pred = set()
+    used_ref = set()
+    for iou, i, j in pairs:
+        if iou < iou_threshold:
+            break
+        if i in used_pred or j in used_ref:
+            continue
+        used_pred.add(i)
+        used_ref.add(j)
+    return len(used_ref)
@@ -0,0 +1,210 @@
+"""
+On-disk cache of face detection results.
+
+Results are stored in SQLite keyed by the content hash of the media file
+together with the detector backend and any parameters that change the
+output (such as the video sampling interval), so unchanged files are never
+re-detected across runs or after a crash.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def file_content_hash(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Compute a content hash of a file, reading it in chunks.
+
+    Args:
+        file_path: Path to the file
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        Hex digest of the file contents
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DetectionCache:
+    """
+    Size-bounded SQLite cache of normalized detection results.
+
+    Entries are evicted least-recently-used first once the stored payloads
+    exceed max_bytes. Every put is committed immediately, so a run that
+    crashes keeps everything it finished. Safe to share between threads;
+    several processes may open the same file.
+    """
+
+    def __init__(self, db_path: str, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Open (or create) a detection cache.
+
+        Args:
+            db_path: Path to the SQLite database file
+            max_bytes: Maximum total size of stored results in bytes
+        """
+        self.db_path = str(db_path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS detections ("
+            " key TEXT PRIMARY KEY,"
+            " payload TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS detections_last_access"
+            " ON detections (last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        content_hash: str,
+        detector_backend: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Build a cache key from a content hash, backend and model parameters.
+
+        Args:
+            content_hash: Hash of the media file contents
+            detector_backend: Detector backend name
+            params: Any other settings that change the detections,
+                    e.g. {"frame_interval_sec": 1.0}
+
+        Returns:
+            Cache key string
+        """
+        canonical = json.dumps(params or {}, sort_keys=True, separators=(",", ":"))
+        params_hash = hashlib.blake2b(canonical.encode("utf-8"), digest_size=8).hexdigest()
+        return f"{content_hash}:{detector_backend}:{params_hash}"
+
+    def key_for_file(
+        self,
+        file_path: str,
+        detector_backend: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Build the cache key for a media file on disk.
+
+        Args:
+            file_path: Path to the media file
+            detector_backend: Detector backend name
+            params: Settings that change the detections (see make_key)
+
+        Returns:
+            Cache key string
+        """
+        return self.make_key(file_content_hash(file_path), detector_backend, params)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up cached results.
+
+        Args:
+            key: Cache key from make_key() or key_for_file()
+
+        Returns:
+            The cached results, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM detections WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE detections SET last_access = ? WHERE key = ?",
+                (time.time(), key)
+            )
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, results: Any) -> None:
+        """
+        Store results and evict old entries if the cache is over its size bound.
+
+        Args:
+            key: Cache key from make_key() or key_for_file()
+            results: JSON-serializable detection results
+        """
+        payload = json.dumps(results, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO detections (key, payload, size, last_access)"
+                " VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload), time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Delete least-recently-used entries until under max_bytes (lock held)."""
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM detections"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT key, size FROM detections ORDER BY last_access"
+        )
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM detections WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report cache counters.
+
+        Returns:
+            Dictionary with hits, misses, evictions, entries and size_bytes
+        """
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM detections"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -40,6 +40,9 @@ def get_media_files(directory: str) -> List[str]:
     """
     Get all supported media files from a directory.
     
+    Subdirectories are scanned recursively. Paths are returned sorted so
+    repeated runs see files in the same order.
+    
     Args:
         directory: Path to the directory to scan
         
@@ -47,6 +50,13 @@ def get_media_files(directory: str) -> List[str]:
         List of paths to media files
         
     Raises:
-        NotImplementedError: This is a placeholder for future implementation
+        NotADirectoryError: If directory is not an existing directory
     """
-    raise NotImplementedError("Media file scanning not yet implemented")
+    root = Path(directory)
+    if not root.is_dir():
+        raise NotADirectoryError(f"Not a directory: {directory}")
+    
+    return sorted(
+        str(path) for path in root.rglob("*")
+        if path.is_file() and (is_image_file(str(path)) or is_video_file(str(path)))
+    )
@@ -0,0 +1,88 @@
+"""
+Reduced-resolution image decoding.
+
+JPEG decoders can scale by 1/2, 1/4 or 1/8 inside the DCT, skipping most of
+the inverse transform and never allocating the full-size bitmap. When
+detection runs at a fixed resolution anyway, decoding straight to the
+smallest such scale that still covers that resolution cuts both decode time
+and peak memory; the detector's own downscale then only resizes the rest.
+"""
+
+from pathlib import Path
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+from .media_headers import HeaderError, read_media_header
+
+
+# OpenCV imread flags decoding at 1/factor of the full resolution
+REDUCED_DECODE_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def choose_reduction(width: int, height: int, target_side: int) -> int:
+    """
+    Pick the largest decode reduction that keeps the image at least target_side.
+
+    Args:
+        width: Full image width in pixels
+        height: Full image height in pixels
+        target_side: Longest side the image will be used at
+
+    Returns:
+        1, 2, 4 or 8
+    """
+    longest = max(width, height)
+    for factor in (8, 4, 2):
+        if longest / factor >= target_side:
+            return factor
+    return 1
+
+
+def decode_reduced(image_path: str, target_side: int) -> Tuple[np.ndarray, float]:
+    """
+    Decode an image at the smallest JPEG scale whose longest side still
+    covers target_side.
+
+    The reduction is chosen from the header dimensions, so nothing is
+    decoded twice. Non-JPEG images are decoded at full resolution, since
+    only JPEG supports scaled decoding.
+
+    Args:
+        image_path: Path to the image file
+        target_side: Longest side the image will be used at (e.g. the
+                     detection size)
+
+    Returns:
+        (BGR image, scale) where scale is the decoded size over the full
+        size; pass it to scale_detections to map boxes back
+
+    Raises:
+        FileNotFoundError: If the image does not exist
+        ValueError: If the image cannot be decoded
+    """
+    if not Path(image_path).exists():
+        raise FileNotFoundError(f"Image not found: {image_path}")
+
+    factor = 1
+    full_side = None
+    try:
+        header = read_media_header(str(image_path))
+    except HeaderError:
+        header = None
+    if header is not None and header['format'] == 'jpeg' and target_side:
+        full_side = max(header['width'], header['height'])
+        factor = choose_reduction(header['width'], header['height'], target_side)
+
+    image = cv2.imread(str(image_path), REDUCED_DECODE_FLAGS.get(factor, cv2.IMREAD_COLOR))
+    if image is None:
+        raise ValueError(f"Failed to load image: {image_path}")
+    if factor == 1:
+        return image, 1.0
+    # Reduced sizes are rounded up, so measure the actual scale
+    return image, max(image.shape[:2]) / full_side
@@ -0,0 +1,150 @@
+"""
+Background image encoding and writing.
+
+AsyncImageWriter encodes images with OpenCV and writes them to disk on a
+small thread pool. OpenCV's encoders release the GIL, so encoding overlaps
+with whatever the caller does next (typically detection).
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+
+def encode_params(output_path: str, jpeg_quality: int = 95, png_compression: int = 3) -> List[int]:
+    """
+    Return cv2.imencode/imwrite parameters for an output file type.
+
+    Args:
+        output_path: Output file path; its extension selects the format
+        jpeg_quality: JPEG quality, 0-100 (default: 95, OpenCV's default)
+        png_compression: PNG compression level, 0-9 (default: 3); lower is
+                         faster and larger
+
+    Returns:
+        Flat list of OpenCV encoder parameters
+    """
+    suffix = Path(output_path).suffix.lower()
+    if suffix in ('.jpg', '.jpeg'):
+        return [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)]
+    if suffix == '.png':
+        return [cv2.IMWRITE_PNG_COMPRESSION, int(png_compression)]
+    if suffix == '.webp':
+        return [cv2.IMWRITE_WEBP_QUALITY, int(jpeg_quality)]
+    return []
+
+
+class AsyncImageWriter:
+    """
+    Encode and write images on a background thread pool.
+
+    At most max_pending images are queued; submit() blocks beyond that,
+    which bounds memory when writing falls behind.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        jpeg_quality: int = 95,
+        png_compression: int = 3,
+        max_pending: int = 16
+    ):
+        """
+        Initialize the writer pool.
+
+        Args:
+            workers: Number of encoding threads (default: 2)
+            jpeg_quality: JPEG quality, 0-100 (default: 95)
+            png_compression: PNG compression level, 0-9 (default: 3)
+            max_pending: Images queued before submit() blocks (default: 16)
+        """
+        self.jpeg_quality = jpeg_quality
+        self.png_compression = png_compression
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='image-writer')
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._lock = threading.Lock()
+        self._futures: List[Future] = []
+        self._error: Optional[BaseException] = None
+        self.written = 0
+        self.bytes_written = 0
+
+    def _write(self, image: np.ndarray, output_path: str) -> None:
+        try:
+            try:
+                ok, buffer = cv2.imencode(
+                    Path(output_path).suffix or '.jpg', image,
+                    encode_params(output_path, self.jpeg_quality, self.png_compression)
+                )
+            except cv2.error as e:
+                # e.g. no encoder for the file extension
+                raise ValueError(f"Failed to encode image: {output_path}: {e}")
+            if not ok:
+                raise ValueError(f"Failed to encode image: {output_path}")
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            with open(output_path, 'wb') as f:
+                f.write(buffer.tobytes())
+            with self._lock:
+                self.written += 1
+                self.bytes_written += buffer.nbytes
+        except BaseException as e:
+            with self._lock:
+                if self._error is None:
+                    self._error = e
+            raise
+        finally:
+            self._slots.release()
+
+    def submit(self, image: np.ndarray, output_path: str) -> None:
+        """
+        Queue an image for encoding and writing.
+
+        The image array is used as-is, without a copy; do not modify it
+        afterwards.
+
+        Args:
+            image: BGR image array
+            output_path: File to write; the extension selects the format
+
+        Raises:
+            ValueError: An earlier image could not be encoded
+            OSError: An earlier image could not be written
+        """
+        if self._error is not None:
+            raise self._error
+        self._slots.acquire()
+        future = self._executor.submit(self._write, image, str(output_path))
+        with self._lock:
+            self._futures = [f for f in self._futures if not f.done()]
+            self._futures.append(future)
+
+    def flush(self) -> None:
+        """
+        Wait for all queued images to be written.
+
+        Raises:
+            ValueError: An image could not be encoded
+            OSError: An image could not be written
+        """
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.exception()
+        if self._error is not None:
+            raise self._error
+
+    def close(self) -> None:
+        """Write all queued images and stop the writer threads."""
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
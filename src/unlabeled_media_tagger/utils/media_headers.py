@@ -0,0 +1,352 @@
+"""
+Media header parsing utilities.
+
+These functions read dimensions, EXIF fields, durations and embedded
+thumbnails from container headers alone, without decoding pixels or
+opening a video capture. Only the header bytes are read: a JPEG is scanned
+up to its first scan, and an MP4 skips over media data boxes with seeks.
+
+Supported formats: JPEG (SOF and EXIF APP1), PNG, GIF, BMP, WebP, MP4/MOV
+(mvhd, tkhd, mdhd and stsz boxes) and AVI (avih and strh chunks).
+"""
+
+import struct
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+
+
+# TIFF tags read from EXIF, by IFD
+_IFD0_TAGS = {0x010F: 'make', 0x0110: 'model', 0x0112: 'orientation', 0x0132: 'datetime'}
+_EXIF_TAGS = {0x9003: 'datetime_original', 0xA002: 'exif_width', 0xA003: 'exif_height'}
+_EXIF_IFD_POINTER = 0x8769
+_THUMBNAIL_OFFSET = 0x0201
+_THUMBNAIL_LENGTH = 0x0202
+
+# Byte size of each TIFF field type
+_TIFF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 7: 1, 9: 4, 10: 8}
+
+# JPEG start-of-frame markers carrying the image size (C4, C8 and CC are not SOF)
+_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+_MP4_CONTAINERS = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+
+
+class HeaderError(ValueError):
+    """Raised when a file's header is missing, truncated or unsupported."""
+
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise HeaderError("Unexpected end of file in header")
+    return data
+
+
+def _parse_ifd(tiff: bytes, offset: int, endian: str, tags: Dict[int, str]) -> Tuple[Dict, int]:
+    """Read the wanted tags of one IFD; return them and the next IFD offset."""
+    values: Dict = {}
+    if offset <= 0 or offset + 2 > len(tiff):
+        return values, 0
+    (count,) = struct.unpack_from(endian + 'H', tiff, offset)
+    for index in range(count):
+        entry = offset + 2 + index * 12
+        if entry + 12 > len(tiff):
+            return values, 0
+        tag, field_type, n = struct.unpack_from(endian + 'HHI', tiff, entry)
+        if tag not in tags:
+            continue
+        size = _TIFF_TYPE_SIZES.get(field_type, 1) * n
+        data_offset = entry + 8 if size <= 4 else struct.unpack_from(endian + 'I', tiff, entry + 8)[0]
+        raw = tiff[data_offset:data_offset + size]
+        if len(raw) != size:
+            continue
+        if field_type == 2:
+            values[tags[tag]] = raw.split(b'\0', 1)[0].decode('ascii', 'replace').strip()
+        elif field_type == 3:
+            values[tags[tag]] = struct.unpack_from(endian + 'H', raw)[0]
+        elif field_type == 4:
+            values[tags[tag]] = struct.unpack_from(endian + 'I', raw)[0]
+    next_offset_at = offset + 2 + count * 12
+    if next_offset_at + 4 > len(tiff):
+        return values, 0
+    return values, struct.unpack_from(endian + 'I', tiff, next_offset_at)[0]
+
+
+def parse_exif(tiff: bytes) -> Dict:
+    """
+    Parse the TIFF structure of an EXIF block.
+
+    Args:
+        tiff: EXIF payload starting at the TIFF byte-order mark
+
+    Returns:
+        Dictionary with whichever of make, model, orientation, datetime,
+        datetime_original, exif_width and exif_height are present, plus
+        thumbnail_offset and thumbnail_length (relative to the TIFF start)
+        if an embedded JPEG thumbnail exists
+    """
+    if tiff[:2] == b'II':
+        endian = '<'
+    elif tiff[:2] == b'MM':
+        endian = '>'
+    else:
+        return {}
+    if len(tiff) < 8 or struct.unpack_from(endian + 'H', tiff, 2)[0] != 42:
+        return {}
+
+    ifd0_offset = struct.unpack_from(endian + 'I', tiff, 4)[0]
+    ifd0_tags = dict(_IFD0_TAGS)
+    ifd0_tags[_EXIF_IFD_POINTER] = 'exif_ifd'
+    exif, ifd1_offset = _parse_ifd(tiff, ifd0_offset, endian, ifd0_tags)
+
+    exif_ifd = exif.pop('exif_ifd', None)
+    if exif_ifd:
+        exif.update(_parse_ifd(tiff, exif_ifd, endian, _EXIF_TAGS)[0])
+
+    if ifd1_offset:
+        thumb_tags = {_THUMBNAIL_OFFSET: 'thumbnail_offset', _THUMBNAIL_LENGTH: 'thumbnail_length'}
+        thumbnail = _parse_ifd(tiff, ifd1_offset, endian, thumb_tags)[0]
+        if len(thumbnail) == 2 and thumbnail['thumbnail_length'] > 0:
+            exif.update(thumbnail)
+    return exif
+
+
+def _jpeg_header(f: BinaryIO) -> Dict:
+    """Scan JPEG segments up to the first scan for the size and EXIF block."""
+    header: Dict = {'format': 'jpeg'}
+    f.seek(2)
+    while True:
+        marker = _read_exact(f, 2)
+        while marker[0] == 0xFF and marker[1] == 0xFF:
+            # Fill bytes before a marker
+            marker = marker[1:] + _read_exact(f, 1)
+        if marker[0] != 0xFF:
+            raise HeaderError("Corrupt JPEG marker")
+        code = marker[1]
+        if code == 0xD9 or code == 0xDA:
+            break
+        if 0xD0 <= code <= 0xD7 or code == 0x01:
+            continue
+        (length,) = struct.unpack('>H', _read_exact(f, 2))
+        if length < 2:
+            raise HeaderError("Corrupt JPEG segment length")
+        segment_start = f.tell()
+        if code == 0xE1 and 'exif' not in header:
+            payload = _read_exact(f, length - 2)
+            if payload[:6] == b'Exif\0\0':
+                exif = parse_exif(payload[6:])
+                if 'thumbnail_offset' in exif:
+                    # Make the thumbnail position absolute in the file
+                    exif['thumbnail_offset'] += segment_start + 6
+                header['exif'] = exif
+        elif code in _SOF_MARKERS:
+            height, width = struct.unpack('>xHH', _read_exact(f, 5))
+            header['width'], header['height'] = width, height
+        f.seek(segment_start + length - 2)
+    if 'width' not in header:
+        raise HeaderError("JPEG has no frame header")
+    return header
+
+
+def _png_header(f: BinaryIO) -> Dict:
+    f.seek(8)
+    length, chunk = struct.unpack('>I4s', _read_exact(f, 8))
+    if chunk != b'IHDR':
+        raise HeaderError("PNG does not start with IHDR")
+    width, height = struct.unpack('>II', _read_exact(f, 8))
+    return {'format': 'png', 'width': width, 'height': height}
+
+
+def _gif_header(f: BinaryIO) -> Dict:
+    f.seek(6)
+    width, height = struct.unpack('<HH', _read_exact(f, 4))
+    return {'format': 'gif', 'width': width, 'height': height}
+
+
+def _bmp_header(f: BinaryIO) -> Dict:
+    f.seek(18)
+    width, height = struct.unpack('<ii', _read_exact(f, 8))
+    # Negative height marks a top-down bitmap
+    return {'format': 'bmp', 'width': width, 'height': abs(height)}
+
+
+def _webp_header(f: BinaryIO) -> Dict:
+    f.seek(12)
+    chunk = _read_exact(f, 4)
+    f.seek(20)
+    data = _read_exact(f, 10)
+    if chunk == b'VP8 ':
+        width, height = struct.unpack_from('<HH', data, 6)
+        width, height = width & 0x3FFF, height & 0x3FFF
+    elif chunk == b'VP8L':
+        bits = int.from_bytes(data[1:5], 'little')
+        width, height = (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    elif chunk == b'VP8X':
+        width = int.from_bytes(data[4:7], 'little') + 1
+        height = int.from_bytes(data[7:10], 'little') + 1
+    else:
+        raise HeaderError("Unknown WebP chunk")
+    return {'format': 'webp', 'width': width, 'height': height}
+
+
+def _mp4_boxes(f: BinaryIO, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Yield (type, payload_start, payload_end) for the boxes in a byte range."""
+    position = start
+    while position + 8 <= end:
+        f.seek(position)
+        size, box_type = struct.unpack('>I4s', _read_exact(f, 8))
+        header_size = 8
+        if size == 1:
+            (size,) = struct.unpack('>Q', _read_exact(f, 8))
+            header_size = 16
+        elif size == 0:
+            size = end - position
+        if size < header_size:
+            raise HeaderError("Corrupt MP4 box size")
+        yield box_type, position + header_size, min(position + size, end)
+        position += size
+
+
+def _mp4_walk(f: BinaryIO, start: int, end: int, found: Dict, track: Dict) -> None:
+    """Collect mvhd and per-track tkhd/mdhd/stsz fields below a box range."""
+    for box_type, payload, payload_end in _mp4_boxes(f, start, end):
+        if box_type == b'trak':
+            track = {}
+            found.setdefault('tracks', []).append(track)
+        if box_type in _MP4_CONTAINERS:
+            _mp4_walk(f, payload, payload_end, found, track)
+            continue
+        f.seek(payload)
+        if box_type in (b'mvhd', b'mdhd'):
+            version = _read_exact(f, 4)[0]
+            if version == 1:
+                timescale, duration = struct.unpack('>16xIQ', _read_exact(f, 28))
+            else:
+                timescale, duration = struct.unpack('>8xII', _read_exact(f, 16))
+            target = found if box_type == b'mvhd' else track
+            target['timescale'], target['duration'] = timescale, duration
+        elif box_type == b'tkhd':
+            # Width and height are 16.16 fixed point at the end of the box
+            f.seek(payload_end - 8)
+            width, height = struct.unpack('>II', _read_exact(f, 8))
+            track['width'], track['height'] = width >> 16, height >> 16
+        elif box_type == b'stsz':
+            (track['samples'],) = struct.unpack('>8xI', _read_exact(f, 12))
+
+
+def _mp4_header(f: BinaryIO, file_size: int) -> Dict:
+    found: Dict = {}
+    for box_type, payload, payload_end in _mp4_boxes(f, 0, file_size):
+        if box_type == b'moov':
+            _mp4_walk(f, payload, payload_end, found, {})
+            break
+    else:
+        raise HeaderError("MP4 has no moov box")
+
+    header: Dict = {'format': 'mp4'}
+    if found.get('timescale'):
+        header['duration_sec'] = found['duration'] / found['timescale']
+    video = next((t for t in found.get('tracks', []) if t.get('width') and t.get('height')), None)
+    if video is not None:
+        header['width'], header['height'] = video['width'], video['height']
+        if video.get('samples'):
+            header['frame_count'] = video['samples']
+            if video.get('timescale') and video.get('duration'):
+                header['fps'] = video['samples'] / (video['duration'] / video['timescale'])
+    return header
+
+
+def _avi_header(f: BinaryIO) -> Dict:
+    # RIFF 'AVI ' LIST 'hdrl' then the avih chunk
+    f.seek(12)
+    list_id, _, hdrl, avih, avih_size = struct.unpack('<4sI4s4sI', _read_exact(f, 20))
+    if list_id != b'LIST' or hdrl != b'hdrl' or avih != b'avih':
+        raise HeaderError("AVI has no main header")
+    data = _read_exact(f, avih_size)
+    micro_sec_per_frame = struct.unpack_from('<I', data, 0)[0]
+    total_frames = struct.unpack_from('<I', data, 16)[0]
+    width, height = struct.unpack_from('<II', data, 32)
+
+    header: Dict = {'format': 'avi', 'width': width, 'height': height, 'frame_count': total_frames}
+    fps = 1e6 / micro_sec_per_frame if micro_sec_per_frame else 0.0
+    # The stream header's rate/scale is exact where avih is rounded to whole microseconds
+    f.seek(12 + 20 + avih_size + (avih_size & 1))
+    chunk = f.read(12)
+    if chunk[:4] == b'LIST' and chunk[8:12] == b'strl':
+        strh = f.read(8 + 28)
+        if strh[:4] == b'strh' and strh[8:12] == b'vids':
+            scale, rate = struct.unpack_from('<II', strh, 8 + 20)
+            if scale:
+                fps = rate / scale
+    if fps > 0:
+        header['fps'] = fps
+        header['duration_sec'] = total_frames / fps
+    return header
+
+
+def read_media_header(path: str) -> Dict:
+    """
+    Read a media file's metadata from its header, without decoding it.
+
+    Args:
+        path: Path to an image or video file
+
+    Returns:
+        Dictionary with format, width and height; JPEGs add exif (see
+        parse_exif) when an EXIF block is present, and videos add whichever
+        of duration_sec, fps and frame_count the header records
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        HeaderError: If the format is unsupported or the header is corrupt
+    """
+    file_size = Path(path).stat().st_size
+    with open(path, 'rb') as f:
+        magic = f.read(12)
+        try:
+            if magic[:2] == b'\xFF\xD8':
+                return _jpeg_header(f)
+            if magic[:8] == b'\x89PNG\r\n\x1a\n':
+                return _png_header(f)
+            if magic[:6] in (b'GIF87a', b'GIF89a'):
+                return _gif_header(f)
+            if magic[:2] == b'BM':
+                return _bmp_header(f)
+            if magic[:4] == b'RIFF' and magic[8:12] == b'WEBP':
+                return _webp_header(f)
+            if magic[:4] == b'RIFF' and magic[8:12] == b'AVI ':
+                return _avi_header(f)
+            if magic[4:8] in (b'ftyp', b'moov', b'mdat', b'wide', b'free'):
+                return _mp4_header(f, file_size)
+        except struct.error as e:
+            raise HeaderError(f"Corrupt header in {path}: {e}") from e
+    raise HeaderError(f"Unsupported media header: {path}")
+
+
+def read_exif_thumbnail(path: str, header: Optional[Dict] = None) -> Optional[bytes]:
+    """
+    Return the JPEG thumbnail embedded in a JPEG's EXIF block.
+
+    Args:
+        path: Path to a JPEG file
+        header: The file's header as returned by read_media_header, if the
+                caller already has it (default: read it here)
+
+    Returns:
+        The encoded thumbnail, or None if the file has no EXIF thumbnail or
+        is not a readable JPEG
+    """
+    if header is None:
+        try:
+            header = read_media_header(path)
+        except (HeaderError, OSError):
+            return None
+    exif = header.get('exif', {})
+    if 'thumbnail_offset' not in exif:
+        return None
+    with open(path, 'rb') as f:
+        f.seek(exif['thumbnail_offset'])
+        data = f.read(exif['thumbnail_length'])
+    if len(data) != exif['thumbnail_length'] or data[:2] != b'\xFF\xD8':
+        return None
+    return data
@@ -0,0 +1,91 @@
+"""
+Worker process planning.
+
+Helpers shared by the process pools (bulk detection, graph clustering) to
+size the pool for the cores this process may use and to cap each worker's
+intra-op thread pools, so workers do not oversubscribe the CPU. Nothing
+here imports OpenCV or the ML runtimes at module level.
+"""
+
+import os
+from typing import List, Optional
+
+
+# Environment variables read by the math/ML runtimes when they start their
+# thread pools; they must be set before those libraries are imported
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "TF_NUM_INTRAOP_THREADS",
+)
+
+
+def available_cpus() -> List[int]:
+    """
+    Return the CPU ids this process may run on.
+
+    Honors CPU affinity masks (containers, taskset) where the platform
+    exposes them, and falls back to os.cpu_count() elsewhere.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_workers(
+    workers: Optional[int] = None,
+    threads_per_worker: int = 1
+) -> int:
+    """
+    Choose the number of worker processes for the available cores.
+
+    Args:
+        workers: Requested worker count, or None to fill the available cores
+        threads_per_worker: Intra-op threads each worker will use
+
+    Returns:
+        Number of worker processes to start (at least 1)
+    """
+    if workers is not None:
+        return max(1, workers)
+    return max(1, len(available_cpus()) // max(1, threads_per_worker))
+
+
+def limit_threads(threads: int) -> None:
+    """
+    Limit the OpenMP/BLAS thread pools of the current process.
+
+    Meant for pool initializers, so the limit only touches the worker's own
+    environment. Runtimes that start their pools later read the
+    THREAD_ENV_VARS; pools already loaded (NumPy's BLAS, once NumPy is
+    imported) are resized through threadpoolctl when it is installed.
+
+    Args:
+        threads: Number of intra-op threads to allow
+    """
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(threads)
+
+
+def configure_worker_threads(threads: int) -> None:
+    """
+    Limit the intra-op thread pools of OpenCV, TensorFlow and OpenMP/BLAS.
+
+    Must run before TensorFlow is imported for the TensorFlow settings to
+    take effect, which is why workers call it from their initializer.
+
+    Args:
+        threads: Number of intra-op threads to allow
+    """
+    limit_threads(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+
+    import cv2
+    cv2.setNumThreads(threads)
@@ -7,6 +7,7 @@ from unlabeled_media_tagger.config.settings import (
     GoogleDriveConfig,
     ModelConfig,
     PipelineConfig,
+    get_option,
 )
 
 
@@ -35,6 +36,25 @@ def test_model_config():
     assert config.face_recognition_model is None
     assert config.object_detection_model is None
     assert config.detection_threshold == 0.7
+    assert config.detector_backend == "retinaface"
+    assert config.fast_detect_size is None
+    assert config.fast_detect_refine is False
+    assert config.cascade_prefilter_backend is None
+    assert config.cascade_prefilter is False
+    assert config.cascade_prefilter_size == 640
+    assert config.cascade_regions is False
+    assert config.similarity_metric == "cosine"
+    assert config.similarity_threshold == 0.7
+    assert config.similarity_dtype == "float32"
+    assert config.similarity_block_size == 2048
+    assert config.clustering_method == "components"
+    assert config.clustering_workers == 1
+    assert config.clustering_min_samples == 2
+    assert config.ann_nlist is None
+    assert config.ann_nprobe == 8
+    assert config.ann_quantizer is None
+    assert config.ann_pq_subspaces is None
+    assert config.ann_rerank == 0
     assert config.device == "cpu"
 
 
@@ -44,4 +64,23 @@ def test_pipeline_config():
     assert config.batch_size == 10
     assert config.frame_interval == 1.0
     assert config.max_frames == 100
+    assert config.sampling_strategy == "auto"
+    assert config.detect_workers == 1
+    assert config.queue_size == 4
+    assert config.dedup_threshold is None
+    assert config.dedup_max_reuse is None
+    assert config.track_faces is False
+    assert config.output_mode == "frames"
+    assert config.jpeg_quality == 95
+    assert config.png_compression == 3
+    assert config.writer_threads == 2
+    assert config.frame_memory_budget_mb == 256
     assert config.output_dir == "./output"
+
+
+def test_get_option_from_dict_and_object():
+    """Test get_option reads dictionaries and config objects alike."""
+    assert get_option({"batch_size": 4}, "batch_size", 10) == 4
+    assert get_option({}, "batch_size", 10) == 10
+    assert get_option(PipelineConfig(), "batch_size", 1) == 10
+    assert get_option(ModelConfig(), "face_detection_model", "x") == "x"
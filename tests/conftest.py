@@ -0,0 +1,47 @@
+"""
+Shared test fixtures.
+"""
+
+import importlib
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from tests.helpers import FakeDetector
+
+
+@pytest.fixture
+def fake_deepface(monkeypatch):
+    """
+    Install a fake deepface module and a fresh detector pool.
+
+    Returns the dict of detectors by backend; put a FakeDetector in it
+    before a backend is first used to control its behavior, otherwise a
+    default FakeDetector is built.
+    """
+    detectors = {}
+
+    def build_model(model_name, task=None):
+        assert task == "face_detector"
+        return detectors.setdefault(model_name, FakeDetector())
+
+    deepface = types.ModuleType("deepface")
+    deepface.DeepFace = types.SimpleNamespace(build_model=build_model)
+    monkeypatch.setitem(sys.modules, "deepface", deepface)
+
+    detect_faces = importlib.import_module("unlabeled_media_tagger.pipeline.detect_faces")
+    monkeypatch.setattr(detect_faces, "DeepFace", deepface.DeepFace)
+    monkeypatch.setattr(detect_faces, "_default_pool", detect_faces.DetectorPool())
+    return detectors
+
+
+@pytest.fixture
+def clustered_vectors():
+    """3000 clustered 32-d vectors and 40 queries near them, for index tests."""
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(60, 32))
+    vectors = centers[rng.integers(0, 60, 3000)] + 0.2 * rng.normal(size=(3000, 32))
+    queries = centers[rng.integers(0, 60, 40)] + 0.2 * rng.normal(size=(40, 32))
+    return vectors.astype(np.float32), queries.astype(np.float32)
@@ -0,0 +1,109 @@
+"""
+Helpers shared by the test modules.
+"""
+
+import struct
+
+import cv2
+import numpy as np
+
+
+class FakeFace:
+    """Stand-in for DeepFace's FacialAreaRegion."""
+
+    def __init__(self, x, y, w, h, confidence=0.9):
+        self.x, self.y, self.w, self.h = x, y, w, h
+        self.confidence = confidence
+
+
+class FakeDetector:
+    """
+    Stand-in for a DeepFace detector: every bright blob is a face.
+
+    Test images are black with white rectangles where the faces are, so
+    detections follow downscaling and cropping the way a real detector's
+    would. Every input shape is recorded in calls.
+    """
+
+    def __init__(self, batch=False, batch_error=None, min_side=4):
+        """
+        Args:
+            batch: Accept a list of images in one detect_faces() call
+            batch_error: Exception raised for list input (default TypeError
+                         when batch is False)
+            min_side: Blobs smaller than this are missed, like tiny faces
+        """
+        self.batch = batch
+        self.batch_error = batch_error
+        self.min_side = min_side
+        self.calls = []
+
+    def _faces(self, image):
+        gray = image if image.ndim == 2 else image.max(axis=2)
+        count, _, stats, _ = cv2.connectedComponentsWithStats((gray > 127).astype(np.uint8))
+        return [
+            FakeFace(int(x), int(y), int(w), int(h))
+            for x, y, w, h, _ in stats[1:count]
+            if min(w, h) >= self.min_side
+        ]
+
+    def detect_faces(self, img):
+        if isinstance(img, list):
+            if self.batch_error is not None:
+                raise self.batch_error
+            if not self.batch:
+                raise TypeError("detect_faces() expects a single image")
+            self.calls.append([image.shape for image in img])
+            return [self._faces(image) for image in img]
+        self.calls.append(img.shape)
+        return self._faces(img)
+
+
+def detection(x, y, w=40, h=40, confidence=0.9):
+    """A detection dict as the pipeline passes them around."""
+    return {"bbox": {"x": x, "y": y, "w": w, "h": h}, "confidence": confidence}
+
+
+def face_image(boxes, size=(200, 300)):
+    """Black BGR image with a white rectangle at each (x, y, w, h) box."""
+    image = np.zeros(size + (3,), dtype=np.uint8)
+    for x, y, w, h in boxes:
+        image[y:y + h, x:x + w] = 255
+    return image
+
+
+def write_video(path, frames, fps=10):
+    """Write BGR frames to an MJPG .avi file and return its path as a string."""
+    height, width = frames[0].shape[:2]
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+    return str(path)
+
+
+def exif_segment(thumbnail: bytes, orientation: int = 1) -> bytes:
+    """Build a little-endian APP1 EXIF segment with IFD0 and a thumbnail IFD1."""
+    make = b"TestCam\0"
+    # Layout: header(8) | IFD0 (2 entries) | IFD1 (2 entries) | make | thumbnail
+    ifd0 = 8
+    ifd1 = ifd0 + 2 + 2 * 12 + 4
+    make_at = ifd1 + 2 + 2 * 12 + 4
+    thumb_at = make_at + len(make)
+    tiff = b"II" + struct.pack("<HI", 42, ifd0)
+    tiff += struct.pack("<H", 2)
+    tiff += struct.pack("<HHII", 0x010F, 2, len(make), make_at)
+    tiff += struct.pack("<HHIHH", 0x0112, 3, 1, orientation, 0)
+    tiff += struct.pack("<I", ifd1)
+    tiff += struct.pack("<H", 2)
+    tiff += struct.pack("<HHII", 0x0201, 4, 1, thumb_at)
+    tiff += struct.pack("<HHII", 0x0202, 4, 1, len(thumbnail))
+    tiff += struct.pack("<I", 0)
+    tiff += make + thumbnail
+    payload = b"Exif\0\0" + tiff
+    return b"\xFF\xE1" + struct.pack(">H", len(payload) + 2) + payload
+
+
+def recall(ids, exact):
+    """Mean fraction of each query's exact neighbors found in its ids."""
+    return np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(ids, exact)])
@@ -0,0 +1,90 @@
+"""
+Tests for the IVF approximate nearest-neighbor index.
+"""
+
+import numpy as np
+import pytest
+
+from unlabeled_media_tagger.pipeline.ann_index import IVFIndex, kmeans
+from unlabeled_media_tagger.pipeline.similarity import SimilarityEngine
+
+from tests.helpers import recall
+
+
+def test_kmeans_finds_separated_clusters():
+    """Test that k-means puts one centroid on each well-separated blob."""
+    rng = np.random.default_rng(1)
+    blobs = np.vstack([c + 0.01 * rng.normal(size=(50, 2)) for c in ([0, 10], [10, 0], [-10, 0])])
+    centroids = kmeans(blobs, 3, metric="l2")
+    assert sorted(np.round(centroids).tolist()) == [[-10, 0], [0, 10], [10, 0]]
+
+
+@pytest.mark.parametrize("metric", ["cosine", "l2"])
+def test_search_recall(clustered_vectors, metric):
+    """Test that probing all cells is exact and a few cells give high recall."""
+    vectors, queries = clustered_vectors
+    index = IVFIndex(32, nlist=16, metric=metric)
+    index.add(vectors)
+    exact = [ids for ids, _ in SimilarityEngine(metric).search(queries, vectors, k=10)]
+    assert recall(index.search(queries, 10, nprobe=16)[0], exact) == 1.0
+    assert recall(index.search(queries, 10, nprobe=4)[0], exact) > 0.9
+
+
+def test_remove_and_pad(clustered_vectors):
+    """Test that removed ids are never returned and short results are padded."""
+    vectors, queries = clustered_vectors
+    index = IVFIndex(32, nlist=4)
+    ids = index.add(vectors[:10])
+    assert index.remove(ids[:7]) == 7
+    assert len(index) == 3
+    found, scores = index.search(queries[:2], k=5, nprobe=4)
+    assert set(found[found >= 0].tolist()) <= set(ids[7:].tolist())
+    assert (found[:, 3:] == -1).all() and np.isnan(scores[:, 3:]).all()
+
+
+def test_duplicate_ids_rejected(clustered_vectors):
+    """Test that inserting an existing id raises ValueError."""
+    vectors, _ = clustered_vectors
+    index = IVFIndex(32)
+    index.add(vectors[:2], ids=[5, 6])
+    with pytest.raises(ValueError):
+        index.add(vectors[2:3], ids=[6])
+
+
+def test_automatic_nlist_grows(clustered_vectors):
+    """Test that an automatic index retrains into more cells as it grows."""
+    vectors, _ = clustered_vectors
+    index = IVFIndex(32)
+    for start in range(0, len(vectors), 100):
+        index.add(vectors[start:start + 100])
+    assert len(index) == len(vectors)
+    assert index.nlist > 10
+
+
+def test_fixed_nlist_survives_small_first_batch(tmp_path, clustered_vectors):
+    """Test that a fixed nlist is reached once enough vectors follow a small first batch."""
+    vectors, queries = clustered_vectors
+    index = IVFIndex(32, nlist=64)
+    index.add(vectors[:3])
+    assert index.nlist == 3
+    index.save(str(tmp_path / "index.npz"))
+    loaded = IVFIndex.load(str(tmp_path / "index.npz"))
+
+    for grown in (index, loaded):
+        grown.add(vectors[3:])
+        assert grown.nlist == grown.requested_nlist == 64
+    exact = [ids for ids, _ in SimilarityEngine().search(queries, vectors, k=10)]
+    assert recall(index.search(queries, 10, nprobe=64)[0], exact) == 1.0
+
+
+def test_save_and_load(tmp_path, clustered_vectors):
+    """Test that a loaded index returns the same results."""
+    vectors, queries = clustered_vectors
+    index = IVFIndex(32, nlist=8, nprobe=2)
+    index.add(vectors)
+    index.remove(range(100))
+    index.save(str(tmp_path / "index.npz"))
+    loaded = IVFIndex.load(str(tmp_path / "index.npz"))
+    assert len(loaded) == len(index)
+    assert np.array_equal(loaded.search(queries, 5)[0], index.search(queries, 5)[0])
+    assert loaded.add(vectors[:1])[0] == len(vectors)
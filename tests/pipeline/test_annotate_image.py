@@ -0,0 +1,56 @@
+"""
+Tests for image annotation.
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from unlabeled_media_tagger.utils.image_writer import AsyncImageWriter
+
+from tests.helpers import face_image
+
+
+DETECTIONS = [{"bbox": {"x": 40, "y": 60, "w": 50, "h": 50}, "confidence": 0.87}]
+
+
+def test_draw_detections_sizes_label_to_text(fake_deepface):
+    """Test that the label background fits labels of any length."""
+    from unlabeled_media_tagger.pipeline.annotate_image import draw_detections
+
+    for confidence in (0.87, 100.0):
+        image = np.zeros((200, 300, 3), dtype=np.uint8)
+        draw_detections(image, [{**DETECTIONS[0], "confidence": confidence}])
+        width = cv2.getTextSize(f"{confidence:.2f}", cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0][0]
+        # Below the text baseline the green label background spans the text width
+        label_row = image[53, 40:40 + width + 2, 1]
+        assert (label_row[:width] > 0).all() and label_row[width + 1] == 0
+
+
+def test_annotate_batch_draws_in_place_and_writes(fake_deepface, tmp_path):
+    """Test that a batch is drawn on the given arrays and written in the background."""
+    from unlabeled_media_tagger.pipeline.annotate_image import annotate_batch
+
+    images = [face_image([]) for _ in range(3)]
+    paths = [str(tmp_path / f"{i}.png") for i in range(3)]
+    with AsyncImageWriter(png_compression=0) as writer:
+        annotate_batch(images, [DETECTIONS, [], DETECTIONS], paths, writer)
+    assert writer.written == 3
+    assert images[0].any() and not images[1].any()
+    assert np.array_equal(cv2.imread(paths[2]), images[2])
+
+    with pytest.raises(ValueError):
+        annotate_batch(images, [DETECTIONS], paths, writer)
+
+
+def test_annotate_image_applies_png_compression(fake_deepface, tmp_path):
+    """Test that synchronous saves use the configured PNG compression."""
+    from unlabeled_media_tagger.pipeline.annotate_image import annotate_image
+
+    image = np.random.default_rng(0).integers(0, 255, (120, 160, 3), dtype=np.uint8)
+    sizes = {}
+    for level in (0, 9):
+        path = tmp_path / f"level{level}.png"
+        annotate_image(image.copy(), DETECTIONS, str(path), png_compression=level)
+        sizes[level] = path.stat().st_size
+    assert sizes[9] < sizes[0]
@@ -0,0 +1,153 @@
+"""
+Tests for video annotation.
+"""
+
+import json
+
+import pytest
+
+from unlabeled_media_tagger.utils.detection_cache import DetectionCache
+
+from tests.helpers import FakeDetector, face_image, write_video
+
+
+def test_video_cache_key_includes_sampling_strategy(fake_deepface, tmp_path):
+    """Test that seek and grab sampling never share cached detections."""
+    from unlabeled_media_tagger.pipeline.annotate_video import _video_cache_key
+
+    video = tmp_path / "clip.avi"
+    video.write_bytes(b"not really a video")
+    cache = DetectionCache(str(tmp_path / "cache.db"))
+    keys = {
+        strategy: _video_cache_key(cache, str(video), "retinaface", 1.0, sampling_strategy=strategy)
+        for strategy in ("auto", "grab", "seek")
+    }
+    assert len(set(keys.values())) == 3
+    assert keys["seek"] == _video_cache_key(cache, str(video), "retinaface", 1.0, sampling_strategy="seek")
+
+
+def test_dedup_max_reuse_forces_detection(fake_deepface, tmp_path):
+    """Test that dedup_max_reuse bounds how many frames in a row reuse detections."""
+    from unlabeled_media_tagger.pipeline.annotate_video import detect_faces_in_video
+
+    video = write_video(tmp_path / "static.avi", [face_image([(40, 40, 60, 60)])] * 30)
+    records = detect_faces_in_video(
+        video, frame_interval_sec=0.5, max_frames=None, dedup_threshold=2.0, dedup_max_reuse=2
+    )
+    assert [record["reused"] for record in records] == [False, True, True] * 2
+    assert all(len(record["detections"]) == 1 for record in records)
+
+
+def test_annotate_video_tracks_faces_into_timeline(fake_deepface, tmp_path):
+    """Test that track_faces links a moving face into one track in the timeline."""
+    from unlabeled_media_tagger.pipeline.annotate_video import annotate_video
+
+    frames = [face_image([(20 + 4 * i, 40, 50, 50), (220, 120, 40, 40)]) for i in range(20)]
+    video = write_video(tmp_path / "moving.avi", frames)
+    output = annotate_video(
+        video, frame_interval_sec=0.5, output_mode="timeline",
+        output_path=str(tmp_path / "timeline.ndjson"), track_faces=True
+    )
+    lines = [json.loads(line) for line in open(output, encoding="utf-8")]
+    assert len(lines) == 4
+    assert [sorted(d["track_id"] for d in line["detections"]) for line in lines] == [[0, 1]] * 4
+    moving = [next(d for d in line["detections"] if d["track_id"] == 0) for line in lines]
+    assert [d["bbox"]["x"] for d in moving] == [20, 40, 60, 80]
+
+
+def test_cli_defaults_come_from_pipeline_config(fake_deepface, tmp_path, monkeypatch):
+    """Test that the CLI passes PipelineConfig's frame budget unless told otherwise."""
+    from unlabeled_media_tagger.config.settings import PipelineConfig
+    from unlabeled_media_tagger.pipeline import annotate_video as module
+
+    video = write_video(tmp_path / "clip.avi", [face_image([])] * 5)
+    calls = []
+    monkeypatch.setattr(module, "annotate_video", lambda *args, **kwargs: calls.append(kwargs))
+    for argv, expected in ((["-m", "video"], PipelineConfig().max_frames), (["--max-frames", "0"], None)):
+        monkeypatch.setattr("sys.argv", ["annotate_video", video] + argv)
+        module.main()
+        assert calls[-1]["max_frames"] == expected
+    assert calls[0]["output_mode"] == "video"
+
+
+class _PreemptedDetector(FakeDetector):
+    """FakeDetector that fails once it has seen fail_after images."""
+
+    def __init__(self, fail_after):
+        super().__init__()
+        self.fail_after = fail_after
+
+    def detect_faces(self, img):
+        if not isinstance(img, list) and self.fail_after is not None and len(self.calls) >= self.fail_after:
+            raise RuntimeError("preempted")
+        return super().detect_faces(img)
+
+
+def test_annotate_video_resumes_from_checkpoint(fake_deepface, tmp_path):
+    """Test that an interrupted run resumes after its last journaled frame."""
+    from unlabeled_media_tagger.pipeline.annotate_video import annotate_video
+    from unlabeled_media_tagger.pipeline.checkpoint import VideoCheckpoint
+
+    detector = fake_deepface["retinaface"] = _PreemptedDetector(fail_after=6)
+    video = write_video(tmp_path / "clip.avi", [face_image([(10 * (i % 8), 40, 50, 50)]) for i in range(40)])
+    checkpoint_path = str(tmp_path / "clip.ckpt")
+    timeline = str(tmp_path / "clip.ndjson")
+    options = dict(frame_interval_sec=0.5, batch_size=1, output_mode="timeline",
+                   output_path=timeline, checkpoint_path=checkpoint_path, sampling_strategy="grab")
+
+    with pytest.raises(ValueError, match="preempted"):
+        annotate_video(video, **options)
+    params = json.loads(open(checkpoint_path, encoding="utf-8").readline())["params"]
+    assert (params["sampling_strategy"], params["output_mode"]) == ("grab", "timeline")
+    resumed = VideoCheckpoint(checkpoint_path, video, params).load()
+    assert 1 <= len(resumed) <= 5
+
+    # Another strategy or output mode must not reuse the journal
+    other = dict(params, sampling_strategy="seek")
+    assert VideoCheckpoint(checkpoint_path, video, other).load() == []
+
+    detector.fail_after = None
+    calls_before = len(detector.calls)
+    annotate_video(video, **options)
+    lines = [json.loads(line) for line in open(timeline, encoding="utf-8")]
+    assert [line["frame"] for line in lines] == list(range(0, 40, 5))
+    assert [line["detections"][0]["bbox"]["x"] for line in lines] == [10 * (i % 8) for i in range(0, 40, 5)]
+    # Only the frames after the checkpoint went through the detector
+    assert len(detector.calls) - calls_before == 8 - len(resumed)
+    assert not (tmp_path / "clip.ckpt").exists()
+
+
+def test_journaled_frames_have_their_files(fake_deepface, tmp_path, monkeypatch):
+    """Test that a frame is only journaled once its image file has been written."""
+    from unlabeled_media_tagger.pipeline.annotate_video import annotate_video
+    from unlabeled_media_tagger.pipeline.checkpoint import VideoCheckpoint
+    from unlabeled_media_tagger.utils import image_writer
+
+    # The image writer dies after 12 files, with more frames still queued
+    opened = []
+
+    def dying_open(path, mode="r", *args, **kwargs):
+        opened.append(path)
+        if len(opened) > 12:
+            raise OSError("writer killed")
+        return open(path, mode, *args, **kwargs)
+
+    monkeypatch.setattr(image_writer, "open", dying_open, raising=False)
+    video = write_video(tmp_path / "clip.avi", [face_image([(40, 40, 50, 50)])] * 40)
+    checkpoint_path = str(tmp_path / "clip.ckpt")
+    frames_dir = tmp_path / "frames"
+    options = dict(frame_interval_sec=0.1, batch_size=1, output_path=str(frames_dir),
+                   checkpoint_path=checkpoint_path, sampling_strategy="grab")
+    with pytest.raises(OSError, match="writer killed"):
+        annotate_video(video, **options)
+
+    params = json.loads(open(checkpoint_path, encoding="utf-8").readline())["params"]
+    journaled = VideoCheckpoint(checkpoint_path, video, params).load()
+    assert journaled
+    for record in journaled:
+        assert (frames_dir / f"frame_{record['frame']:04d}_t{record['timestamp']:.1f}s.jpg").exists()
+
+    # Resuming fills in every frame the dead writer lost
+    monkeypatch.delattr(image_writer, "open")
+    annotate_video(video, **options)
+    assert len(list(frames_dir.glob("*.jpg"))) == 40
@@ -0,0 +1,54 @@
+"""
+Tests for bulk face detection helpers.
+"""
+
+import pytest
+from unlabeled_media_tagger.pipeline.bulk_detect import collect_inputs
+
+
+def test_collect_inputs(tmp_path):
+    """Test expansion of directories and file lists into media paths."""
+    media_dir = tmp_path / "media"
+    media_dir.mkdir()
+    (media_dir / "a.jpg").write_bytes(b"")
+    (media_dir / "b.txt").write_text("not media")
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"")
+    file_list = tmp_path / "list.txt"
+    file_list.write_text(f"{video}\n\n{tmp_path / 'notes.doc'}\n")
+    
+    assert collect_inputs([str(media_dir), str(file_list)]) == [
+        str(media_dir / "a.jpg"),
+        str(video),
+    ]
+
+
+def test_collect_inputs_missing(tmp_path):
+    """Test that a missing input raises FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        collect_inputs([str(tmp_path / "missing.jpg")])
+
+
+def test_process_task_tracks_videos(fake_deepface, tmp_path, monkeypatch):
+    """Test that a worker with track_faces returns per-track timelines for a video."""
+    from unlabeled_media_tagger.pipeline import bulk_detect
+
+    from tests.helpers import face_image, write_video
+
+    video = write_video(tmp_path / "clip.avi", [face_image([(40 + 2 * i, 40, 60, 60)]) for i in range(30)])
+    monkeypatch.setattr(bulk_detect, "_worker_state", {
+        "detector_backend": "retinaface",
+        "frame_interval_sec": 1.0,
+        "batch_size": 10,
+        "cache": None,
+        "detect_size": None,
+        "prefilter_backend": None,
+        "max_frames": None,
+        "track_faces": True,
+    })
+    record = bulk_detect._process_task({"path": video})
+    assert "error" not in record
+    assert record["media_type"] == "video"
+    assert record["frames_sampled"] == len(record["results"].to_frames())
+    assert 1 <= record["detector_calls"] <= record["frames_sampled"]
+    assert [track["track_id"] for track in record["tracks"]] == [0]
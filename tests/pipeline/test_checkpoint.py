@@ -0,0 +1,94 @@
+"""
+Tests for resumable video processing checkpoints.
+"""
+
+import pytest
+
+from unlabeled_media_tagger.pipeline.checkpoint import VideoCheckpoint
+
+
+def _record(i):
+    return {'frame': i * 10, 'timestamp': float(i), 'detections': [], 'reused': False}
+
+
+def test_checkpoint_round_trip(tmp_path):
+    """Test that journaled records are loaded by a later run."""
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"video")
+    path = str(tmp_path / "clip.ckpt")
+
+    checkpoint = VideoCheckpoint(path, str(video), {'backend': 'opencv'}, sync_every=2)
+    assert checkpoint.load() == []
+    checkpoint.start(sample_interval_sec=1.5)
+    for i in range(3):
+        checkpoint.append(_record(i))
+    checkpoint.close()
+
+    resumed = VideoCheckpoint(path, str(video), {'backend': 'opencv'})
+    assert resumed.load() == [_record(i) for i in range(3)]
+    assert resumed.last_timestamp == 2.0
+    assert resumed.sample_interval_sec == 1.5
+
+
+def test_checkpoint_ignores_torn_line_and_replayed_records(tmp_path):
+    """Test that a partial last line is dropped and old records are not re-journaled."""
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"video")
+    path = tmp_path / "clip.ckpt"
+
+    checkpoint = VideoCheckpoint(str(path), str(video))
+    checkpoint.start(1.0)
+    checkpoint.append(_record(0))
+    checkpoint.append(_record(1))
+    checkpoint.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"frame": 20, "timest')
+
+    resumed = VideoCheckpoint(str(path), str(video))
+    assert len(resumed.load()) == 2
+    resumed.start(1.0)
+    resumed.append(_record(1))
+    resumed.append(_record(2))
+    resumed.close()
+
+    assert [r['frame'] for r in VideoCheckpoint(str(path), str(video)).load()] == [0, 10, 20]
+
+
+def test_checkpoint_for_other_settings_is_ignored(tmp_path):
+    """Test that a checkpoint from a different run configuration is not resumed."""
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"video")
+    path = str(tmp_path / "clip.ckpt")
+
+    checkpoint = VideoCheckpoint(path, str(video), {'backend': 'opencv'})
+    checkpoint.start(1.0)
+    checkpoint.append(_record(0))
+    checkpoint.close()
+
+    assert VideoCheckpoint(path, str(video), {'backend': 'retinaface'}).load() == []
+    checkpoint.remove()
+    assert not (tmp_path / "clip.ckpt").exists()
+
+
+def test_records_are_written_after_before_sync(tmp_path):
+    """Test that records reach the journal only once before_sync has succeeded."""
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"video")
+    path = str(tmp_path / "clip.ckpt")
+    flushed = []
+
+    def before_sync():
+        if len(flushed) == 1:
+            raise OSError("output lost")
+        flushed.append(VideoCheckpoint(path, str(video)).load())
+
+    checkpoint = VideoCheckpoint(path, str(video), sync_every=2)
+    checkpoint.start(1.0, before_sync=before_sync)
+    for i in range(3):
+        checkpoint.append(_record(i))
+    with pytest.raises(OSError, match="output lost"):
+        checkpoint.close()
+
+    # Nothing was journaled before the first flush, and the failed one kept record 2 out
+    assert flushed == [[]]
+    assert VideoCheckpoint(path, str(video)).load() == [_record(0), _record(1)]
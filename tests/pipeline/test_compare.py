@@ -1,11 +1,17 @@
 """
-Placeholder tests for compare stage.
-
-TODO: Add tests when compare stage is implemented.
+Tests for the compare stage.
 """
 
+import numpy as np
 import pytest
 from unlabeled_media_tagger.pipeline.compare import CompareStage
+from unlabeled_media_tagger.pipeline.embedding_store import EmbeddingStore
+
+
+def _identities(rng, people=3, faces_each=4, dim=64, noise=0.05):
+    """Embeddings of several people, each a noisy copy of one base vector."""
+    bases = rng.normal(size=(people, dim))
+    return np.vstack([base + noise * rng.normal(size=(faces_each, dim)) for base in bases])
 
 
 def test_compare_stage_initialization():
@@ -15,15 +21,110 @@ def test_compare_stage_initialization():
     assert isinstance(stage.config, dict)
 
 
-def test_compare_faces_not_implemented():
-    """Test that compare_faces method raises NotImplementedError."""
+def test_compare_faces_clusters_identities():
+    """Test that faces of the same person share a cluster."""
+    rng = np.random.default_rng(0)
+    embeddings = _identities(rng)
+    # A fourth person with a single face
+    embeddings = np.vstack([embeddings, rng.normal(size=(1, 64))])
+    clusters = CompareStage({"similarity_block_size": 5}).compare_faces(embeddings)
+    assert [len(faces) for faces in clusters.values()] == [4, 4, 4, 1]
+    assert all(np.array_equal(face, embeddings[12]) for face in clusters[3])
+
+
+def test_compare_faces_accepts_represent_dicts():
+    """Test that DeepFace.represent-style dicts are clustered and returned as-is."""
+    rng = np.random.default_rng(1)
+    faces = [{"embedding": list(vector), "source": i} for i, vector in enumerate(_identities(rng, 2, 2))]
+    clusters = CompareStage().compare_faces(faces)
+    assert sorted(sorted(face["source"] for face in cluster) for cluster in clusters.values()) == [[0, 1], [2, 3]]
+
+
+def test_compare_faces_empty():
+    """Test that no faces yields no clusters."""
+    assert CompareStage().compare_faces([]) == {}
+
+
+def test_assign_faces_incrementally():
+    """Test that faces from later files join clusters from earlier files."""
+    rng = np.random.default_rng(4)
+    bases = rng.normal(size=(2, 64))
     stage = CompareStage()
-    with pytest.raises(NotImplementedError):
-        stage.compare_faces([])
+    first = stage.assign_faces(bases[[0, 1]] + 0.05 * rng.normal(size=(2, 64)))
+    second = stage.assign_faces(bases[[1, 1, 0]] + 0.05 * rng.normal(size=(3, 64)))
+    assert second == [first[1], first[1], first[0]]
 
 
-def test_build_face_database_not_implemented():
-    """Test that build_face_database method raises NotImplementedError."""
+def test_compact_clusters_requires_assignment():
+    """Test that compaction needs previously assigned faces."""
+    with pytest.raises(ValueError):
+        CompareStage().compact_clusters([])
+
+
+def test_build_face_database_matches_known_people(tmp_path):
+    """Test that clusters of known people join them and new people are added."""
+    rng = np.random.default_rng(2)
+    bases = rng.normal(size=(3, 64))
     stage = CompareStage()
-    with pytest.raises(NotImplementedError):
-        stage.build_face_database({})
+    first = stage.build_face_database({0: list(bases[0] + 0.05 * rng.normal(size=(3, 64))),
+                                       1: list(bases[1] + 0.05 * rng.normal(size=(2, 64)))})
+    assert first == {0: 0, 1: 1}
+
+    second = stage.build_face_database({0: list(bases[2] + 0.05 * rng.normal(size=(2, 64))),
+                                        1: list(bases[0] + 0.05 * rng.normal(size=(2, 64)))})
+    assert second == {0: 2, 1: 0}
+    assert stage.people == {0: 5, 1: 2, 2: 2}
+
+    person, score = stage.lookup_face(bases[1])
+    assert person == 1 and score > 0.9
+    assert stage.lookup_face(rng.normal(size=64)) == (None, None)
+
+    stage.save_face_database(tmp_path / "db")
+    loaded = CompareStage()
+    loaded.load_face_database(tmp_path / "db")
+    assert loaded.people == stage.people
+    assert loaded.lookup_face(bases[2])[0] == 2
+
+
+def test_remove_faces():
+    """Test that removing all of a person's faces drops the person."""
+    rng = np.random.default_rng(3)
+    stage = CompareStage()
+    stage.build_face_database({0: list(rng.normal(size=(1, 16))), 1: list(rng.normal(size=(1, 16)))})
+    assert stage.remove_faces([0]) == 1
+    assert stage.people == {1: 1}
+
+
+def test_compare_faces_from_embedding_store(tmp_path):
+    """Test that clustering a store returns the face ids of its live rows."""
+    rng = np.random.default_rng(4)
+    store = EmbeddingStore(str(tmp_path / "store"), dim=64)
+    store.append(_identities(rng, people=2, faces_each=3))
+    store.delete([1])
+    clusters = CompareStage().compare_faces(store)
+    assert clusters == {0: [3, 4, 5], 1: [0, 2]}
+
+
+def test_quantized_face_database():
+    """Test that a database stored as int8 codes still identifies people."""
+    rng = np.random.default_rng(5)
+    bases = rng.normal(size=(40, 64))
+    stage = CompareStage({"ann_quantizer": "sq8"})
+    clusters = {i: list(base + 0.05 * rng.normal(size=(30, 64))) for i, base in enumerate(bases)}
+    assert stage.build_face_database(clusters) == {i: i for i in range(40)}
+    assert stage.face_index.is_quantized
+    assert [person for person, _ in stage.lookup_faces(bases[:5])] == [0, 1, 2, 3, 4]
+
+
+def test_compare_faces_parallel_dbscan():
+    """Test pool-built clustering with DBSCAN noise faces kept as singletons."""
+    rng = np.random.default_rng(6)
+    embeddings = np.vstack([_identities(rng, people=2, faces_each=5), rng.normal(size=(1, 64))])
+    stage = CompareStage({
+        "clustering_method": "dbscan",
+        "clustering_workers": 2,
+        "clustering_min_samples": 3,
+        "similarity_block_size": 4,
+    })
+    clusters = stage.compare_faces(embeddings)
+    assert [len(faces) for faces in clusters.values()] == [5, 5, 1]
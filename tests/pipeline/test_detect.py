@@ -1,12 +1,14 @@
 """
-Placeholder tests for detect stage.
-
-TODO: Add tests when detect stage is implemented.
+Tests for the detect stage and face detection.
 """
 
+import threading
+
 import pytest
 from unlabeled_media_tagger.pipeline.detect import DetectStage
 
+from tests.helpers import FakeDetector, face_image
+
 
 def test_detect_stage_initialization():
     """Test that DetectStage can be initialized."""
@@ -15,10 +17,17 @@ def test_detect_stage_initialization():
     assert isinstance(stage.config, dict)
 
 
-def test_detect_faces_not_implemented():
-    """Test that detect_faces method raises NotImplementedError."""
+def test_detect_stage_backend_from_config():
+    """Test that DetectStage reads the detector backend from its config."""
+    assert DetectStage().detector_backend == "retinaface"
+    assert DetectStage({"detector_backend": "opencv"}).detector_backend == "opencv"
+    assert DetectStage().cascade_stats is None
+
+
+def test_detect_faces_missing_image(fake_deepface):
+    """Test that detect_faces raises FileNotFoundError for a missing image."""
     stage = DetectStage()
-    with pytest.raises(NotImplementedError):
+    with pytest.raises(FileNotFoundError):
         stage.detect_faces("test_image.jpg")
 
 
@@ -27,3 +36,197 @@ def test_detect_objects_not_implemented():
     stage = DetectStage()
     with pytest.raises(NotImplementedError):
         stage.detect_objects("test_image.jpg")
+
+
+def test_detector_pool_builds_each_backend_once(fake_deepface):
+    """Test that concurrent callers share one warm detector per backend."""
+    from unlabeled_media_tagger.pipeline.detect_faces import get_detector, get_detector_pool
+
+    handles = []
+    threads = [threading.Thread(target=lambda: handles.append(get_detector("retinaface"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(handle) for handle in handles}) == 1
+    # Only the warm-up inference has run
+    assert fake_deepface["retinaface"].calls == [(224, 224, 3)]
+    assert get_detector("opencv") is not handles[0]
+    assert sorted(get_detector_pool().loaded_backends()) == ["opencv", "retinaface"]
+
+
+def test_detect_faces_in_image_array_and_no_face(fake_deepface):
+    """Test detection on a decoded frame, and an empty list when no face is found."""
+    from unlabeled_media_tagger.pipeline.detect_faces import detect_faces_in_image
+
+    faces = detect_faces_in_image(face_image([(40, 20, 30, 50)]))
+    assert faces == [{"bbox": {"x": 40, "y": 20, "w": 30, "h": 50}, "confidence": 0.9}]
+    # No whole-image placeholder face, unlike DeepFace.extract_faces
+    assert detect_faces_in_image(face_image([])) == []
+
+
+def test_detector_call_count_is_thread_safe(fake_deepface):
+    """Test that calls from many threads are all counted."""
+    from unlabeled_media_tagger.pipeline.detect_faces import get_detector
+
+    handle = get_detector("retinaface")
+    image = face_image([(0, 0, 10, 10)], size=(20, 20))
+    threads = [
+        threading.Thread(target=lambda: [handle.detect(image) for _ in range(50)])
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert handle.calls == 400
+
+
+def test_detect_batch_uses_one_call_when_supported(fake_deepface):
+    """Test that a batch-aware backend gets the whole batch in one call."""
+    from unlabeled_media_tagger.pipeline.detect_faces import detect_faces_batch, get_detector
+
+    fake_deepface["retinaface"] = FakeDetector(batch=True)
+    images = [face_image([(10 * i, 10, 20, 20)]) for i in range(5)]
+    results = detect_faces_batch(images, batch_size=3)
+    assert [faces[0]["bbox"]["x"] for faces in results] == [0, 10, 20, 30, 40]
+    assert fake_deepface["retinaface"].calls[1:] == [[(200, 300, 3)] * 3, [(200, 300, 3)] * 2]
+    assert get_detector("retinaface").supports_batch is True
+
+
+def test_detect_batch_falls_back_when_unsupported(fake_deepface):
+    """Test that a backend refusing list input is looped over, and not asked again."""
+    from unlabeled_media_tagger.pipeline.detect_faces import detect_faces_batch, get_detector
+
+    images = [face_image([(10, 10, 20, 20)]) for _ in range(4)]
+    results = detect_faces_batch(images, batch_size=2)
+    assert all(len(faces) == 1 for faces in results)
+    assert get_detector("retinaface").supports_batch is False
+    # The rejected list call is never retried: warm-up, then one call per image
+    assert fake_deepface["retinaface"].calls == [(224, 224, 3)] + [(200, 300, 3)] * 4
+
+
+def test_detect_batch_falls_back_when_list_input_breaks_detector(fake_deepface):
+    """Test that any error on the first list call counts as no batch support."""
+    from unlabeled_media_tagger.pipeline.detect_faces import detect_faces_batch, get_detector
+
+    # Single-image detectors typically read img.shape before anything else
+    error = AttributeError("'list' object has no attribute 'shape'")
+    fake_deepface["opencv"] = FakeDetector(batch_error=error)
+    images = [face_image([(10, 10, 20, 20)]) for _ in range(3)]
+    results = detect_faces_batch(images, "opencv", 10)
+    assert all(len(faces) == 1 for faces in results)
+    assert get_detector("opencv").supports_batch is False
+
+
+def test_detect_batch_transient_error_keeps_batching(fake_deepface):
+    """Test that a batch error after batching has worked propagates instead of disabling it."""
+    from unlabeled_media_tagger.pipeline.detect_faces import detect_faces_batch, get_detector
+
+    detector = fake_deepface["retinaface"] = FakeDetector(batch=True)
+    images = [face_image([(10, 10, 20, 20)]) for _ in range(2)]
+    assert len(detect_faces_batch(images)) == 2
+    assert get_detector("retinaface").supports_batch is True
+
+    detector.batch_error = RuntimeError("GPU busy")
+    with pytest.raises(ValueError, match="GPU busy"):
+        detect_faces_batch(images)
+    assert get_detector("retinaface").supports_batch is True
+
+
+def test_detect_fast_maps_boxes_back(fake_deepface):
+    """Test that fast detect runs on a downscaled copy and reports original coordinates."""
+    from unlabeled_media_tagger.pipeline.detect_faces import _detect_fast, get_detector
+
+    detector = get_detector("retinaface")
+    image = face_image([(100, 80, 60, 60)], size=(400, 600))
+    faces = _detect_fast(detector, image, 150)
+    assert fake_deepface["retinaface"].calls[-1] == (100, 150, 3)
+    bbox = faces[0]["bbox"]
+    assert abs(bbox["x"] - 100) <= 4 and abs(bbox["y"] - 80) <= 4
+    assert abs(bbox["w"] - 60) <= 4 and abs(bbox["h"] - 60) <= 4
+
+    # Refinement re-detects on a full-resolution crop around the candidate
+    faces = _detect_fast(detector, image, 150, refine=True)
+    assert faces == [{"bbox": {"x": 100, "y": 80, "w": 60, "h": 60}, "confidence": 0.9}]
+    assert fake_deepface["retinaface"].calls[-2] == (100, 150, 3)
+    assert fake_deepface["retinaface"].calls[-1][0] > 60
+
+
+def test_refine_candidates_keeps_or_drops_unmatched(fake_deepface):
+    """Test that a candidate with nothing in its crop is kept only if asked."""
+    from unlabeled_media_tagger.pipeline.detect_faces import _refine_candidates, get_detector
+
+    detector = get_detector("retinaface")
+    image = face_image([(20, 20, 40, 40)])
+    candidates = [
+        {"bbox": {"x": 22, "y": 18, "w": 36, "h": 44}, "confidence": 0.5},
+        {"bbox": {"x": 200, "y": 120, "w": 30, "h": 30}, "confidence": 0.5},
+    ]
+    refined = _refine_candidates(detector, image, candidates)
+    assert {"bbox": {"x": 20, "y": 20, "w": 40, "h": 40}, "confidence": 0.9} in refined
+    assert candidates[1] in refined
+    assert _refine_candidates(detector, image, candidates, keep_unmatched=False) == [
+        {"bbox": {"x": 20, "y": 20, "w": 40, "h": 40}, "confidence": 0.9}
+    ]
+
+
+def test_cascade_main_backend_prefilter_counts(fake_deepface):
+    """Test that cascade=True screens with the main backend at prefilter_size."""
+    from unlabeled_media_tagger.pipeline.detect_faces import CascadeStats, detect_faces_batch
+
+    fake_deepface["retinaface"] = FakeDetector(batch=True)
+    images = [face_image([(40, 40, 60, 60)]), face_image([]), face_image([(200, 100, 50, 50)])]
+    stats = CascadeStats()
+    results = detect_faces_batch(images, cascade=True, prefilter_size=100, cascade_stats=stats)
+    assert [len(faces) for faces in results] == [1, 0, 1]
+    assert (stats.screened, stats.rejected, stats.full_detections) == (3, 1, 2)
+    # Warm-up, three screening passes on 100-pixel copies, then one batch of the survivors
+    assert fake_deepface["retinaface"].calls[1:] == [(67, 100, 3)] * 3 + [[(200, 300, 3)] * 2]
+
+    # Without the switch or a prefilter backend, nothing is screened
+    stats = CascadeStats()
+    detect_faces_batch(images, prefilter_size=100, cascade_stats=stats)
+    assert (stats.screened, stats.full_detections) == (0, 3)
+
+
+def test_detect_faces_in_image_passes_prefilter_size(fake_deepface):
+    """Test that detect_faces_in_image honors the cascade switch and prefilter_size."""
+    from unlabeled_media_tagger.pipeline.detect_faces import CascadeStats, detect_faces_in_image
+
+    stats = CascadeStats()
+    assert detect_faces_in_image(face_image([]), cascade=True, prefilter_size=150, cascade_stats=stats) == []
+    assert (stats.screened, stats.rejected, stats.full_detections) == (1, 1, 0)
+    assert fake_deepface["retinaface"].calls[1:] == [(100, 150, 3)]
+
+    # A face too small for the prefilter copy is never seen by the detector
+    fake_deepface["retinaface"].min_side = 8
+    small_face = face_image([(10, 10, 12, 12)])
+    assert detect_faces_in_image(small_face, cascade=True, prefilter_size=150, cascade_stats=stats) == []
+    assert len(detect_faces_in_image(small_face, cascade=True, prefilter_size=None, cascade_stats=stats)) == 1
+    assert (stats.screened, stats.rejected, stats.full_detections) == (3, 2, 1)
+
+
+def test_cascade_regions_counts_refined_candidates(fake_deepface):
+    """Test that region mode runs the detector once per prefilter candidate."""
+    from unlabeled_media_tagger.pipeline.detect_faces import CascadeStats, detect_faces_cascade
+
+    fake_deepface["opencv"] = FakeDetector(min_side=2)
+    image = face_image([(20, 20, 40, 40), (200, 100, 60, 60)])
+    stats = CascadeStats()
+    faces = detect_faces_cascade(image, prefilter_backend="opencv", prefilter_size=150, regions=True, stats=stats)
+    assert sorted(face["bbox"]["x"] for face in faces) == [20, 200]
+    assert (stats.screened, stats.rejected, stats.region_detections, stats.full_detections) == (1, 0, 2, 0)
+    # The expensive backend only saw two crops, never the whole image
+    assert all(shape != (200, 300, 3) for shape in fake_deepface["retinaface"].calls)
+
+    assert detect_faces_cascade(face_image([]), prefilter_backend=None, stats=stats) == []
+    assert (stats.screened, stats.rejected, stats.region_detections) == (2, 1, 2)
+
+
+def test_detect_stage_cascade_switch(fake_deepface):
+    """Test that DetectStage screens with the main backend when cascade_prefilter is set."""
+    stage = DetectStage({"cascade_prefilter": True, "cascade_prefilter_size": 100})
+    results = stage.detect_faces([face_image([(40, 40, 60, 60)]), face_image([])])
+    assert [len(faces) for faces in results] == [1, 0]
+    assert stage.cascade_stats.as_dict()["detector_calls_saved"] == 1
@@ -0,0 +1,108 @@
+"""
+Tests for the memory-mapped embedding store.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from unlabeled_media_tagger.pipeline.embedding_store import EmbeddingStore
+from unlabeled_media_tagger.pipeline.results import DetectionResults
+
+
+def _detections(count, source):
+    detections = [{"bbox": {"x": i, "y": 1, "w": 2, "h": 3}, "confidence": 0.5} for i in range(count)]
+    return DetectionResults.from_detections(detections, source=source, frame_index=7, timestamp=1.5)
+
+
+def test_append_and_read_back(tmp_path):
+    """Test that embeddings and metadata round-trip across segments."""
+    store = EmbeddingStore(str(tmp_path / "store"), dim=4, segment_rows=3)
+    vectors = np.arange(28, dtype=np.float32).reshape(7, 4)
+    assert list(store.append(vectors[:4], _detections(4, "a.jpg"))) == [0, 1, 2, 3]
+    assert list(store.append(vectors[4:], _detections(3, "b.mp4"))) == [4, 5, 6]
+
+    embeddings, sidecar = store.load_all()
+    assert np.array_equal(embeddings, vectors)
+    assert [len(s) for _, s in store.segments()] == [3, 3, 1]
+    assert store.sources == ["a.jpg", "b.mp4"]
+    results = store.detections(sidecar)
+    assert results[5]["source"] == "b.mp4"
+    assert results[5]["frame_index"] == 7
+    assert results[5]["bbox"]["x"] == 1
+
+
+def test_segments_are_zero_copy_memmaps(tmp_path):
+    """Test that segment views map the files instead of copying them."""
+    store = EmbeddingStore(str(tmp_path / "store"), dim=2)
+    store.append(np.ones((5, 2)))
+    embeddings, _ = store.segments()[0]
+    assert isinstance(embeddings, np.memmap)
+    block, _ = next(store.iter_blocks(block_rows=2))
+    assert np.shares_memory(block, embeddings)
+
+
+def test_reader_sees_commits_after_refresh(tmp_path):
+    """Test that a concurrent reader sees rows only once they are committed."""
+    path = str(tmp_path / "store")
+    writer = EmbeddingStore(path, dim=2)
+    reader = EmbeddingStore(path, readonly=True)
+    writer.append(np.ones((3, 2)))
+    assert len(reader) == 0
+    reader.refresh()
+    assert len(reader) == 3
+    with pytest.raises(PermissionError):
+        reader.append(np.ones((1, 2)))
+
+
+def test_delete_and_compact(tmp_path):
+    """Test that deleted faces disappear and compaction keeps face ids."""
+    path = str(tmp_path / "store")
+    store = EmbeddingStore(path, dim=2, segment_rows=4)
+    store.append(np.arange(20, dtype=np.float32).reshape(10, 2))
+    assert store.delete([1, 2, 8, 99]) == 3
+    assert len(store) == 7
+    reader = EmbeddingStore(path, readonly=True)
+
+    store.compact()
+    assert [len(s) for _, s in store.segments()] == [4, 3]
+    embeddings, sidecar = store.load_all()
+    assert list(sidecar["face_id"]) == [0, 3, 4, 5, 6, 7, 9]
+    assert list(store.face_ids()) == [0, 3, 4, 5, 6, 7, 9]
+    assert np.array_equal(embeddings[:, 0], sidecar["face_id"] * 2)
+    # A reader holding the old manifest recovers after the old files are gone
+    assert list(reader.load_all()[1]["face_id"]) == [0, 3, 4, 5, 6, 7, 9]
+    assert store.append(np.zeros((1, 2)))[0] == 10
+
+
+def test_refresh_survives_concurrent_compaction(tmp_path, monkeypatch):
+    """Test that a reader whose manifest predates a compaction reloads it."""
+    from unlabeled_media_tagger.pipeline import embedding_store
+
+    path = tmp_path / "store"
+    store = EmbeddingStore(str(path), dim=2)
+    store.append(np.arange(8, dtype=np.float32).reshape(4, 2))
+    store.delete([1])
+    reader = EmbeddingStore(str(path), readonly=True)
+    stale = json.loads((path / "manifest.json").read_text())
+    store.compact()
+    assert not (path / "tombstones.i64").exists()
+
+    # The reader loads the manifest just before compact() replaces it
+    manifests = [stale]
+    real_load = json.load
+    monkeypatch.setattr(embedding_store.json, "load", lambda f: manifests.pop() if manifests else real_load(f))
+    reader.refresh()
+    assert list(reader.face_ids()) == [0, 2, 3]
+
+
+def test_reopen_existing_store(tmp_path):
+    """Test that a store reopens with its dimension and contents."""
+    path = str(tmp_path / "store")
+    EmbeddingStore(path, dim=3, dtype="float16").append(np.ones((2, 3)))
+    store = EmbeddingStore(path)
+    assert store.dim == 3 and store.dtype == np.float16
+    assert len(store) == 2
+    with pytest.raises(ValueError):
+        EmbeddingStore(path, dim=4)
@@ -1,11 +1,25 @@
 """
-Placeholder tests for extract stage.
-
-TODO: Add tests when extract stage is implemented.
+Tests for the extract stage.
 """
 
+import cv2
+import numpy as np
 import pytest
-from unlabeled_media_tagger.pipeline.extract import ExtractStage
+
+from unlabeled_media_tagger.pipeline.extract import ExtractStage, FramePrefetcher
+
+from tests.helpers import exif_segment
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    """Write a 10 fps, 5 second MJPG video whose frame i has brightness i * 4."""
+    path = tmp_path / "clip.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (32, 24))
+    for i in range(50):
+        writer.write(np.full((24, 32, 3), i * 4, dtype=np.uint8))
+    writer.release()
+    return str(path)
 
 
 def test_extract_stage_initialization():
@@ -15,8 +29,117 @@ def test_extract_stage_initialization():
     assert isinstance(stage.config, dict)
 
 
-def test_extract_not_implemented():
-    """Test that extract method raises NotImplementedError."""
+def test_iter_frames_samples_video(video_path):
+    """Test that video frames are yielded lazily at the sampling interval."""
+    stage = ExtractStage({"frame_interval": 1.0})
+    frames = list(stage.iter_frames(video_path))
+    assert [timestamp for timestamp, _ in frames] == pytest.approx([0.0, 1.0, 2.0, 3.0, 4.0])
+    assert frames[0][1].shape == (24, 32, 3)
+
+
+def test_prefetcher_stays_within_budget():
+    """Test that buffered frames never exceed the memory budget."""
+    frame_bytes = np.zeros((24, 32, 3), dtype=np.uint8).nbytes
+    source = ((float(i), np.zeros((24, 32, 3), dtype=np.uint8)) for i in range(20))
+    prefetcher = FramePrefetcher(source, memory_budget_bytes=3 * frame_bytes)
+    assert len(list(prefetcher)) == 20
+    assert 0 < prefetcher.peak_bytes <= 3 * frame_bytes
+
+
+def test_prefetcher_reraises_decode_errors():
+    """Test that an error on the decoder thread reaches the consumer."""
+    def source():
+        yield 0.0, np.zeros((2, 2, 3), dtype=np.uint8)
+        raise ValueError("corrupt frame")
+
+    with pytest.raises(ValueError, match="corrupt frame"):
+        list(FramePrefetcher(source(), memory_budget_bytes=1024))
+
+
+def test_extract_video_metadata(video_path):
+    """Test that extract returns video metadata and a frame iterator."""
+    result = ExtractStage({"frame_interval": 2.0}).extract(video_path)
+    assert result["media_type"] == "video"
+    assert result["metadata"]["width"] == 32
+    assert result["metadata"]["height"] == 24
+    assert result["metadata"]["duration_sec"] == pytest.approx(5.0)
+    assert len(list(result["frames"])) == 3
+
+
+def test_extract_image(tmp_path):
+    """Test that an image is extracted as a single frame at time 0."""
+    path = tmp_path / "photo.png"
+    cv2.imwrite(str(path), np.zeros((10, 20, 3), dtype=np.uint8))
+    result = ExtractStage().extract(str(path))
+    assert result["media_type"] == "image"
+    assert result["metadata"] == {"width": 20, "height": 10}
+    assert [timestamp for timestamp, _ in result["frames"]] == [0.0]
+
+
+def test_extract_metadata_reads_exif_thumbnail(tmp_path):
+    """Test that EXIF metadata and the thumbnail are read from the header."""
+    thumbnail = cv2.imencode(".jpg", np.full((12, 16, 3), 200, dtype=np.uint8))[1].tobytes()
+    image = cv2.imencode(".jpg", np.zeros((40, 60, 3), dtype=np.uint8))[1].tobytes()
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(image[:2] + exif_segment(thumbnail, orientation=6) + image[2:])
+
     stage = ExtractStage()
-    with pytest.raises(NotImplementedError):
-        stage.extract("test_file.mp4")
+    metadata = stage.extract_metadata(str(path))
+    # Orientation 6 is displayed rotated by 90 degrees
+    assert (metadata["width"], metadata["height"]) == (40, 60)
+    assert metadata["exif"]["make"] == "TestCam"
+    assert stage.extract_thumbnail(str(path)).shape == (16, 12, 3)
+
+
+def test_prescreen_without_thumbnail(tmp_path):
+    """Test that the prescreen defers to the full image when there is no thumbnail."""
+    path = tmp_path / "plain.jpg"
+    cv2.imwrite(str(path), np.zeros((8, 8, 3), dtype=np.uint8))
+    assert ExtractStage().prescreen_faces(str(path)) is None
+
+
+class _FakeCascade:
+    """Stand-in for a Haar cascade that reports the given faces."""
+
+    def __init__(self, faces):
+        self.faces = faces
+        self.images = []
+
+    def detectMultiScale(self, image, **kwargs):
+        self.images.append(image)
+        return self.faces
+
+
+@pytest.mark.parametrize("faces, expected", [([(2, 2, 8, 8)], True), ([], False)])
+def test_prescreen_runs_cascade_on_thumbnail(tmp_path, monkeypatch, faces, expected):
+    """Test that the prescreen reports the cascade's verdict on the upright thumbnail."""
+    from unlabeled_media_tagger.pipeline import extract
+
+    thumbnail = cv2.imencode(".jpg", np.full((12, 16, 3), 200, dtype=np.uint8))[1].tobytes()
+    image = cv2.imencode(".jpg", np.zeros((40, 60, 3), dtype=np.uint8))[1].tobytes()
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(image[:2] + exif_segment(thumbnail, orientation=6) + image[2:])
+    cascade = _FakeCascade(faces)
+    monkeypatch.setattr(extract, "_face_cascade", lambda: cascade)
+
+    assert ExtractStage().prescreen_faces(str(path)) is expected
+    # One grayscale pass over the rotated thumbnail, never the full image
+    assert [im.shape for im in cascade.images] == [(16, 12)]
+
+
+def test_prescreen_without_cascade(tmp_path, monkeypatch):
+    """Test that the prescreen defers to the full image when OpenCV has no cascades."""
+    from unlabeled_media_tagger.pipeline import extract
+
+    thumbnail = cv2.imencode(".jpg", np.full((12, 16, 3), 200, dtype=np.uint8))[1].tobytes()
+    image = cv2.imencode(".jpg", np.zeros((40, 60, 3), dtype=np.uint8))[1].tobytes()
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(image[:2] + exif_segment(thumbnail) + image[2:])
+    monkeypatch.setattr(extract, "_face_cascade", lambda: None)
+    assert ExtractStage().prescreen_faces(str(path)) is None
+
+
+def test_extract_missing_file():
+    """Test that a missing file raises FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        ExtractStage().extract("missing.mp4")
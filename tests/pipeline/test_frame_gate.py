@@ -0,0 +1,45 @@
+"""
+Tests for near-duplicate frame gating.
+"""
+
+import numpy as np
+
+from unlabeled_media_tagger.pipeline.frame_gate import FrameGate
+
+
+def _frame(value, noise=0, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = np.full((120, 160, 3), value, dtype=np.int16)
+    frame += rng.integers(-noise, noise + 1, frame.shape, dtype=np.int16)
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def test_static_frames_are_reused():
+    """Test that noisy copies of the same frame are flagged as duplicates."""
+    gate = FrameGate(threshold=2.0)
+    flags = [gate.is_duplicate(_frame(100, noise=8, seed=i)) for i in range(5)]
+    assert flags == [False, True, True, True, True]
+    assert gate.reused == 4
+    assert gate.checked == 5
+
+
+def test_scene_change_triggers_detection():
+    """Test that a changed frame is detected and becomes the new reference."""
+    gate = FrameGate(threshold=2.0)
+    assert not gate.is_duplicate(_frame(50))
+    assert not gate.is_duplicate(_frame(200))
+    assert gate.is_duplicate(_frame(200))
+
+
+def test_slow_drift_is_compared_to_reference():
+    """Test that small per-frame changes add up against the last detected frame."""
+    gate = FrameGate(threshold=2.0)
+    flags = [gate.is_duplicate(_frame(100 + i)) for i in range(5)]
+    assert flags == [False, True, True, False, True]
+
+
+def test_max_reuse_forces_detection():
+    """Test that max_reuse limits consecutive reused frames."""
+    gate = FrameGate(threshold=2.0, max_reuse=2)
+    flags = [gate.is_duplicate(_frame(100)) for _ in range(6)]
+    assert flags == [False, True, True, False, True, True]
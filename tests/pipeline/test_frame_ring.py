@@ -0,0 +1,60 @@
+"""
+Tests for the shared-memory frame ring.
+"""
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from unlabeled_media_tagger.pipeline.frame_ring import SharedFrameRing
+
+
+@pytest.fixture
+def ring():
+    """A two-slot ring sized for 4x4 BGR frames."""
+    ring = SharedFrameRing.for_frame((4, 4, 3), slots=2)
+    yield ring
+    ring.close()
+
+
+def test_frames_round_trip(ring):
+    """Test that frames come out in order with their timestamps."""
+    ring.put(np.full((4, 4, 3), 7, dtype=np.uint8), 0.5)
+    ring.finish()
+    slot, timestamp, frame = ring.get(timeout=5)
+    assert timestamp == 0.5
+    assert frame.shape == (4, 4, 3)
+    assert (frame == 7).all()
+    ring.release(slot)
+    assert ring.get(timeout=5) is None
+
+
+def _sum_frames(ring, results):
+    """Worker: report the timestamp and pixel sum of every frame in the ring."""
+    for timestamp, frame in ring:
+        results.put((timestamp, int(frame.sum())))
+    results.put(None)
+    ring.close()
+
+
+def test_worker_process_reads_frames(ring):
+    """Test that a worker process reads frames through shared memory."""
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    worker = ctx.Process(target=_sum_frames, args=(ring, results))
+    worker.start()
+    # More frames than slots, so the producer must wait for the worker
+    for i in range(5):
+        ring.put(np.full((4, 4, 3), i, dtype=np.uint8), float(i))
+    ring.finish()
+    received = list(iter(lambda: results.get(timeout=30), None))
+    worker.join(timeout=30)
+    assert received == [(float(i), i * 48) for i in range(5)]
+    assert worker.exitcode == 0
+
+
+def test_oversized_frame_rejected(ring):
+    """Test that a frame larger than a slot is refused."""
+    with pytest.raises(ValueError):
+        ring.put(np.zeros((8, 8, 3), dtype=np.uint8), 0.0)
@@ -0,0 +1,125 @@
+"""
+Tests for video frame sampling.
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from unlabeled_media_tagger.pipeline.frame_sampler import FrameSampler, choose_strategy
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    """Write a 10 fps, 5 second MJPG video whose frame i has brightness i."""
+    path = tmp_path / "clip.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (32, 24))
+    for i in range(50):
+        writer.write(np.full((24, 32, 3), i * 4, dtype=np.uint8))
+    writer.release()
+    return str(path)
+
+
+@pytest.mark.parametrize("strategy", ["grab", "seek", "read"])
+def test_strategies_sample_same_frames(video_path, strategy):
+    """Test that every strategy yields the same frames at the same times."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        sampler = FrameSampler(cap, frame_interval_sec=1.0, strategy=strategy)
+        samples = list(sampler)
+    finally:
+        cap.release()
+    
+    assert [s[0] for s in samples] == [0, 10, 20, 30, 40]
+    assert [s[1] for s in samples] == pytest.approx([0.0, 1.0, 2.0, 3.0, 4.0])
+    # MJPG is lossy, so compare brightness loosely
+    assert [int(round(s[2].mean() / 4)) for s in samples] == [0, 10, 20, 30, 40]
+
+
+def test_grab_only_decodes_sampled_frames(video_path):
+    """Test that the grab strategy skips retrieving unsampled frames."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        sampler = FrameSampler(cap, frame_interval_sec=1.0, strategy="grab")
+        list(sampler)
+    finally:
+        cap.release()
+    assert sampler.decoded == 5
+    assert sampler.skipped == 45
+
+
+def test_seek_counts_frames_passed_over(video_path):
+    """Test that seek counts only the frames jumped over up to the last sample."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        sampler = FrameSampler(cap, frame_interval_sec=1.0, strategy="seek")
+        list(sampler)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        shard = FrameSampler(cap, frame_interval_sec=1.0, strategy="seek", start_sec=1.5, end_sec=3.5)
+        assert [s[0] for s in shard] == [20, 30]
+    finally:
+        cap.release()
+    assert (sampler.decoded, sampler.skipped) == (5, 36)
+    # Frames 15-19 and 21-29: the range starts at frame 15
+    assert (shard.decoded, shard.skipped) == (2, 14)
+
+
+def test_max_frames_spreads_budget(video_path):
+    """Test that max_frames widens the interval to cover the whole video."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        sampler = FrameSampler(cap, frame_interval_sec=0.5, max_frames=2, strategy="seek")
+        samples = list(sampler)
+    finally:
+        cap.release()
+    assert sampler.frame_interval_sec == pytest.approx(2.5)
+    assert [s[0] for s in samples] == [0, 25]
+
+
+def test_choose_strategy():
+    """Test automatic strategy selection by container and codec."""
+    assert choose_strategy(".avi", "MJPG", 0.5, 30.0, 900) == "seek"
+    assert choose_strategy(".mp4", "avc1", 0.5, 30.0, 900) == "grab"
+    assert choose_strategy(".mp4", "avc1", 5.0, 30.0, 900) == "seek"
+    assert choose_strategy(".flv", "avc1", 5.0, 30.0, 900) == "grab"
+    assert choose_strategy(".mp4", "avc1", 5.0, 0.0, 0) == "grab"
+
+
+def test_invalid_strategy(video_path):
+    """Test that an unknown strategy raises ValueError."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        with pytest.raises(ValueError):
+            FrameSampler(cap, strategy="keyframes")
+    finally:
+        cap.release()
+
+
+def test_interval_can_change_between_samples(video_path):
+    """Test that changing frame_interval_sec mid-iteration affects the next sample."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        sampler = FrameSampler(cap, frame_interval_sec=1.0, strategy="grab")
+        frames = []
+        for frame_number, _, _ in sampler:
+            frames.append(frame_number)
+            sampler.frame_interval_sec = 2.0 if frame_number >= 10 else 1.0
+    finally:
+        cap.release()
+    
+    assert frames == [0, 10, 30]
+
+
+@pytest.mark.parametrize("strategy", ["grab", "seek"])
+def test_time_range_shards_match_single_pass(video_path, strategy):
+    """Test that sampling consecutive time ranges yields the same frames as one pass."""
+    def frames(**kwargs):
+        cap = cv2.VideoCapture(video_path)
+        try:
+            return [s[0] for s in FrameSampler(cap, frame_interval_sec=0.7, strategy=strategy, **kwargs)]
+        finally:
+            cap.release()
+    
+    whole = frames()
+    shards = frames(end_sec=2.1) + frames(start_sec=2.1, end_sec=3.5) + frames(start_sec=3.5)
+    assert shards == whole
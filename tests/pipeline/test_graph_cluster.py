@@ -0,0 +1,76 @@
+"""
+Tests for parallel graph clustering.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from unlabeled_media_tagger.pipeline.embedding_store import EmbeddingStore
+from unlabeled_media_tagger.pipeline.graph_cluster import (
+    chinese_whispers,
+    cluster_embeddings_parallel,
+    cluster_graph,
+    dbscan,
+    threshold_graph,
+)
+from unlabeled_media_tagger.pipeline.similarity import SimilarityEngine
+
+
+def _edges(pairs):
+    rows, cols = np.array(pairs).T
+    return rows, cols
+
+
+def test_threshold_graph_matches_blocked_pairs():
+    """Test that the pool builds exactly the pairs of the in-process engine."""
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(10, 16))
+    embeddings = centers[rng.integers(0, 10, 300)] + 0.3 * rng.normal(size=(300, 16))
+    expected = SimilarityEngine().pairs(embeddings, 0.8)
+    environ = dict(os.environ)
+    rows, cols, scores = threshold_graph(embeddings, 0.8, block_size=64, workers=2)
+    # Thread limits are applied in the workers, not in the parent
+    assert dict(os.environ) == environ
+    assert (rows < cols).all()
+    assert sorted(zip(rows.tolist(), cols.tolist())) == sorted(zip(expected[0].tolist(), expected[1].tolist()))
+    order, expected_order = np.lexsort((cols, rows)), np.lexsort((expected[1], expected[0]))
+    np.testing.assert_allclose(scores[order], expected[2][expected_order], atol=1e-6)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_threshold_graph_streams_embedding_store(tmp_path, workers):
+    """Test that a store's live rows give the same graph as the loaded array."""
+    rng = np.random.default_rng(1)
+    store = EmbeddingStore(str(tmp_path / "store"), dim=16, segment_rows=50)
+    store.append(rng.normal(size=(130, 16)))
+    store.delete([3, 60, 61])
+    embeddings, _ = store.load_all()
+    expected = threshold_graph(embeddings, 0.3, block_size=32)
+    rows, cols, _ = threshold_graph(store, 0.3, block_size=32, workers=workers)
+    assert sorted(zip(rows.tolist(), cols.tolist())) == sorted(zip(expected[0].tolist(), expected[1].tolist()))
+
+
+def test_chinese_whispers_splits_bridged_groups():
+    """Test that a single weak bridge merges components but not Chinese Whispers."""
+    group_a = [(0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3)]
+    group_b = [(4, 5), (4, 6), (4, 7), (5, 6), (5, 7), (6, 7)]
+    rows, cols = _edges(group_a + group_b + [(3, 4)])
+    weights = np.array([0.9] * 12 + [0.71])
+    assert cluster_graph(9, rows, cols, weights, "components").tolist() == [0] * 8 + [1]
+    assert chinese_whispers(9, rows, cols, weights).tolist() == [0] * 4 + [1] * 4 + [2]
+
+
+def test_dbscan_core_border_and_noise():
+    """Test that DBSCAN keeps dense groups, attaches border faces and marks noise."""
+    rows, cols = _edges([(0, 1), (0, 2), (1, 2), (2, 3), (5, 6)])
+    scores = np.array([0.9, 0.9, 0.9, 0.8, 0.9])
+    labels = dbscan(7, rows, cols, scores, min_samples=3)
+    assert labels.tolist() == [0, 0, 0, 0, -1, -1, -1]
+
+
+def test_unknown_method_rejected():
+    """Test that an unknown clustering method raises ValueError."""
+    with pytest.raises(ValueError):
+        cluster_embeddings_parallel(np.eye(3), 0.5, method="kmeans")
@@ -0,0 +1,66 @@
+"""
+Tests for incremental face clustering.
+"""
+
+import numpy as np
+import pytest
+
+from unlabeled_media_tagger.pipeline.incremental_cluster import IncrementalClusterer
+
+
+@pytest.fixture
+def people():
+    """Five well-separated identity vectors in 32 dimensions."""
+    return np.random.default_rng(0).normal(size=(5, 32))
+
+
+def _faces(people, identities, rng, noise=0.05):
+    return people[identities] + noise * rng.normal(size=(len(identities), people.shape[1]))
+
+
+def test_new_faces_join_existing_clusters(people):
+    """Test that later faces of a known person join that person's cluster."""
+    rng = np.random.default_rng(1)
+    clusterer = IncrementalClusterer(32)
+    first = clusterer.add(_faces(people, [0, 0, 1], rng))
+    assert first[0] == first[1] != first[2]
+
+    second = clusterer.add(_faces(people, [1, 2, 0, 2], rng))
+    assert second[0] == first[2]
+    assert second[2] == first[0]
+    assert second[1] == second[3] not in (first[0], first[2])
+    assert list(clusterer.cluster_sizes) == [3, 2, 2]
+    assert len(clusterer.labels) == 7
+
+
+def test_compact_matches_batch_clustering(people):
+    """Test that compaction reproduces clustering of the whole collection."""
+    rng = np.random.default_rng(2)
+    identities = rng.integers(0, 5, 60)
+    faces = _faces(people, identities, rng)
+    clusterer = IncrementalClusterer(32)
+    for start in range(0, 60, 7):
+        clusterer.add(faces[start:start + 7])
+    labels = clusterer.compact(faces)
+    # Same identity <=> same cluster
+    assert (np.equal.outer(labels, labels) == np.equal.outer(identities, identities)).all()
+    assert len(clusterer) == len(set(identities))
+
+
+def test_compact_requires_all_faces(people):
+    """Test that compaction refuses a partial collection."""
+    clusterer = IncrementalClusterer(32)
+    clusterer.add(people[:3])
+    with pytest.raises(ValueError):
+        clusterer.compact(people[:2])
+
+
+def test_save_and_load(tmp_path, people):
+    """Test that a reloaded clusterer keeps assigning to the same clusters."""
+    rng = np.random.default_rng(3)
+    clusterer = IncrementalClusterer(32)
+    labels = clusterer.add(_faces(people, [0, 1, 2], rng))
+    clusterer.save(str(tmp_path / "clusters.npz"))
+    loaded = IncrementalClusterer.load(str(tmp_path / "clusters.npz"))
+    assert list(loaded.labels) == list(labels)
+    assert list(loaded.add(_faces(people, [2, 0], rng))) == [labels[2], labels[0]]
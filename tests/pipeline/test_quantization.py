@@ -0,0 +1,86 @@
+"""
+Tests for embedding quantization.
+"""
+
+import numpy as np
+import pytest
+
+from unlabeled_media_tagger.pipeline.ann_index import IVFIndex
+from unlabeled_media_tagger.pipeline.quantization import ProductQuantizer, ScalarQuantizer, make_quantizer
+from unlabeled_media_tagger.pipeline.similarity import SimilarityEngine
+
+from tests.helpers import recall
+
+
+@pytest.mark.parametrize("quantizer", [ScalarQuantizer(32), ProductQuantizer(32)])
+@pytest.mark.parametrize("metric", ["cosine", "l2"])
+def test_code_scores_match_decoded_scores(clustered_vectors, quantizer, metric):
+    """Test that scoring codes directly equals scoring the decoded vectors."""
+    vectors, queries = clustered_vectors
+    engine = SimilarityEngine(metric)
+    prepared, prepared_queries = engine.prepare(vectors), engine.prepare(queries)
+    quantizer.train(prepared)
+    codes = quantizer.encode(prepared)
+    assert codes.dtype == np.uint8 and codes.shape == (3000, quantizer.code_size)
+    expected = engine.scores(prepared_queries, quantizer.decode(codes))
+    np.testing.assert_allclose(quantizer.scores(prepared_queries, codes, metric), expected, atol=1e-3)
+
+
+def test_scalar_quantizer_error_is_small(clustered_vectors):
+    """Test that sq8 reconstructs each value within half a step."""
+    vectors, _ = clustered_vectors
+    quantizer = ScalarQuantizer(32)
+    quantizer.train(vectors)
+    error = np.abs(quantizer.decode(quantizer.encode(vectors)) - vectors)
+    assert (error <= quantizer.step / 2 + 1e-5).all()
+
+
+def test_invalid_settings():
+    """Test that bad quantizer settings raise ValueError."""
+    with pytest.raises(ValueError):
+        ProductQuantizer(32, subspaces=5)
+    with pytest.raises(ValueError):
+        make_quantizer("int4", 32)
+
+
+@pytest.mark.parametrize("quantizer, rerank, minimum", [("sq8", 0, 0.9), ("pq", 0, 0.25), ("pq", 4, 0.9)])
+def test_quantized_index_recall(clustered_vectors, quantizer, rerank, minimum):
+    """Test that a quantized index finds most exact neighbors, more with re-ranking."""
+    vectors, queries = clustered_vectors
+    index = IVFIndex(32, nlist=8, quantizer=quantizer, subspaces=8, rerank=rerank)
+    index.add(vectors)
+    assert index.is_quantized
+    exact = [ids for ids, _ in SimilarityEngine().search(queries, vectors, k=10)]
+    ids, scores = index.search(queries, 10, nprobe=8)
+    assert ids.shape == (40, 10)
+    assert recall(ids, exact) >= minimum
+    if rerank:
+        # Re-ranked scores are exact
+        engine = SimilarityEngine()
+        exact_scores = np.einsum("ij,ij->i", engine.prepare(queries), engine.prepare(vectors[ids[:, 0]]))
+        np.testing.assert_allclose(scores[:, 0], exact_scores, atol=1e-5)
+
+
+def test_quantizes_after_enough_vectors(clustered_vectors):
+    """Test that vectors stay in float until the quantizer can be trained."""
+    vectors, _ = clustered_vectors
+    index = IVFIndex(32, nlist=4, quantizer="sq8")
+    index.add(vectors[:100])
+    assert not index.is_quantized
+    index.add(vectors[100:IVFIndex.QUANTIZE_AFTER])
+    assert index.is_quantized
+    assert index._vectors[0] is None
+
+
+def test_quantized_save_load_and_remove(tmp_path, clustered_vectors):
+    """Test that a quantized index survives removal and a save/load round trip."""
+    vectors, queries = clustered_vectors
+    index = IVFIndex(32, quantizer="pq", rerank=2)
+    index.add(vectors)
+    index.remove(range(50))
+    index.save(str(tmp_path / "index.npz"))
+    loaded = IVFIndex.load(str(tmp_path / "index.npz"))
+    assert loaded.is_quantized and len(loaded) == 2950
+    ids, _ = loaded.search(queries, 5)
+    assert np.array_equal(ids, index.search(queries, 5)[0])
+    assert not np.isin(ids, np.arange(50)).any()
@@ -0,0 +1,116 @@
+"""
+Tests for compact detection results.
+"""
+
+import math
+import pickle
+
+import numpy as np
+import pytest
+
+from unlabeled_media_tagger.pipeline.results import DETECTION_DTYPE, DetectionResults
+
+
+DETECTIONS = [
+    {"bbox": {"x": 1, "y": 2, "w": 3, "h": 4}, "confidence": 0.5},
+    {"bbox": {"x": 10, "y": 20, "w": 30, "h": 40}, "confidence": 0.25},
+]
+
+
+def test_from_detections_dict_view():
+    """Test that the dict view matches the detect_faces_in_image format."""
+    results = DetectionResults.from_detections(DETECTIONS, source="a.jpg")
+    assert len(results) == 2
+    assert results.array.dtype == DETECTION_DTYPE
+    first = results[0]
+    assert first["bbox"] == DETECTIONS[0]["bbox"]
+    assert first["confidence"] == 0.5
+    assert first["source"] == "a.jpg"
+    assert first["frame_index"] == -1
+    assert math.isnan(first["timestamp"])
+
+
+def test_frames_round_trip():
+    """Test conversion to and from per-frame video records."""
+    records = [
+        {"frame": 0, "timestamp": 0.0, "detections": DETECTIONS[:1]},
+        {"frame": 30, "timestamp": 1.0, "detections": []},
+        {"frame": 60, "timestamp": 2.0, "detections": DETECTIONS},
+    ]
+    results = DetectionResults.from_frames(records, source="clip.mp4")
+    assert len(results) == 3
+    frames = results.to_frames()
+    assert [f["frame"] for f in frames] == [0, 60]
+    assert frames[1]["detections"] == DETECTIONS
+
+
+def test_concatenate_remaps_sources():
+    """Test that merged results keep each row pointing at its own source."""
+    merged = DetectionResults.concatenate([
+        DetectionResults.from_detections(DETECTIONS, source="a.jpg"),
+        DetectionResults.from_detections(DETECTIONS[:1], source="b.jpg"),
+    ])
+    assert merged.sources == ["a.jpg", "b.jpg"]
+    assert [d["source"] for d in merged] == ["a.jpg", "a.jpg", "b.jpg"]
+    assert merged.bboxes().shape == (3, 4)
+
+
+def test_serialization(tmp_path):
+    """Test bytes, file and pickle round trips."""
+    results = DetectionResults.from_detections(DETECTIONS, source="a.jpg")
+    for restored in (
+        DetectionResults.from_bytes(results.to_bytes()),
+        pickle.loads(pickle.dumps(results)),
+    ):
+        assert restored.sources == results.sources
+        assert restored.array.tobytes() == results.array.tobytes()
+    
+    path = tmp_path / "results.npz"
+    results.save(str(path))
+    assert DetectionResults.load(str(path)).array.tobytes() == results.array.tobytes()
+
+
+def test_rejects_wrong_dtype():
+    """Test that arrays with another dtype are rejected."""
+    with pytest.raises(ValueError):
+        DetectionResults(np.zeros(3))
+
+
+def test_to_frames_keeps_sources_apart():
+    """Test that equal frame numbers from different videos are not merged."""
+    merged = DetectionResults.concatenate([
+        DetectionResults.from_frames([{"frame": 30, "timestamp": 1.0, "detections": DETECTIONS}], "a.mp4"),
+        DetectionResults.from_frames([{"frame": 30, "timestamp": 1.0, "detections": DETECTIONS[:1]}], "b.mp4"),
+    ])
+    frames = merged.to_frames()
+    assert [(f["source"], f["frame"], len(f["detections"])) for f in frames] == [
+        ("a.mp4", 30, 2),
+        ("b.mp4", 30, 1),
+    ]
+
+
+def test_writer_spools_rows_and_keeps_metadata(tmp_path):
+    """Test incremental .npz writing with per-source metadata, failures included."""
+    from unlabeled_media_tagger.pipeline.results import DetectionResultsWriter
+
+    path = tmp_path / "out.npz"
+    writer = DetectionResultsWriter(str(path))
+    writer.add(DetectionResults.from_detections(DETECTIONS, "a.jpg"), {"media_type": "image"})
+    writer.add(DetectionResults(sources=["bad.jpg"]), {"media_type": "image", "error": "unreadable"})
+    writer.add(
+        DetectionResults.from_frames([{"frame": 5, "timestamp": 0.5, "detections": DETECTIONS[:1]}], "c.mp4"),
+        {"media_type": "video", "frames_sampled": 4, "cached": True},
+    )
+    writer.close()
+    assert list(tmp_path.iterdir()) == [path]
+
+    loaded = DetectionResults.load(str(path))
+    assert loaded.sources == ["a.jpg", "bad.jpg", "c.mp4"]
+    assert [d["source"] for d in loaded] == ["a.jpg", "a.jpg", "c.mp4"]
+    assert loaded.metadata[1] == {"media_type": "image", "error": "unreadable"}
+    assert loaded.metadata[2] == {"media_type": "video", "frames_sampled": 4, "cached": True}
+
+    empty = tmp_path / "empty.npz"
+    writer = DetectionResultsWriter(str(empty))
+    writer.close()
+    assert len(DetectionResults.load(str(empty))) == 0
@@ -0,0 +1,112 @@
+"""
+Tests for media task scheduling and shard merging.
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from unlabeled_media_tagger.pipeline.frame_sampler import FrameSampler
+from unlabeled_media_tagger.pipeline.results import DetectionResults
+from unlabeled_media_tagger.pipeline.scheduler import ShardMerger, plan_tasks, probe_durations
+
+
+@pytest.fixture
+def long_video(tmp_path):
+    """Write a 10 fps, 10 second MJPG video."""
+    path = tmp_path / "long.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (32, 24))
+    for i in range(100):
+        writer.write(np.full((24, 32, 3), i, dtype=np.uint8))
+    writer.release()
+    return str(path)
+
+
+def test_plan_tasks_shards_long_videos_first(long_video, tmp_path):
+    """Test that long videos are split on the sample grid and scheduled first."""
+    image = str(tmp_path / "a.jpg")
+    tasks = plan_tasks([image, long_video], shard_sec=4.0, frame_interval_sec=1.5, max_frames=10)
+
+    video_tasks = [t for t in tasks if t['path'] == long_video]
+    assert [(t['start_sec'], t['end_sec']) for t in video_tasks] == [(0.0, 4.5), (4.5, 9.0), (9.0, None)]
+    assert all(t['shards'] == 3 for t in video_tasks)
+    # Samples at 0, 1.5, ... 9.0: the budget does not bind, so shards get their grid samples
+    assert [t['max_frames'] for t in video_tasks] == [3, 3, 1]
+    assert [t['path'] for t in tasks[:2]] == [long_video, long_video]
+
+
+def _sampled_frames(path, **kwargs):
+    cap = cv2.VideoCapture(path)
+    try:
+        return [sample[0] for sample in FrameSampler(cap, strategy='grab', **kwargs)]
+    finally:
+        cap.release()
+
+
+@pytest.mark.parametrize("shard_sec, frame_interval_sec, max_frames", [
+    (4.0, 0.5, 10),
+    (3.0, 0.25, 7),
+    (4.0, 1.5, 10),
+])
+def test_shard_budgets_match_single_pass(long_video, shard_sec, frame_interval_sec, max_frames):
+    """Test that shards sample exactly the frames of one budgeted pass."""
+    tasks = plan_tasks([long_video], shard_sec=shard_sec, frame_interval_sec=frame_interval_sec,
+                       max_frames=max_frames)
+    tasks.sort(key=lambda task: task['shard'])
+    whole = _sampled_frames(long_video, frame_interval_sec=frame_interval_sec, max_frames=max_frames)
+    shards = [
+        frame
+        for task in tasks
+        for frame in _sampled_frames(long_video, frame_interval_sec=task['frame_interval_sec'],
+                                     max_frames=task['max_frames'], start_sec=task['start_sec'],
+                                     end_sec=task['end_sec'])
+    ]
+    assert len(tasks) > 1
+    assert sum(task['max_frames'] for task in tasks) == len(whole) <= max_frames
+    assert shards == whole
+
+
+def test_probe_durations_runs_concurrently(long_video, tmp_path):
+    """Test that probing many videos returns each duration, 0.0 for unreadable ones."""
+    broken = tmp_path / "broken.mp4"
+    broken.write_bytes(b"not a video")
+    durations = probe_durations([long_video, str(broken)] * 5, workers=4)
+    assert durations == {long_video: pytest.approx(10.0), str(broken): 0.0}
+
+
+def test_plan_tasks_without_sharding_keeps_order(long_video, tmp_path):
+    """Test that without shard_sec every file is one task in input order."""
+    image = str(tmp_path / "a.jpg")
+    tasks = plan_tasks([image, long_video])
+    assert [(t['path'], t['shards']) for t in tasks] == [(image, 1), (long_video, 1)]
+
+
+def _shard_record(shard, timestamps, elapsed=1.0):
+    detections = [{'bbox': {'x': 0, 'y': 0, 'w': 5, 'h': 5}, 'confidence': 0.9}]
+    frames = [{'frame': int(t * 10), 'timestamp': t, 'detections': detections} for t in timestamps]
+    return {
+        'path': 'v.mp4', 'media_type': 'video', 'shard': shard, 'shards': 2,
+        'results': DetectionResults.from_frames(frames, 'v.mp4'),
+        'frames_sampled': len(timestamps), 'elapsed_sec': elapsed,
+    }
+
+
+def test_shard_merger_merges_in_timestamp_order():
+    """Test that shards arriving out of order merge into one ordered record."""
+    merger = ShardMerger()
+    assert merger.add(_shard_record(1, [5.0, 6.0])) is None
+    assert merger.pending == 1
+    merged = merger.add(_shard_record(0, [0.0, 1.0, 2.0]))
+
+    assert merger.pending == 0
+    assert merged['shards'] == 2
+    assert merged['frames_sampled'] == 5
+    assert merged['elapsed_sec'] == 2.0
+    assert list(merged['results'].array['timestamp']) == [0.0, 1.0, 2.0, 5.0, 6.0]
+    assert merged['results'].sources == ['v.mp4']
+
+
+def test_shard_merger_passes_unsharded_records():
+    """Test that single-task records are returned immediately."""
+    record = {'path': 'a.jpg', 'shard': 0, 'shards': 1}
+    assert ShardMerger().add(record) == {'path': 'a.jpg'}
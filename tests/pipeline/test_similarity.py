@@ -0,0 +1,77 @@
+"""
+Tests for the blocked similarity engine.
+"""
+
+import numpy as np
+import pytest
+
+from unlabeled_media_tagger.pipeline.similarity import (
+    SimilarityEngine,
+    connected_components,
+    neighbor_lists,
+)
+
+
+@pytest.fixture
+def embeddings():
+    """Random 300 x 32 embeddings."""
+    return np.random.default_rng(0).normal(size=(300, 32)).astype(np.float32)
+
+
+def _brute_force_pairs(engine, embeddings, threshold):
+    prepared = engine.prepare(embeddings)
+    mask = np.triu(engine.is_match(engine.scores(prepared, prepared), threshold), k=1)
+    return set(zip(*np.nonzero(mask)))
+
+
+@pytest.mark.parametrize("metric,threshold", [("cosine", 0.3), ("l2", 7.0)])
+def test_blocked_pairs_match_brute_force(embeddings, metric, threshold):
+    """Test that blocked pairs equal the pairs of the full score matrix."""
+    engine = SimilarityEngine(metric, block_size=64)
+    rows, cols, scores = engine.pairs(embeddings, threshold)
+    assert set(zip(rows, cols)) == _brute_force_pairs(engine, embeddings, threshold)
+    assert (rows < cols).all()
+    assert engine.is_match(scores, threshold).all()
+
+
+def test_float16_pairs_close_to_float32(embeddings):
+    """Test that float16 storage finds nearly the same pairs."""
+    exact = set(zip(*SimilarityEngine("cosine", "float32", 64).pairs(embeddings, 0.3)[:2]))
+    half = set(zip(*SimilarityEngine("cosine", "float16", 64).pairs(embeddings, 0.3)[:2]))
+    assert len(exact ^ half) <= 0.01 * len(exact)
+
+
+@pytest.mark.parametrize("metric", ["cosine", "l2"])
+def test_search_top_k(embeddings, metric):
+    """Test that blocked top-k search returns the exact nearest neighbors."""
+    engine = SimilarityEngine(metric, block_size=50)
+    results = engine.search(embeddings[:10], embeddings, k=5)
+    full = engine.scores(engine.prepare(embeddings[:10]), engine.prepare(embeddings))
+    order = np.argsort(-full if metric == "cosine" else full, axis=1)[:, :5]
+    for (indices, scores), expected in zip(results, order):
+        assert list(indices) == list(expected)
+
+
+def test_search_threshold(embeddings):
+    """Test that threshold search returns every passing neighbor, closest first."""
+    engine = SimilarityEngine("cosine", block_size=64)
+    results = engine.search(embeddings[:5], embeddings, threshold=0.3)
+    for indices, scores in results:
+        assert (scores >= 0.3).all()
+        assert (np.diff(scores) <= 0).all()
+
+
+def test_connected_components():
+    """Test that chained pairs form one component."""
+    labels = connected_components(6, np.array([0, 1, 4]), np.array([1, 2, 5]))
+    assert list(labels) == [0, 0, 0, 1, 2, 2]
+
+
+def test_neighbor_lists():
+    """Test that pairs become symmetric CSR neighbor lists."""
+    indptr, indices, scores = neighbor_lists(
+        3, np.array([0, 0]), np.array([1, 2]), np.array([0.9, 0.8], dtype=np.float32)
+    )
+    assert list(indptr) == [0, 2, 3, 4]
+    assert sorted(indices[indptr[0]:indptr[1]]) == [1, 2]
+    assert list(indices[indptr[2]:indptr[3]]) == [0]
@@ -0,0 +1,55 @@
+"""
+Tests for face tracking between sampled frames.
+"""
+
+import numpy as np
+
+from unlabeled_media_tagger.pipeline.tracking import IoUTracker, propagate_detections
+
+from tests.helpers import detection
+
+
+def test_tracker_keeps_ids_for_overlapping_boxes():
+    """Test that a detection overlapping a track continues it."""
+    tracker = IoUTracker(iou_threshold=0.3)
+    first = tracker.update([detection(10, 10), detection(200, 50)], frame=0, timestamp=0.0)
+    second = tracker.update([detection(205, 52), detection(14, 12)], frame=10, timestamp=1.0)
+
+    assert [d['track_id'] for d in first] == [0, 1]
+    assert [d['track_id'] for d in second] == [1, 0]
+    assert all(not d['tracked'] for d in second)
+
+
+def test_tracker_closes_lost_tracks_and_reports_timelines():
+    """Test that unmatched tracks close after max_misses and appear in timelines."""
+    tracker = IoUTracker(max_misses=1)
+    tracker.update([detection(10, 10)], frame=0, timestamp=0.0)
+    tracker.carry([detection(12, 10)], frame=5, timestamp=0.5)
+    tracker.update([], frame=10, timestamp=1.0)
+    assert len(tracker.active) == 1
+    tracker.update([detection(300, 300)], frame=20, timestamp=2.0)
+
+    assert [track.track_id for track in tracker.active] == [1]
+    timelines = tracker.timelines()
+    assert [t['track_id'] for t in timelines] == [0, 1]
+    assert timelines[0]['start_frame'] == 0
+    assert timelines[0]['end_frame'] == 5
+    assert [o['tracked'] for o in timelines[0]['observations']] == [False, True]
+
+
+def test_propagate_follows_shifted_texture():
+    """Test that optical flow moves a box with the content under it."""
+    rng = np.random.default_rng(0)
+    prev = np.zeros((200, 200), dtype=np.uint8)
+    prev[50:110, 60:120] = rng.integers(0, 255, (60, 60), dtype=np.uint8)
+    current = np.roll(prev, shift=(4, 6), axis=(0, 1))
+
+    (moved, displacement), = propagate_detections(prev, current, [detection(60, 50, 60, 60)])
+    assert moved['bbox'] == {'x': 66, 'y': 54, 'w': 60, 'h': 60}
+    assert displacement > 0.1
+
+
+def test_propagate_reports_lost_face_on_blank_region():
+    """Test that a box without trackable texture is reported as lost."""
+    blank = np.zeros((100, 100), dtype=np.uint8)
+    assert propagate_detections(blank, blank, [detection(10, 10)]) == [None]
@@ -0,0 +1,62 @@
+"""
+Tests for annotate_video output modes.
+"""
+
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+from unlabeled_media_tagger.pipeline.video_outputs import (
+    TimelineOutput,
+    create_output,
+    default_output_path,
+)
+
+
+DETECTIONS = [{'bbox': {'x': 4, 'y': 6, 'w': 10, 'h': 12}, 'confidence': 0.987654}]
+
+
+def _sample(i):
+    return i * 10, i * 1.0, np.zeros((48, 64, 3), dtype=np.uint8)
+
+
+def test_timeline_writes_one_line_per_frame(tmp_path):
+    """Test that the timeline output writes compact NDJSON records."""
+    path = tmp_path / "clip_detections.ndjson"
+    with TimelineOutput(str(path)) as output:
+        output.write(_sample(0), DETECTIONS)
+        output.write(_sample(1), [], reused=True)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert lines == [
+        {'frame': 0, 'timestamp': 0.0, 'reused': False,
+         'detections': [{'bbox': DETECTIONS[0]['bbox'], 'confidence': 0.9877}]},
+        {'frame': 10, 'timestamp': 1.0, 'reused': True, 'detections': []},
+    ]
+
+
+def test_default_output_paths():
+    """Test the default output locations for each mode."""
+    assert default_output_path("/data/clip.mp4", "frames") == "outputs/clip"
+    assert default_output_path("/data/clip.mp4", "video") == "outputs/clip_annotated.mp4"
+    assert default_output_path("/data/clip.mp4", "timeline") == "outputs/clip_detections.ndjson"
+    with pytest.raises(ValueError):
+        default_output_path("/data/clip.mp4", "gif")
+
+
+def test_video_output_writes_single_file(fake_deepface, tmp_path):
+    """Test that the video output writes every frame into one video."""
+    path = tmp_path / "clip_annotated.avi"
+    output = create_output("video", str(path), fps=1.0)
+    output.fourcc = "MJPG"
+    with output:
+        for i in range(3):
+            output.write(_sample(i), DETECTIONS)
+
+    cap = cv2.VideoCapture(str(path))
+    try:
+        assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 3
+    finally:
+        cap.release()
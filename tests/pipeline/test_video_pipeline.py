@@ -0,0 +1,96 @@
+"""
+Tests for the threaded video processing pipeline.
+"""
+
+import random
+import threading
+import time
+
+import pytest
+
+from unlabeled_media_tagger.pipeline.video_pipeline import VideoPipeline
+
+
+def _samples(n):
+    return [(i, i / 10.0, f"frame-{i}") for i in range(n)]
+
+
+def test_results_written_in_order_with_several_workers():
+    """Test that the writer sees every sample in order despite out-of-order detection."""
+    def detect_batch(samples):
+        time.sleep(random.uniform(0, 0.01))
+        return [sample[0] * 2 for sample in samples]
+
+    written = []
+    pipeline = VideoPipeline(
+        detect_batch, lambda sample, result, reused: written.append((sample[0], result)),
+        batch_size=3, detect_workers=4, queue_size=2
+    )
+    report = pipeline.run(_samples(25))
+
+    assert written == [(i, i * 2) for i in range(25)]
+    assert report['decode']['items'] == 25
+    assert report['detect']['items'] == 25
+    assert report['write']['items'] == 25
+    assert report['detect']['workers'] == 4
+    assert 0.0 <= report['detect']['utilization'] <= 1.0
+
+
+def test_backpressure_bounds_decoded_frames():
+    """Test that a slow writer stops the decoder from running far ahead."""
+    decoded = []
+    written = []
+    max_ahead = []
+
+    def source():
+        for sample in _samples(40):
+            decoded.append(sample[0])
+            yield sample
+
+    def sink(sample, result, reused):
+        written.append(sample[0])
+        max_ahead.append(len(decoded) - len(written))
+        time.sleep(0.002)
+
+    pipeline = VideoPipeline(lambda batch: [None] * len(batch), sink,
+                             batch_size=2, detect_workers=1, queue_size=1)
+    pipeline.run(source())
+
+    assert len(written) == 40
+    # At most 2 * queue_size + detect_workers batches are alive at once
+    assert max(max_ahead) <= (2 * 1 + 1) * 2 + 2
+
+
+def test_detector_error_is_raised_and_threads_stop():
+    """Test that an error in a detection worker propagates to the caller."""
+    def detect_batch(samples):
+        if samples[0][0] >= 4:
+            raise RuntimeError("detector failed")
+        return [None] * len(samples)
+
+    threads_before = threading.active_count()
+    pipeline = VideoPipeline(detect_batch, lambda sample, result, reused: None, batch_size=2, detect_workers=2)
+    with pytest.raises(RuntimeError, match="detector failed"):
+        pipeline.run(_samples(100))
+    assert threading.active_count() == threads_before
+
+
+def test_gate_reuses_previous_result():
+    """Test that gated samples skip detection and reuse the last result."""
+    detected = []
+
+    def detect_batch(samples):
+        detected.extend(sample[0] for sample in samples)
+        return [f"det-{sample[0]}" for sample in samples]
+
+    written = []
+    pipeline = VideoPipeline(
+        detect_batch, lambda sample, result, reused: written.append((sample[0], result, reused)),
+        batch_size=4, gate=lambda sample: sample[0] % 3 != 0
+    )
+    report = pipeline.run(_samples(10))
+
+    assert sorted(detected) == [0, 3, 6, 9]
+    assert written[:4] == [(0, "det-0", False), (1, "det-0", True), (2, "det-0", True), (3, "det-3", False)]
+    assert report['reused'] == 6
+    assert report['detect']['items'] == 4
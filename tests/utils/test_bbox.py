@@ -0,0 +1,47 @@
+"""
+Tests for bounding box helpers.
+"""
+
+import pytest
+
+from unlabeled_media_tagger.utils.bbox import (
+    bbox_iou,
+    match_detections,
+    non_max_suppression,
+    scale_detections,
+)
+
+from tests.helpers import detection
+
+
+def test_scale_detections_maps_back_to_original():
+    """Test rescaling from a quarter-size image with a crop offset."""
+    scaled = scale_detections([detection(10, 20, 30, 40)], 0.25, offset=(5, 7))
+    assert scaled[0]["bbox"] == {"x": 45, "y": 87, "w": 120, "h": 160}
+    assert scaled[0]["confidence"] == 0.9
+
+
+def test_bbox_iou():
+    """Test IoU for identical, disjoint and half-overlapping boxes."""
+    box = {"x": 0, "y": 0, "w": 10, "h": 10}
+    assert bbox_iou(box, box) == 1.0
+    assert bbox_iou(box, {"x": 20, "y": 20, "w": 10, "h": 10}) == 0.0
+    assert bbox_iou(box, {"x": 5, "y": 0, "w": 10, "h": 10}) == pytest.approx(50 / 150)
+
+
+def test_non_max_suppression_keeps_highest_confidence():
+    """Test that overlapping lower-confidence boxes are dropped."""
+    kept = non_max_suppression([
+        detection(0, 0, 10, 10, 0.5),
+        detection(1, 1, 10, 10, 0.9),
+        detection(50, 50, 10, 10, 0.7),
+    ])
+    assert [d["confidence"] for d in kept] == [0.9, 0.7]
+
+
+def test_match_detections_one_to_one():
+    """Test that each predicted box matches at most one reference box."""
+    reference = [detection(0, 0, 10, 10), detection(1, 0, 10, 10), detection(100, 100, 10, 10)]
+    assert match_detections([detection(0, 0, 10, 10)], reference) == 1
+    assert match_detections(reference, reference) == 3
+    assert match_detections([], reference) == 0
@@ -0,0 +1,57 @@
+"""
+Tests for the detection result cache.
+"""
+
+from unlabeled_media_tagger.utils.detection_cache import (
+    DetectionCache,
+    file_content_hash,
+)
+
+
+DETECTIONS = [{"bbox": {"x": 1, "y": 2, "w": 3, "h": 4}, "confidence": 0.99}]
+
+
+def test_file_content_hash(tmp_path):
+    """Test that the hash depends on file contents, not the path."""
+    a = tmp_path / "a.jpg"
+    b = tmp_path / "b.jpg"
+    a.write_bytes(b"same bytes")
+    b.write_bytes(b"same bytes")
+    assert file_content_hash(str(a)) == file_content_hash(str(b))
+    b.write_bytes(b"other bytes")
+    assert file_content_hash(str(a)) != file_content_hash(str(b))
+
+
+def test_make_key_includes_backend_and_params():
+    """Test that backend and parameters produce distinct keys."""
+    key = DetectionCache.make_key("abc", "retinaface", {"frame_interval_sec": 1.0})
+    assert key != DetectionCache.make_key("abc", "mtcnn", {"frame_interval_sec": 1.0})
+    assert key != DetectionCache.make_key("abc", "retinaface", {"frame_interval_sec": 2.0})
+    assert key == DetectionCache.make_key("abc", "retinaface", {"frame_interval_sec": 1.0})
+
+
+def test_get_put_and_counters(tmp_path):
+    """Test hits, misses and persistence across reopening."""
+    db_path = tmp_path / "cache.db"
+    with DetectionCache(str(db_path)) as cache:
+        assert cache.get("k") is None
+        cache.put("k", DETECTIONS)
+        assert cache.get("k") == DETECTIONS
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+    
+    with DetectionCache(str(db_path)) as cache:
+        assert cache.get("k") == DETECTIONS
+        assert cache.stats()["entries"] == 1
+
+
+def test_eviction_is_size_bounded(tmp_path):
+    """Test that least recently used entries are evicted over max_bytes."""
+    with DetectionCache(str(tmp_path / "cache.db"), max_bytes=200) as cache:
+        for i in range(10):
+            cache.put(f"k{i}", DETECTIONS)
+        stats = cache.stats()
+        assert stats["size_bytes"] <= 200
+        assert stats["evictions"] > 0
+        assert cache.get("k9") == DETECTIONS
+        assert cache.get("k0") is None
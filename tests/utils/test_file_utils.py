@@ -2,7 +2,10 @@
 Tests for utility modules.
 """
 
+import pytest
+
 from unlabeled_media_tagger.utils.file_utils import (
+    get_media_files,
     is_image_file,
     is_video_file,
 )
@@ -30,3 +33,22 @@ def test_is_video_file():
     assert is_video_file("video.flv") is True
     assert is_video_file("photo.jpg") is False
     assert is_video_file("document.pdf") is False
+
+
+def test_get_media_files(tmp_path):
+    """Test recursive media file scanning."""
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "b.jpg").write_bytes(b"")
+    (tmp_path / "nested" / "a.MP4").write_bytes(b"")
+    (tmp_path / "notes.txt").write_text("skip me")
+    
+    assert get_media_files(str(tmp_path)) == [
+        str(tmp_path / "b.jpg"),
+        str(tmp_path / "nested" / "a.MP4"),
+    ]
+
+
+def test_get_media_files_not_a_directory(tmp_path):
+    """Test that scanning a missing directory raises NotADirectoryError."""
+    with pytest.raises(NotADirectoryError):
+        get_media_files(str(tmp_path / "missing"))
@@ -0,0 +1,44 @@
+"""
+Tests for reduced-resolution image decoding.
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from unlabeled_media_tagger.utils.image_decode import choose_reduction, decode_reduced
+
+
+@pytest.mark.parametrize("side,target,expected", [
+    (4000, 640, 4),
+    (6000, 640, 8),
+    (1000, 640, 1),
+    (1400, 640, 2),
+])
+def test_choose_reduction(side, target, expected):
+    """Test that the reduction never drops the image below the target side."""
+    assert choose_reduction(side, side // 2, target) == expected
+
+
+def test_decode_reduced_jpeg(tmp_path):
+    """Test that a large JPEG is decoded at a reduced scale."""
+    path = tmp_path / "large.jpg"
+    cv2.imwrite(str(path), np.zeros((1200, 1600, 3), dtype=np.uint8))
+    image, scale = decode_reduced(str(path), 300)
+    assert image.shape == (300, 400, 3)
+    assert scale == pytest.approx(0.25)
+
+
+def test_decode_reduced_png_is_full_size(tmp_path):
+    """Test that non-JPEG images are decoded at full resolution."""
+    path = tmp_path / "large.png"
+    cv2.imwrite(str(path), np.zeros((1200, 1600, 3), dtype=np.uint8))
+    image, scale = decode_reduced(str(path), 300)
+    assert image.shape == (1200, 1600, 3)
+    assert scale == 1.0
+
+
+def test_decode_reduced_missing_file():
+    """Test that a missing image raises FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        decode_reduced("missing.jpg", 300)
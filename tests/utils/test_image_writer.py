@@ -0,0 +1,42 @@
+"""
+Tests for background image writing.
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from unlabeled_media_tagger.utils.image_writer import AsyncImageWriter, encode_params
+
+
+def test_writer_writes_all_images(tmp_path):
+    """Test that every submitted image is on disk after close."""
+    image = np.random.default_rng(0).integers(0, 255, (40, 60, 3), dtype=np.uint8)
+    with AsyncImageWriter(workers=3, max_pending=2) as writer:
+        for i in range(10):
+            writer.submit(image, str(tmp_path / "out" / f"{i}.png"))
+
+    assert writer.written == 10
+    assert writer.bytes_written > 0
+    # PNG is lossless, so the pixels round-trip exactly
+    assert np.array_equal(cv2.imread(str(tmp_path / "out" / "9.png")), image)
+
+
+def test_jpeg_quality_changes_size(tmp_path):
+    """Test that the configured JPEG quality is applied."""
+    image = np.random.default_rng(0).integers(0, 255, (64, 64, 3), dtype=np.uint8)
+    sizes = {}
+    for quality in (20, 95):
+        with AsyncImageWriter(jpeg_quality=quality) as writer:
+            writer.submit(image, str(tmp_path / f"q{quality}.jpg"))
+        sizes[quality] = (tmp_path / f"q{quality}.jpg").stat().st_size
+    assert sizes[20] < sizes[95]
+    assert encode_params("a.png", png_compression=1) == [cv2.IMWRITE_PNG_COMPRESSION, 1]
+
+
+def test_write_errors_are_raised(tmp_path):
+    """Test that an encoding failure surfaces on close."""
+    writer = AsyncImageWriter()
+    writer.submit(np.zeros((4, 4, 3), dtype=np.uint8), str(tmp_path / "bad.unknownext"))
+    with pytest.raises(ValueError, match="Failed to encode image: .*bad.unknownext"):
+        writer.close()
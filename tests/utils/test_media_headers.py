@@ -0,0 +1,82 @@
+"""
+Tests for header-only media metadata parsing.
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from unlabeled_media_tagger.utils.media_headers import (
+    HeaderError,
+    read_exif_thumbnail,
+    read_media_header,
+)
+
+from tests.helpers import exif_segment
+
+
+@pytest.fixture
+def exif_jpeg(tmp_path):
+    """A 60x40 JPEG with EXIF orientation 6 and a 16x12 embedded thumbnail."""
+    thumbnail = cv2.imencode(".jpg", np.full((12, 16, 3), 200, dtype=np.uint8))[1].tobytes()
+    image = cv2.imencode(".jpg", np.zeros((40, 60, 3), dtype=np.uint8))[1].tobytes()
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(image[:2] + exif_segment(thumbnail, orientation=6) + image[2:])
+    return str(path), thumbnail
+
+
+def test_jpeg_header_and_exif(exif_jpeg):
+    """Test that JPEG size and EXIF fields come from the header."""
+    path, _ = exif_jpeg
+    header = read_media_header(path)
+    assert header["format"] == "jpeg"
+    assert (header["width"], header["height"]) == (60, 40)
+    assert header["exif"]["make"] == "TestCam"
+    assert header["exif"]["orientation"] == 6
+
+
+def test_exif_thumbnail(exif_jpeg):
+    """Test that the embedded thumbnail bytes are returned unchanged."""
+    path, thumbnail = exif_jpeg
+    assert read_exif_thumbnail(path) == thumbnail
+
+
+def test_no_thumbnail(tmp_path):
+    """Test that a JPEG without EXIF has no thumbnail."""
+    path = tmp_path / "plain.jpg"
+    cv2.imwrite(str(path), np.zeros((8, 8, 3), dtype=np.uint8))
+    assert read_exif_thumbnail(str(path)) is None
+
+
+@pytest.mark.parametrize("extension", [".png", ".bmp", ".webp"])
+def test_image_dimensions(tmp_path, extension):
+    """Test that image dimensions are read without decoding."""
+    path = tmp_path / f"image{extension}"
+    cv2.imwrite(str(path), np.zeros((21, 34, 3), dtype=np.uint8))
+    header = read_media_header(str(path))
+    assert (header["width"], header["height"]) == (34, 21)
+
+
+@pytest.mark.parametrize("extension,fourcc", [(".avi", "MJPG"), (".mp4", "mp4v")])
+def test_video_header(tmp_path, extension, fourcc):
+    """Test that video size, frame rate and duration come from the header."""
+    path = tmp_path / f"clip{extension}"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*fourcc), 10, (32, 24))
+    if not writer.isOpened():
+        pytest.skip(f"OpenCV cannot write {fourcc}")
+    for i in range(25):
+        writer.write(np.full((24, 32, 3), i, dtype=np.uint8))
+    writer.release()
+    header = read_media_header(str(path))
+    assert (header["width"], header["height"]) == (32, 24)
+    assert header["fps"] == pytest.approx(10.0)
+    assert header["frame_count"] == 25
+    assert header["duration_sec"] == pytest.approx(2.5, abs=0.1)
+
+
+def test_unsupported_header(tmp_path):
+    """Test that unknown files raise HeaderError."""
+    path = tmp_path / "notes.txt"
+    path.write_text("not media")
+    with pytest.raises(HeaderError):
+        read_media_header(str(path))
@@ -0,0 +1,23 @@
+"""
+Tests for worker process planning.
+"""
+
+import os
+
+from unlabeled_media_tagger.utils.workers import THREAD_ENV_VARS, available_cpus, limit_threads, plan_workers
+
+
+def test_plan_workers_fills_available_cores():
+    """Test that the default worker count divides cores by threads per worker."""
+    cpus = len(available_cpus())
+    assert plan_workers(None, 1) == cpus
+    assert plan_workers(None, cpus * 2) == 1
+    assert plan_workers(3, 4) == 3
+
+
+def test_limit_threads_sets_thread_variables(monkeypatch):
+    """Test that every runtime thread variable is set to the limit."""
+    for var in THREAD_ENV_VARS:
+        monkeypatch.delenv(var, raising=False)
+    limit_threads(2)
+    assert {os.environ[var] for var in THREAD_ENV_VARS} == {"2"}